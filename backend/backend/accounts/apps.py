@@ -6,4 +6,5 @@ class AccountsConfig(AppConfig):
     name = "accounts"
 
     def ready(self):
+        import accounts.checks  # noqa: F401
         import accounts.signals  # noqa: F401
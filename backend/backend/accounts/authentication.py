@@ -0,0 +1,60 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import CLAIM_NAMES, VERSION_CLAIM, claims_version, confirm_claims, load_user
+
+
+class ClaimsUser(TokenUser):
+    """Request user built from the access token claims, without a query.
+
+    The full User row is only loaded (through a short-lived cache) when
+    `get_user()` or `profile` is used.
+    """
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @property
+    def claims(self):
+        return {name: self.token.get(name) for name in CLAIM_NAMES}
+
+    def get_user(self):
+        return load_user(self.id)
+
+    @property
+    def profile(self):
+        return self.get_user().profile
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that trusts the role claims instead of loading the user.
+
+    Tokens issued before the claims existed still go through the database.
+    Tokens carrying an outdated claims version are rejected, so the client
+    refreshes them and picks up the new role; saving the user's role, staff
+    or active flag moves the version. When the cache lost the version, or only
+    knows an older one than the token, one database read checks the claims
+    against the user row and caches the token's version.
+    """
+
+    def get_user(self, validated_token):
+        if "role" not in validated_token:
+            return super().get_user(validated_token)
+
+        user = ClaimsUser(validated_token)
+        version = validated_token.get(VERSION_CLAIM)
+        current = claims_version(user.id)
+        if version is not None and version == current:
+            return user
+        stale = version is None or (current is not None and version < current)
+        if not stale and confirm_claims(user.id, user.claims, version):
+            return user
+        raise InvalidToken("Informations du compte modifiees, reconnectez-vous.")
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+from events.checks import PROCESS_LOCAL_CACHES
+
+
+@register(deploy=True)
+def check_claims_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            "Access token claims versions are kept in a cache local to each process.",
+            hint=(
+                "A role change or deactivation only revokes access tokens in the worker "
+                "that saved it. Set CACHE_BACKEND to a shared backend such as Redis or "
+                "Memcached."
+            ),
+            id="accounts.E001",
+        )
+    ]
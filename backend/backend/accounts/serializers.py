@@ -1,7 +1,11 @@
 from django.contrib.auth import authenticate, get_user_model
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 
 from .models import Profile
+from .tokens import add_claims
 
 
 User = get_user_model()
@@ -130,11 +134,45 @@ class ProfileSerializer(serializers.ModelSerializer):
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        # Saving only what changed keeps token claims valid on unrelated edits.
+        instance.save(update_fields=[*validated_data, "updated_at"])
 
         if user_data:
             for attr, value in user_data.items():
                 setattr(instance.user, attr, value)
-            instance.user.save()
+            instance.user.save(update_fields=list(user_data))
 
         return instance
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh that re-reads the role claims, so a changed role reaches new tokens.
+
+    Mirrors `TokenRefreshSerializer.validate` so the user row it checks is
+    also the one the claims are read from.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = (
+            User.objects.select_related("profile")
+            .filter(**{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)})
+            .first()
+        )
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        data = {"access": str(add_claims(refresh.access_token, user))}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # The blacklist app is not installed.
+                    pass
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data["refresh"] = str(refresh)
+        return data
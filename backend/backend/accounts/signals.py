@@ -3,12 +3,29 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from .models import Profile
+from .tokens import invalidate_claims
 
 
 User = get_user_model()
+USER_CLAIM_FIELDS = {"email", "first_name", "last_name", "is_staff", "is_active", "password"}
+PROFILE_CLAIM_FIELDS = {"role", "handle"}
 
 
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_claims(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and not USER_CLAIM_FIELDS.intersection(update_fields)):
+        return
+    invalidate_claims(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_profile_claims(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and not PROFILE_CLAIM_FIELDS.intersection(update_fields)):
+        return
+    invalidate_claims(instance.user_id)
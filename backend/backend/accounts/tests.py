@@ -1,3 +1,141 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient, APIRequestFactory
 
-# Create your tests here.
+from events.permissions import IsOrganizer
+from monitoring.testing import QueryBudgetTestMixin
+
+from .authentication import ClaimsJWTAuthentication
+from .checks import check_claims_cache
+from .models import Profile
+from .tokens import claims_version
+
+
+# A token the cache cannot vouch for costs one query over the views' budgets.
+@override_settings(QUERY_BUDGET_MODE="")
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        response = self.client.post(
+            "/api/auth/register/",
+            {
+                "email": "club@example.com",
+                "first_name": "Ines",
+                "last_name": "Haddad",
+                "password": "secret-pass-1",
+                "confirm_password": "secret-pass-1",
+                "role": Profile.ROLE_ORGANIZER,
+            },
+            format="json",
+        )
+        self.tokens = response.json()
+
+    def test_me_and_permissions_run_without_queries(self):
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}"
+        )
+        with self.assertNumQueries(0):
+            user, _ = ClaimsJWTAuthentication().authenticate(request)
+            request.user = user
+            self.assertTrue(IsOrganizer().has_permission(request, None))
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/auth/me/")
+        self.assertEqual(response.json()["role"], Profile.ROLE_ORGANIZER)
+        self.assertEqual(response.json()["full_name"], "Ines Haddad")
+
+    def test_role_change_rejects_old_tokens_until_refresh(self):
+        profile = Profile.objects.get(user__email="club@example.com")
+        profile.role = Profile.ROLE_ATHLETE
+        profile.save()
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 401)
+
+        self.client.credentials()
+        refreshed = self.client.post(
+            "/api/auth/token/refresh/", {"refresh": self.tokens["refresh"]}, format="json"
+        ).json()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refreshed['access']}")
+        self.assertEqual(self.client.get("/api/auth/me/").json()["role"], Profile.ROLE_ATHLETE)
+
+    def test_deactivation_survives_a_lost_claims_version(self):
+        user = Profile.objects.get(user__email="club@example.com").user
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+        # Eviction or a restarted cache: nothing remembers the version moved.
+        cache.clear()
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 401)
+        self.client.credentials()
+        refreshed = self.client.post(
+            "/api/auth/token/refresh/", {"refresh": self.tokens["refresh"]}, format="json"
+        )
+        self.assertEqual(refreshed.status_code, 401)
+
+    def test_role_change_survives_a_lost_claims_version(self):
+        profile = Profile.objects.get(user__email="club@example.com")
+        profile.role = Profile.ROLE_ATHLETE
+        profile.save()
+        cache.clear()
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 401)
+
+    def test_lost_claims_version_costs_one_query(self):
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+
+    def test_cache_behind_the_token_adopts_its_version(self):
+        # Another worker's cache handed out a newer version than this one knows.
+        user_id = Profile.objects.get(user__email="club@example.com").user_id
+        cache.set(f"accounts:claims:{user_id}", claims_version(user_id) - 5, None)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+
+    def test_deploy_check_requires_a_shared_cache(self):
+        locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with self.settings(CACHES=locmem):
+            self.assertEqual([error.id for error in check_claims_cache(None)], ["accounts.E001"])
+        with self.settings(CACHES=redis):
+            self.assertEqual(check_claims_cache(None), [])
+
+
+class AccountQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    client_class = APIClient
+
+    def test_account_routes(self):
+        cache.clear()
+        tokens = self.assertQueryBudget("POST", "/api/auth/register/", {
+            "email": "fan@example.com",
+            "first_name": "Sami",
+            "last_name": "Ben Ali",
+            "password": "secret-pass-1",
+            "confirm_password": "secret-pass-1",
+        }, format="json").json()
+        self.assertQueryBudget(
+            "POST",
+            "/api/auth/login/",
+            {"email": "fan@example.com", "password": "secret-pass-1"},
+            format="json",
+        )
+        self.assertQueryBudget(
+            "POST", "/api/auth/token/refresh/", {"refresh": tokens["refresh"]}, format="json"
+        )
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertQueryBudget("GET", "/api/auth/me/")
+        self.assertQueryBudget("GET", "/api/auth/profile/")
+        response = self.assertQueryBudget("PATCH", "/api/auth/profile/", {"bio": "Padel"}, format="json")
+        self.assertEqual(response.status_code, 200)
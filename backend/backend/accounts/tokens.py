@@ -0,0 +1,110 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Profile
+
+
+CLAIM_NAMES = ("role", "email", "full_name", "handle", "is_staff")
+VERSION_CLAIM = "cv"
+USER_CACHE_TIMEOUT = 300
+# Claims versions never expire on their own: a token whose version is missing
+# from the cache costs a database read to be trusted again.
+VERSION_TIMEOUT = None
+
+
+def _version_key(user_id):
+    return f"accounts:claims:{user_id}"
+
+
+def _user_key(user_id):
+    return f"accounts:user:{user_id}"
+
+
+def build_full_name(user):
+    full_name = f"{user.first_name} {user.last_name}".strip()
+    return full_name
+
+
+def build_handle(user):
+    return (user.profile.handle or "").strip()
+
+
+def user_claims(user):
+    profile = getattr(user, "profile", None)
+    return {
+        "role": getattr(profile, "role", Profile.ROLE_ATHLETE),
+        "email": user.email,
+        "full_name": build_full_name(user),
+        "handle": (getattr(profile, "handle", "") or "").strip(),
+        "is_staff": user.is_staff,
+    }
+
+
+def user_role(user):
+    """Role of an authenticated user, read from token claims when available."""
+    role = getattr(user, "role", None)
+    if role:
+        return role
+    profile = getattr(user, "profile", None)
+    return getattr(profile, "role", None)
+
+
+def _new_version():
+    # Seeded from the clock so a version lost to eviction is never reused.
+    return int(time.time() * 1000)
+
+
+def claims_version(user_id):
+    """Current claims version of `user_id`, or None once the cache lost it."""
+    return cache.get(_version_key(user_id))
+
+
+def invalidate_claims(user_id):
+    """Reject access tokens carrying the current claims and drop the cached user.
+
+    The new version is at least the current time, so it is newer than any
+    version handed out before, whichever cache handed it out.
+    """
+    key = _version_key(user_id)
+    current = cache.get(key) or 0
+    cache.set(key, max(current + 1, _new_version()), VERSION_TIMEOUT)
+    cache.delete(_user_key(user_id))
+
+
+def confirm_claims(user_id, claims, version):
+    """Check token claims the cache cannot vouch for against the database.
+
+    Used when the cache lost the claims version or only knows an older one.
+    When the active user still matches `claims`, the user is cached and
+    `version` becomes the current claims version.
+    """
+    user = get_user_model().objects.select_related("profile").filter(pk=user_id).first()
+    if user is None or not user.is_active or user_claims(user) != claims:
+        return False
+    cache.set(_user_key(user_id), user, USER_CACHE_TIMEOUT)
+    cache.set(_version_key(user_id), version, VERSION_TIMEOUT)
+    return True
+
+
+def load_user(user_id):
+    user = cache.get(_user_key(user_id))
+    if user is None:
+        user = get_user_model().objects.select_related("profile").get(pk=user_id)
+        cache.set(_user_key(user_id), user, USER_CACHE_TIMEOUT)
+    return user
+
+
+def add_claims(token, user):
+    for name, value in user_claims(user).items():
+        token[name] = value
+    key = _version_key(user.pk)
+    cache.add(key, _new_version(), VERSION_TIMEOUT)
+    token[VERSION_CLAIM] = cache.get(key)
+    return token
+
+
+def tokens_for_user(user):
+    return add_claims(RefreshToken.for_user(user), user)
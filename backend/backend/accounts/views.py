@@ -1,29 +1,24 @@
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from monitoring.timing import TimedViewMixin, timed
 
 from .models import Profile
 from .serializers import LoginSerializer, ProfileSerializer, RegisterSerializer
+from .tokens import build_full_name, build_handle, tokens_for_user, user_claims
 
 
-def build_full_name(user):
-    full_name = f"{user.first_name} {user.last_name}".strip()
-    return full_name
-
-
-def build_handle(user):
-    return (user.profile.handle or "").strip()
-
-
-class RegisterView(APIView):
+class RegisterView(TimedViewMixin, APIView):
     permission_classes = [permissions.AllowAny]
+    query_budget = 5
 
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
 
         return Response(
             {
@@ -39,14 +34,15 @@ class RegisterView(APIView):
         )
 
 
-class LoginView(APIView):
+class LoginView(TimedViewMixin, APIView):
     permission_classes = [permissions.AllowAny]
+    query_budget = 2
 
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data["user"]
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
 
         return Response(
             {
@@ -62,37 +58,48 @@ class LoginView(APIView):
         )
 
 
-class MeView(APIView):
+class MeView(TimedViewMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 0
 
     def get(self, request):
         user = request.user
-        role = getattr(user.profile, "role", Profile.ROLE_ATHLETE)
+        claims = getattr(user, "claims", None) or user_claims(user)
         return Response(
             {
                 "id": user.id,
-                "email": user.email,
-                "role": role,
-                "handle": build_handle(user),
-                "full_name": build_full_name(user),
+                "email": claims["email"],
+                "role": claims["role"] or Profile.ROLE_ATHLETE,
+                "handle": claims["handle"],
+                "full_name": claims["full_name"],
             },
             status=status.HTTP_200_OK,
         )
 
 
-class ProfileView(APIView):
+class ProfileView(TimedViewMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 1, "PATCH": 2}
+
+    def get_profile(self):
+        return Profile.objects.select_related("user").get(user_id=self.request.user.id)
 
     def get(self, request):
-        serializer = ProfileSerializer(request.user.profile)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = ProfileSerializer(self.get_profile())
+        with timed("serialize"):
+            data = serializer.data
+        return Response(data, status=status.HTTP_200_OK)
 
     def patch(self, request):
         serializer = ProfileSerializer(
-            request.user.profile,
+            self.get_profile(),
             data=request.data,
             partial=True,
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ClaimsTokenRefreshView(TimedViewMixin, TokenRefreshView):
+    query_budget = 1
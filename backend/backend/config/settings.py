@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 from pathlib import Path
 import os
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,10 +46,15 @@ INSTALLED_APPS = [
     'accounts.apps.AccountsConfig',
     'contact',
     'events.apps.EventsConfig',
+    'monitoring.apps.MonitoringConfig',
 ]
 
 MIDDLEWARE = [
+    'monitoring.metrics.MetricsMiddleware',
+    'monitoring.timing.ServerTimingMiddleware',
+    'monitoring.slowqueries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'monitoring.querybudget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -101,6 +108,23 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Production needs a backend shared by every worker (Redis, Memcached): the
+# catalog cache version, the join waiting room, the slow query buffer and the
+# access token claims versions live here. With a per-process LocMem cache each
+# worker only sees its own changes, admits joins at the full rate on its own,
+# lists its own slow queries and keeps accepting tokens revoked elsewhere
+# (tokens it has never seen cost one query each). `check --deploy` reports it.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'sportsplatform'),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -141,14 +165,76 @@ CORS_ALLOWED_ORIGINS = [
     'http://127.0.0.1:3000',
 ]
 
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+
 STATIC_URL = 'static/'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
 }
 
+# Access tokens carry the user's role and display claims so authenticated
+# requests need no user query; refreshing re-reads them from the database.
+SIMPLE_JWT = {
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.ClaimsTokenRefreshSerializer',
+}
+
+
+# Seconds public catalog responses are cached for (0 disables). Entries are
+# also dropped as soon as an event, ticket type or media changes. Joins and
+# ticket holds do not drop them: seat counts in cached lists may lag by up to
+# this long, while event details key their entry on an ETag that covers them.
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', '60'))
+
+# Seconds the unfiltered catalog facet counts are cached for (0 disables).
+EVENT_FACETS_CACHE_TIMEOUT = int(os.getenv('EVENT_FACETS_CACHE_TIMEOUT', '300'))
+
+# Joins admitted per second and per event by the registration waiting room
+# (0 disables it). Requests above the rate get a queue position and Retry-After.
+EVENT_JOIN_ADMISSION_RATE = int(os.getenv('EVENT_JOIN_ADMISSION_RATE', '25'))
+
+# Lifetime of a ticket hold in seconds, and the most tickets one hold may take.
+TICKET_HOLD_SECONDS = int(os.getenv('TICKET_HOLD_SECONDS', '600'))
+TICKET_HOLD_MAX_QUANTITY = int(os.getenv('TICKET_HOLD_MAX_QUANTITY', '10'))
+
+# Seconds a response to a POST carrying an Idempotency-Key is kept for
+# replaying retries (0 disables).
+IDEMPOTENCY_KEY_TIMEOUT = int(os.getenv('IDEMPOTENCY_KEY_TIMEOUT', '3600'))
+
+# Query budgets declared on views: "warn" logs overruns, "raise" fails the
+# request, empty disables the check. Defaults to "warn" when DEBUG is on.
+QUERY_BUDGET_MODE = os.getenv('QUERY_BUDGET_MODE', 'warn' if DEBUG else '')
+
+# Fraction of requests that get a Server-Timing header and a JSON timing log
+# line, e.g. 0.05 in production (0 disables, 1 measures every request).
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv('SERVER_TIMING_SAMPLE_RATE', '0'))
+
+# Request, cache and booking metrics served at /api/monitoring/metrics/.
+# Set METRICS_DIR to a directory shared by the workers (emptied on deploy) so
+# every worker writes its own mmap file and the endpoint sums them.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+
+# Queries slower than this many milliseconds are logged with their EXPLAIN
+# and kept in a ring buffer at /api/monitoring/slow-queries/ (0 disables).
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '500'))
+SLOW_QUERY_BUFFER_SIZE = int(os.getenv('SLOW_QUERY_BUFFER_SIZE', '100'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'monitoring': {
+            'handlers': ['console'],
+            'level': os.getenv('MONITORING_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
@@ -7,4 +7,5 @@ urlpatterns = [
     path("api/auth/", include("accounts.urls")),
     path("api/contact/", include("contact.urls")),
     path("api/marketplace/", include("events.urls")),
+    path("api/monitoring/", include("monitoring.urls")),
 ]
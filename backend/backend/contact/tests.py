@@ -1,3 +1,20 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from monitoring.testing import QueryBudgetTestMixin
+
+from .models import ContactMessage
+
+
+class ContactQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    client_class = APIClient
+
+    def test_submit(self):
+        response = self.assertQueryBudget("POST", "/api/contact/submit/", {
+            "name": "Ines",
+            "email": "ines@example.com",
+            "role": "partner",
+            "message": "Bonjour",
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(ContactMessage.objects.count(), 1)
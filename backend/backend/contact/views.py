@@ -2,11 +2,14 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from monitoring.timing import TimedViewMixin
+
 from .serializers import ContactMessageSerializer
 
 
-class ContactSubmitView(APIView):
+class ContactSubmitView(TimedViewMixin, APIView):
     permission_classes = [permissions.AllowAny]
+    query_budget = 1
 
     def post(self, request):
         serializer = ContactMessageSerializer(data=request.data)
@@ -1,11 +1,13 @@
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
 
+from monitoring.timing import TimedViewMixin
+
 from .models import PageContent
 from .serializers import PageContentSerializer
 
 
-class PageContentDetailView(generics.RetrieveAPIView):
+class PageContentDetailView(TimedViewMixin, generics.RetrieveAPIView):
     serializer_class = PageContentSerializer
     permission_classes = [AllowAny]
     lookup_field = "slug"
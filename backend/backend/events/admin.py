@@ -1,11 +1,14 @@
 from django.contrib import admin, messages
 from django.utils import timezone
 
+from .caching import bump_catalog_version
+from .catalog import sync_catalog
 from .models import (
     Event,
     EventCategory,
     EventMedia,    Favorite,
-    Location,    Sport,    TicketType,
+    Location,    Sport,    TicketHold,    TicketType,
+    WaitlistEntry,
 )
 
 
@@ -52,10 +55,13 @@ class EventAdmin(admin.ModelAdmin):
                 level=messages.WARNING,
             )
             return
+        event_ids = list(pending.values_list("pk", flat=True))
         updated = pending.update(
             status=Event.Status.PUBLISHED,
             published_at=timezone.now(),
         )
+        sync_catalog(event_ids)
+        bump_catalog_version()
         self.message_user(request, f"{updated} evenement(s) publie(s).")
 
     @admin.action(description="Rejeter les evenements selectionnes")
@@ -68,10 +74,13 @@ class EventAdmin(admin.ModelAdmin):
                 level=messages.WARNING,
             )
             return
+        event_ids = list(pending.values_list("pk", flat=True))
         updated = pending.update(
             status=Event.Status.REJECTED,
             published_at=None,
         )
+        sync_catalog(event_ids)
+        bump_catalog_version()
         self.message_user(request, f"{updated} evenement(s) rejete(s).")
 
 
@@ -86,11 +95,31 @@ class TicketTypeAdmin(admin.ModelAdmin):
     list_display = ("event", "name", "price", "quantity_total", "quantity_sold")
     list_filter = ("event",)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related("stock_slots")
+
+    def get_readonly_fields(self, request, obj=None):
+        # The stock of an existing ticket type is resized through the
+        # organizer API, which spreads it over the stock slots.
+        return ("quantity_total",) if obj else ()
+
+
 
 
 
 
 
+@admin.register(TicketHold)
+class TicketHoldAdmin(admin.ModelAdmin):
+    list_display = ("ticket_type", "user", "quantity", "status", "expires_at")
+    list_filter = ("status",)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ("event", "user", "created_at")
+    list_filter = ("event",)
+
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
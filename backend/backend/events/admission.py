@@ -0,0 +1,62 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+ROOM_TIMEOUT = 3600
+# The served mark moves in steps of 1/TICKS_PER_SECOND seconds.
+TICKS_PER_SECOND = 10
+
+
+def _keys(room):
+    prefix = f"events:joinroom:{room}"
+    return f"{prefix}:tail", f"{prefix}:served"
+
+
+def _advance(served_key, tail, rate):
+    # Token bucket: the served mark moves `rate` tickets per second but never
+    # past the last ticket handed out, so an idle room refills to one burst.
+    # Only the first request of each tick may move it (cache.add is atomic),
+    # so the read-modify-write below never races another writer. The wall
+    # clock is used because every worker has to agree on the tick.
+    tick = int(time.time() * TICKS_PER_SECOND)
+    writer = cache.add(f"{served_key}:tick:{tick}", 1, 60)
+    served, last_tick = cache.get(served_key) or (0.0, tick - 1)
+    if writer and tick > last_tick:
+        served = min(float(tail), served + (tick - last_tick) * rate / TICKS_PER_SECOND)
+        cache.set(served_key, (served, tick), ROOM_TIMEOUT)
+    return served
+
+
+def admit(room, user_id):
+    """Return None when `user_id` may join `room` now, else (position, retry_after).
+
+    Each user keeps the ticket handed out on their first attempt, so retries
+    keep their place in the queue. The room lives in the default cache, which
+    must be shared by every worker for the rate to be global.
+    """
+    rate = settings.EVENT_JOIN_ADMISSION_RATE
+    if rate <= 0:
+        return None
+
+    tail_key, served_key = _keys(room)
+    user_key = f"events:joinroom:{room}:user:{user_id}"
+    ticket = cache.get(user_key)
+    if ticket is None:
+        cache.add(tail_key, 0, ROOM_TIMEOUT)
+        ticket = cache.incr(tail_key)
+        # incr() keeps the original expiry: a rush longer than ROOM_TIMEOUT
+        # would restart numbering below the tickets already handed out.
+        cache.touch(tail_key, ROOM_TIMEOUT)
+        if not cache.add(user_key, ticket, ROOM_TIMEOUT):
+            # A concurrent request of the same user got its ticket first.
+            ticket = cache.get(user_key, ticket)
+
+    served = _advance(served_key, cache.get(tail_key, ticket), rate)
+    position = ticket - math.floor(served + rate)
+    if position <= 0:
+        cache.delete(user_key)
+        return None
+    return position, math.ceil(position / rate)
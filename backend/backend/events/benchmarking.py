@@ -0,0 +1,57 @@
+import math
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (0 when empty)."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies, elapsed, queries=None):
+    """Throughput and latency percentiles (in ms) for one measured scenario."""
+    summary = {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+    if queries is not None:
+        summary["queries_per_request"] = round(sum(queries) / len(queries), 2) if queries else 0
+    return summary
+
+
+def compare_results(baseline, current, tolerance=0.1):
+    """List the regressions of `current` against `baseline`.
+
+    Both are {scale: {scenario: summary}} mappings. Latency or throughput
+    moving more than `tolerance` the wrong way, or any extra query per
+    request, counts as a regression.
+    """
+    regressions = []
+    for scale, scenarios in current.items():
+        for name, summary in scenarios.items():
+            before = baseline.get(scale, {}).get(name)
+            if not before:
+                continue
+            for metric in ("p50_ms", "p95_ms", "p99_ms"):
+                if before[metric] and summary[metric] > before[metric] * (1 + tolerance):
+                    regressions.append((scale, name, metric, before[metric], summary[metric]))
+            if summary["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+                regressions.append(
+                    (scale, name, "throughput_rps", before["throughput_rps"], summary["throughput_rps"])
+                )
+            if summary.get("queries_per_request", 0) > before.get("queries_per_request", 0):
+                regressions.append(
+                    (
+                        scale,
+                        name,
+                        "queries_per_request",
+                        before.get("queries_per_request", 0),
+                        summary["queries_per_request"],
+                    )
+                )
+    return regressions
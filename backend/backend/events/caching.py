@@ -0,0 +1,109 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from monitoring.metrics import record_cache
+
+
+CATALOG_VERSION_KEY = "events:catalog:version"
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a version lost to eviction is never reused.
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        version = int(time.time() * 1000)
+        cache.set(CATALOG_VERSION_KEY, version, None)
+        return version
+
+
+def normalize_query(params):
+    pairs = []
+    for key in sorted(params.keys()):
+        values = sorted(value for value in params.getlist(key) if value != "")
+        pairs.extend((key, value) for value in values)
+    return urlencode(pairs)
+
+
+def catalog_cache_key(prefix, request, etag=""):
+    url = request.build_absolute_uri(request.path)
+    query = normalize_query(request.query_params)
+    digest = hashlib.sha1(f"{url}?{query}#{etag}".encode()).hexdigest()
+    return f"events:catalog:{get_catalog_version()}:{prefix}:{digest}"
+
+
+class CatalogCacheMixin:
+    """Serve GET responses from the cache until the catalog version changes."""
+
+    def get(self, request, *args, **kwargs):
+        timeout = getattr(settings, "CATALOG_CACHE_TIMEOUT", 60)
+        if not timeout:
+            return super().get(request, *args, **kwargs)
+
+        # Views with validators key on their ETag so the body always matches it.
+        key = catalog_cache_key(type(self).__name__, request, getattr(self, "etag", ""))
+        data = cache.get(key)
+        record_cache("catalog", data is not None)
+        if data is not None:
+            return Response(data)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout)
+        return response
+
+
+def build_etag(*parts):
+    digest = hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+class ConditionalGetMixin:
+    """Answer If-None-Match / If-Modified-Since before the view does any work.
+
+    Subclasses define `get_validators()`, returning `(etag, last_modified)`,
+    or None when the object does not exist so the normal 404 path runs.
+    `last_modified` may be None when no timestamp tracks every change.
+    """
+
+    cache_control_max_age = 0
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators(request, *args, **kwargs)
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        self.etag = etag
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if not_modified is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        else:
+            response = not_modified
+
+        response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+        if self.cache_control_max_age:
+            patch_cache_control(response, public=True, max_age=self.cache_control_max_age)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
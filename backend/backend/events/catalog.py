@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models import Case, F, Min, Value, When
+
+from .models import CatalogEntry, Event
+from .search import normalize
+
+
+COPIED_FIELDS = (
+    "title",
+    "slug",
+    "short_description",
+    "sport_id",
+    "category_id",
+    "event_type",
+    "level_required",
+    "start_at",
+    "end_at",
+    "timezone",
+    "capacity_total",
+    "capacity_reserved",
+    "is_free",
+    "currency",
+    "cancellation_policy",
+    "cancellation_public",
+    "cover_image_url",
+    "status",
+    "organizer_name",
+)
+SYNC_CHUNK_SIZE = 500
+
+
+def build_catalog_entry(event):
+    values = {field: getattr(event, field) for field in COPIED_FIELDS}
+    location = event.location
+    return CatalogEntry(
+        event_id=event.pk,
+        sport_slug=event.sport.slug,
+        sport_name=event.sport.name,
+        category_slug=event.category.slug,
+        category_name=event.category.name,
+        city=location.city,
+        city_normalized=normalize(location.city).strip()[:80],
+        country=location.country,
+        latitude=location.latitude,
+        longitude=location.longitude,
+        seats_available=max(event.capacity_total - event.capacity_reserved, 0),
+        min_price=event.min_price,
+        **values,
+    )
+
+
+def sync_catalog(event_ids):
+    """Rebuild the catalog rows of `event_ids` from their current Event state.
+
+    Published events get a fresh row, every other event loses its row.
+    """
+    event_ids = list(dict.fromkeys(event_ids))
+    for start in range(0, len(event_ids), SYNC_CHUNK_SIZE):
+        chunk = event_ids[start:start + SYNC_CHUNK_SIZE]
+        events = (
+            Event.objects.filter(pk__in=chunk, status=Event.Status.PUBLISHED)
+            .select_related("sport", "category", "location")
+            .annotate(min_price=Min("ticket_types__price"))
+        )
+        entries = [build_catalog_entry(event) for event in events]
+        with transaction.atomic():
+            CatalogEntry.objects.filter(pk__in=chunk).delete()
+            CatalogEntry.objects.bulk_create(entries)
+
+
+def adjust_reserved_seats(event_id, delta):
+    """Mirror a capacity_reserved change made with update() on the Event row."""
+    entries = CatalogEntry.objects.filter(pk=event_id)
+    if delta < 0:
+        entries = entries.filter(capacity_reserved__gte=-delta)
+    reserved = F("capacity_reserved") + delta
+    # seats_available is assigned first: MySQL evaluates SET clauses left to
+    # right against the already-updated columns.
+    entries.update(
+        seats_available=Case(
+            When(capacity_total__gt=reserved, then=F("capacity_total") - reserved),
+            default=Value(0),
+        ),
+        capacity_reserved=reserved,
+    )
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process.",
+            hint=(
+                "The catalog cache version and the join waiting room live in the cache: "
+                "a change seen by one worker does not invalidate the others, and every "
+                "worker admits EVENT_JOIN_ADMISSION_RATE joins per second on its own. Set "
+                "CACHE_BACKEND to a shared backend such as Redis or Memcached."
+            ),
+            id="events.W001",
+        )
+    ]
@@ -0,0 +1,73 @@
+from django.db.models import F
+from rest_framework import serializers
+
+from .serializers import EventListSerializer
+
+
+LIST_FIELDS = tuple(EventListSerializer.Meta.fields)
+DATETIME_FIELDS = frozenset(("start_at", "end_at"))
+
+_datetime_field = serializers.DateTimeField()
+
+
+# Where each list field comes from: a column name, or an expression that is
+# annotated under the field's own name. Unlisted fields are same-named columns.
+EVENT_SOURCES = {
+    "sport": "sport_id",
+    "category": "category_id",
+    "sport_name": F("sport__name"),
+    "category_name": F("category__name"),
+    "city": F("location__city"),
+    "country": F("location__country"),
+}
+CATALOG_SOURCES = {
+    "id": "event_id",
+    "sport": "sport_id",
+    "category": "category_id",
+}
+
+
+def event_list_values(queryset, fields=LIST_FIELDS, extra=(), sources=EVENT_SOURCES):
+    """Return a values() queryset holding everything `render_event_rows` needs.
+
+    Joined names are selected in the same query, so rendering a row is plain
+    dict work instead of one DRF field call per attribute.
+    """
+    annotations = {}
+    columns = [sources.get("id", "id"), *extra]
+    for name in fields:
+        source = sources.get(name, name)
+        if name == "capacity_available":
+            columns += ["capacity_total", "capacity_reserved"]
+        elif isinstance(source, str):
+            columns.append(source)
+        else:
+            annotations[name] = source
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    return queryset.values(*dict.fromkeys([*columns, *annotations]))
+
+
+def render_event_rows(rows, fields=LIST_FIELDS, sources=EVENT_SOURCES):
+    """Render rows from `event_list_values` exactly as EventListSerializer would."""
+    keys = {}
+    for name in fields:
+        source = sources.get(name, name)
+        keys[name] = source if isinstance(source, str) else name
+
+    data = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            if name == "capacity_available":
+                value = max(row["capacity_total"] - row["capacity_reserved"], 0)
+            else:
+                value = row[keys[name]]
+                if name in DATETIME_FIELDS and value is not None:
+                    value = _datetime_field.to_representation(value)
+            item[name] = value
+        distance_km = row.get("distance_km")
+        if distance_km is not None:
+            item["distance_km"] = round(distance_km, 2)
+        data.append(item)
+    return data
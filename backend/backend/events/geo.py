@@ -0,0 +1,64 @@
+import math
+
+from django.db.models import F, FloatField
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.045
+DEFAULT_RADIUS_KM = 25
+MAX_RADIUS_KM = 500
+
+
+def parse_point(value):
+    try:
+        lat_text, lng_text = value.split(",")
+        lat, lng = float(lat_text), float(lng_text)
+    except (AttributeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+def bounding_box(lat, lng, radius_km):
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = max(lat - lat_delta, -90.0), min(lat + lat_delta, 90.0)
+
+    cos_lat = math.cos(math.radians(lat))
+    if cos_lat < 1e-6 or max_lat >= 90 or min_lat <= -90:
+        return min_lat, max_lat, None, None
+    lng_delta = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    min_lng, max_lng = lng - lng_delta, lng + lng_delta
+    if min_lng < -180 or max_lng > 180:
+        # The box wraps the antimeridian; only the latitude band is indexed.
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def haversine_km(lat_field, lng_field, lat, lng):
+    lat1 = math.radians(lat)
+    lat2 = Radians(Cast(lat_field, FloatField()))
+    dlat = lat2 - lat1
+    dlng = Radians(Cast(lng_field, FloatField())) - math.radians(lng)
+    a = Power(Sin(dlat / 2), 2) + math.cos(lat1) * Cos(lat2) * Power(Sin(dlng / 2), 2)
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+def filter_near(queryset, lat, lng, radius_km, prefix="location__"):
+    """Restrict `queryset` to rows within `radius_km` and annotate `distance_km`.
+
+    The latitude/longitude box filter is served by the Location index; the
+    exact haversine distance is only evaluated on rows that survive it.
+    """
+    lat_field, lng_field = f"{prefix}latitude", f"{prefix}longitude"
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    queryset = queryset.filter(**{f"{lat_field}__range": (min_lat, max_lat)})
+    if min_lng is not None:
+        queryset = queryset.filter(**{f"{lng_field}__range": (min_lng, max_lng)})
+    else:
+        queryset = queryset.filter(**{f"{lng_field}__isnull": False})
+    queryset = queryset.annotate(
+        distance_km=haversine_km(F(lat_field), F(lng_field), lat, lng)
+    )
+    return queryset.filter(distance_km__lte=radius_km)
@@ -0,0 +1,183 @@
+import random
+from collections import Counter
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .joins import retry_deadlocks
+from .models import STOCK_SLOTS, TicketHold, TicketStockSlot, split_stock
+
+
+class SoldOut(Exception):
+    pass
+
+
+class HoldUnavailable(Exception):
+    pass
+
+
+def _take_from(ticket_type_id, slot, quantity):
+    # One conditional UPDATE: the check and the decrement cannot be split by
+    # a concurrent checkout. The slot row stays locked until the hold commits.
+    return TicketStockSlot.objects.filter(
+        ticket_type_id=ticket_type_id,
+        slot=slot,
+        quantity_total__gte=F("quantity_sold") + F("quantity_held") + quantity,
+    ).update(quantity_held=F("quantity_held") + quantity)
+
+
+def _gather(ticket_type_id, quantity):
+    # Slow path once slots run low: lock every slot, in slot order so that
+    # two gatherers cannot deadlock, and move free tickets into the fullest.
+    slots = list(TicketStockSlot.objects.select_for_update().filter(ticket_type_id=ticket_type_id))
+    free = {slot: slot.quantity_total - slot.quantity_sold - slot.quantity_held for slot in slots}
+    if sum(free.values()) < quantity:
+        return None
+    target = max(slots, key=free.get)
+    missing = quantity - free[target]
+    for slot in slots:
+        moved = min(missing, free[slot]) if slot is not target else 0
+        if moved > 0:
+            slot.quantity_total -= moved
+            target.quantity_total += moved
+            missing -= moved
+    target.quantity_held += quantity
+    TicketStockSlot.objects.bulk_update(slots, ["quantity_total", "quantity_held"])
+    return target.slot
+
+
+def _take(ticket_type_id, quantity):
+    """Take `quantity` tickets from one stock slot and return it, or None if sold out.
+
+    A random slot is tried first, so concurrent checkouts of the same ticket
+    type usually lock different rows; only when it cannot cover the hold are
+    the slots with room tried, in slot order, then the free stock gathered
+    into one slot. The missed slot stays locked on InnoDB, so two checkouts
+    can still deadlock: callers retry through retry_deadlocks().
+    """
+    slot = random.randrange(STOCK_SLOTS)
+    if _take_from(ticket_type_id, slot, quantity):
+        return slot
+    candidates = list(
+        TicketStockSlot.objects.filter(
+            ticket_type_id=ticket_type_id,
+            quantity_total__gte=F("quantity_sold") + F("quantity_held") + quantity,
+        ).values_list("slot", flat=True)
+    )
+    for slot in sorted(candidates):
+        if _take_from(ticket_type_id, slot, quantity):
+            return slot
+    return _gather(ticket_type_id, quantity)
+
+
+def resize_stock(ticket_type, quantity_total):
+    """Spread a new `quantity_total` over the stock slots of `ticket_type`.
+
+    Returns False, changing nothing, when fewer tickets would remain than are
+    already sold or held. Must run inside a transaction, retried on deadlocks
+    like the checkouts it locks against.
+    """
+    slots = list(TicketStockSlot.objects.select_for_update().filter(ticket_type=ticket_type))
+    taken = sum(slot.quantity_sold + slot.quantity_held for slot in slots)
+    if quantity_total < taken:
+        return False
+    for slot, share in zip(slots, split_stock(quantity_total - taken, len(slots))):
+        slot.quantity_total = slot.quantity_sold + slot.quantity_held + share
+    TicketStockSlot.objects.bulk_update(slots, ["quantity_total"])
+    return True
+
+
+def _hold(ticket_type_id, user_id, quantity, expires_at):
+    with transaction.atomic():
+        slot = _take(ticket_type_id, quantity)
+        if slot is None:
+            return None
+        return TicketHold.objects.create(
+            ticket_type_id=ticket_type_id,
+            user_id=user_id,
+            quantity=quantity,
+            slot=slot,
+            expires_at=expires_at,
+        )
+
+
+def hold_tickets(ticket_type_id, user_id, quantity):
+    """Hold `quantity` tickets for `user_id` until TICKET_HOLD_SECONDS elapse."""
+    expires_at = timezone.now() + timedelta(seconds=settings.TICKET_HOLD_SECONDS)
+    for attempt in range(2):
+        hold = retry_deadlocks(partial(_hold, ticket_type_id, user_id, quantity, expires_at))
+        if hold is not None:
+            return hold
+        # Stale holds may be what is blocking the sale: reclaim them once.
+        if attempt or not expire_holds(ticket_type_id=ticket_type_id):
+            break
+    raise SoldOut
+
+
+def _settle(hold_id, user_id, status):
+    with transaction.atomic():
+        hold = TicketHold.objects.filter(pk=hold_id, user_id=user_id).first()
+        if hold is None:
+            raise HoldUnavailable
+        moved = TicketHold.objects.filter(
+            pk=hold.pk,
+            status=TicketHold.Status.ACTIVE,
+            expires_at__gt=timezone.now(),
+        ).update(status=status, updated_at=timezone.now())
+        if not moved:
+            raise HoldUnavailable
+        counters = {"quantity_held": F("quantity_held") - hold.quantity}
+        if status == TicketHold.Status.CONFIRMED:
+            counters["quantity_sold"] = F("quantity_sold") + hold.quantity
+        TicketStockSlot.objects.filter(ticket_type_id=hold.ticket_type_id, slot=hold.slot).update(**counters)
+        hold.status = status
+    return hold
+
+
+def confirm_hold(hold_id, user_id):
+    """Turn an active hold into sold tickets."""
+    return retry_deadlocks(partial(_settle, hold_id, user_id, TicketHold.Status.CONFIRMED))
+
+
+def release_hold(hold_id, user_id):
+    """Give an active hold back to the pool."""
+    return retry_deadlocks(partial(_settle, hold_id, user_id, TicketHold.Status.RELEASED))
+
+
+def _expire_batch(batch_size, ticket_type_id):
+    with transaction.atomic():
+        expired = TicketHold.objects.select_for_update(skip_locked=True).filter(
+            status=TicketHold.Status.ACTIVE,
+            expires_at__lte=timezone.now(),
+        )
+        if ticket_type_id is not None:
+            expired = expired.filter(ticket_type_id=ticket_type_id)
+        batch = list(expired.values_list("pk", "ticket_type_id", "slot", "quantity")[:batch_size])
+        if not batch:
+            return 0, 0
+        TicketHold.objects.filter(pk__in=[pk for pk, _, _, _ in batch]).update(
+            status=TicketHold.Status.EXPIRED, updated_at=timezone.now()
+        )
+        quantities = Counter()
+        for _, type_id, slot, quantity in batch:
+            quantities[type_id, slot] += quantity
+        for (type_id, slot), quantity in sorted(quantities.items()):
+            TicketStockSlot.objects.filter(ticket_type_id=type_id, slot=slot).update(
+                quantity_held=F("quantity_held") - quantity
+            )
+    return len(batch), sum(quantities.values())
+
+
+def expire_holds(batch_size=500, ticket_type_id=None):
+    """Reclaim expired holds in batches; returns the number of tickets freed."""
+    freed = 0
+    while True:
+        expired, tickets = retry_deadlocks(partial(_expire_batch, batch_size, ticket_type_id))
+        freed += tickets
+        if expired < batch_size:
+            break
+    return freed
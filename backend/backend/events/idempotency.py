@@ -0,0 +1,87 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+PENDING = "pending"
+# How long a request may hold its key before a retry is allowed to run again.
+PENDING_TIMEOUT = 60
+
+
+def _replay(stored):
+    response = Response(stored["data"], status=stored["status"], headers=stored["headers"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+class IdempotentPostMixin:
+    """Replay the first response to a POST retried with the same Idempotency-Key.
+
+    Responses are stored per user, path and key for IDEMPOTENCY_KEY_TIMEOUT
+    seconds. A retry that arrives while the first request is still running
+    gets a 409, and reusing a key with a different body gets a 422.
+
+    Views that write their own post() route it through idempotent_post().
+    """
+
+    def post(self, request, *args, **kwargs):
+        return self.idempotent_post(super().post, request, *args, **kwargs)
+
+    def idempotent_post(self, handler, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        timeout = getattr(settings, "IDEMPOTENCY_KEY_TIMEOUT", 3600)
+        if not key or not timeout:
+            return handler(request, *args, **kwargs)
+        if len(key) > 255:
+            raise ValidationError({"detail": "Idempotency-Key trop long."})
+
+        scope = f"{request.user.pk}:{request.path}:{key}"
+        cache_key = f"events:idempotency:{hashlib.sha256(scope.encode()).hexdigest()}"
+        fingerprint = hashlib.sha256(request.body).hexdigest()
+
+        if not cache.add(cache_key, {"state": PENDING, "fingerprint": fingerprint}, PENDING_TIMEOUT):
+            stored = cache.get(cache_key) or {}
+            if stored.get("fingerprint") != fingerprint:
+                return Response(
+                    {"detail": "Idempotency-Key deja utilisee pour une autre requete."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if stored.get("state") == PENDING:
+                return Response(
+                    {"detail": "Requete deja en cours de traitement."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            return _replay(stored)
+
+        try:
+            try:
+                response = handler(request, *args, **kwargs)
+            except Exception as exc:
+                response = self.handle_exception(exc)
+        except BaseException:
+            # handle_exception re-raises anything DRF does not turn into a
+            # response, which ends up as a 500: free the key for the retry.
+            cache.delete(cache_key)
+            raise
+
+        # Server errors and waiting-room rejections are worth retrying for real.
+        if response.status_code >= 500 or response.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+            cache.delete(cache_key)
+        else:
+            cache.set(
+                cache_key,
+                {
+                    "state": "done",
+                    "fingerprint": fingerprint,
+                    "status": response.status_code,
+                    "data": response.data,
+                    "headers": dict(response.headers),
+                },
+                timeout,
+            )
+        return response
@@ -0,0 +1,233 @@
+import csv
+import io
+import json
+import operator
+import time
+from functools import reduce
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from .caching import bump_catalog_version
+from .catalog import sync_catalog
+from .models import (
+    SLUG_SAVE_ATTEMPTS,
+    Event,
+    EventCategory,
+    Location,
+    Sport,
+    TicketType,
+    allocate_slugs,
+    create_stock_slots,
+    organizer_display_name,
+)
+from .search import index_events
+from .serializers import EventImportSerializer, LocationSerializer
+
+
+IMPORT_CHUNK_SIZE = 200
+FILE_FORMATS = {".csv": "csv", ".json": "json", ".jsonl": "json", ".ndjson": "json"}
+LOCATION_FIELDS = tuple(LocationSerializer.Meta.fields)
+NULLABLE_LOCATION_FIELDS = {"latitude", "longitude"}
+
+
+def file_format(filename):
+    for extension, name in FILE_FORMATS.items():
+        if filename.lower().endswith(extension):
+            return name
+    return None
+
+
+def read_rows(stream, fmt):
+    """Yield one dict per event from a binary CSV or JSON stream.
+
+    CSV rows are flat: location columns sit next to the event columns and
+    `tickets` holds "name:price:quantity" entries separated by ";". JSON is
+    either an array or one object per line, with nested `location` and
+    `ticket_types`. Neither format is read into memory at once.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        return (_from_csv(row) for row in csv.DictReader(text))
+    return _iter_json(text)
+
+
+def _from_csv(row):
+    row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+    data = {key: value for key, value in row.items() if value and key not in LOCATION_FIELDS}
+    data["location"] = {key: row[key] for key in LOCATION_FIELDS if row.get(key)}
+    tickets = data.pop("tickets", "")
+    data["ticket_types"] = []
+    for entry in filter(None, (part.strip() for part in tickets.split(";"))):
+        name, _sep, rest = entry.partition(":")
+        price, _sep, quantity = rest.partition(":")
+        data["ticket_types"].append({"name": name, "price": price, "quantity_total": quantity or 0})
+    return data
+
+
+def _iter_json(text, read_size=64 * 1024):
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,[]")
+        if buffer:
+            try:
+                value, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield value
+                buffer = buffer[end:]
+                continue
+        elif eof:
+            return
+        chunk = text.read(read_size)
+        eof = not chunk
+        buffer += chunk
+
+
+class EventImporter:
+    """Validate and bulk insert events for one organizer, chunk by chunk.
+
+    Invalid rows are reported and skipped; every chunk of valid rows is
+    written in its own transaction.
+    """
+
+    def __init__(self, organizer, is_staff=False, chunk_size=IMPORT_CHUNK_SIZE):
+        self.organizer = organizer
+        self.organizer_name = organizer_display_name(organizer)
+        self.chunk_size = chunk_size
+        sports = {sport.pk: sport for sport in Sport.objects.all()}
+        categories = {category.pk: category for category in EventCategory.objects.all()}
+        self.sport_ids = {sport.slug: pk for pk, sport in sports.items()}
+        self.category_ids = {(category.sport_id, category.slug): pk for pk, category in categories.items()}
+        context = {"preloaded": {Sport: sports, EventCategory: categories}, "is_staff": is_staff}
+        # One serializer validates every row: building a ModelSerializer's
+        # fields costs more than validating the row itself.
+        self.serializer = EventImportSerializer(context=context)
+        self.locations = {}
+        self.rows = 0
+        self.created = 0
+        self.errors = []
+
+    def run(self, rows):
+        started = time.perf_counter()
+        chunk = []
+        try:
+            for number, row in enumerate(rows, start=1):
+                self.rows = number
+                data = self._validate(number, row)
+                if data is not None:
+                    chunk.append(data)
+                if len(chunk) >= self.chunk_size:
+                    self._flush(chunk)
+                    chunk = []
+        except (ValueError, csv.Error) as exc:
+            self.errors.append({"row": self.rows + 1, "errors": {"file": [f"Fichier illisible: {exc}"]}})
+        if chunk:
+            self._flush(chunk)
+        if self.created:
+            bump_catalog_version()
+
+        elapsed = time.perf_counter() - started
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "errors": self.errors,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(self.rows / elapsed, 1) if elapsed else 0,
+        }
+
+    def _resolve(self, row):
+        # Sports and categories may be given by slug; categories are scoped by sport.
+        row = dict(row)
+        sport = row.get("sport")
+        if isinstance(sport, str):
+            sport = int(sport) if sport.isdigit() else self.sport_ids.get(sport, sport)
+            row["sport"] = sport
+        category = row.get("category")
+        if isinstance(category, str) and not category.isdigit():
+            row["category"] = self.category_ids.get((sport, category), category)
+        return row
+
+    def _validate(self, number, row):
+        if not isinstance(row, dict):
+            self.errors.append({"row": number, "errors": {"non_field_errors": ["Ligne invalide."]}})
+            return None
+        try:
+            data = dict(self.serializer.run_validation(self._resolve(row)))
+        except ValidationError as exc:
+            self.errors.append({"row": number, "errors": as_serializer_error(exc)})
+            return None
+        self.serializer._apply_status(None, data)
+        return data
+
+    def _flush(self, chunk):
+        for attempt in range(SLUG_SAVE_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    created = self._insert(chunk)
+                break
+            except IntegrityError:
+                # A concurrent writer took one of the allocated slugs: the
+                # chunk was rolled back, locations created with it included.
+                self.locations = {}
+                if attempt == SLUG_SAVE_ATTEMPTS - 1:
+                    raise
+        self.created += created
+
+    def _insert(self, chunk):
+        location_ids = self._location_ids([data["location"] for data in chunk])
+        slugs = allocate_slugs(Event, [data["title"] for data in chunk], max_length=180)
+        events = [
+            Event(
+                organizer_id=self.organizer.pk,
+                organizer_name=self.organizer_name,
+                slug=slug,
+                location_id=location_id,
+                **{key: value for key, value in data.items() if key not in ("location", "ticket_types")},
+            )
+            for data, slug, location_id in zip(chunk, slugs, location_ids)
+        ]
+        Event.objects.bulk_create(events)
+        # MySQL does not return primary keys from bulk inserts.
+        ids = dict(Event.objects.filter(slug__in=slugs).values_list("slug", "id"))
+        for event in events:
+            event.pk = ids[event.slug]
+        TicketType.objects.bulk_create(
+            TicketType(event_id=event.pk, **ticket)
+            for event, data in zip(events, chunk)
+            for ticket in data.get("ticket_types", [])
+        )
+        create_stock_slots(TicketType.objects.filter(event_id__in=ids.values()).only("id", "quantity_total"))
+        index_events(events)
+        sync_catalog([event.pk for event in events])
+        return len(events)
+
+    def _location_ids(self, locations):
+        """Map each location to an existing matching row, creating the missing ones."""
+        keys = [self._location_key(location) for location in locations]
+        missing = {key for key in keys if key not in self.locations}
+        if missing:
+            self._load_locations(missing)
+            new = [key for key in missing if key not in self.locations]
+            if new:
+                Location.objects.bulk_create(Location(**dict(zip(LOCATION_FIELDS, key))) for key in new)
+                self._load_locations(new)
+        return [self.locations[key] for key in keys]
+
+    def _load_locations(self, keys):
+        lookup = reduce(operator.or_, (Q(**dict(zip(LOCATION_FIELDS, key))) for key in keys))
+        rows = Location.objects.filter(lookup).order_by("-id").values_list("id", *LOCATION_FIELDS)
+        for row in rows:
+            self.locations[tuple(row[1:])] = row[0]
+
+    def _location_key(self, location):
+        return tuple(
+            location.get(field, None if field in NULLABLE_LOCATION_FIELDS else "")
+            for field in LOCATION_FIELDS
+        )
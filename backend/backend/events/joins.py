@@ -0,0 +1,147 @@
+import random
+import time
+from functools import partial
+
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import F, Q
+
+from monitoring.metrics import WAITLIST_PROMOTIONS
+
+from .catalog import adjust_reserved_seats
+from .models import Event, EventParticipant, WaitlistEntry
+
+
+JOINED = "joined"
+ALREADY_JOINED = "already_joined"
+FULL = "full"
+
+DEADLOCK_RETRIES = 3
+MYSQL_DEADLOCK = 1213
+
+
+class _EventFull(Exception):
+    pass
+
+
+def retry_deadlocks(operation):
+    """Run `operation`, running it again when InnoDB picks it as a deadlock victim.
+
+    The victim's whole transaction is rolled back, so only an outermost
+    transaction can be retried; inside an outer atomic block the error is
+    raised for the caller to retry.
+    """
+    nested = connection.in_atomic_block
+    for attempt in range(DEADLOCK_RETRIES):
+        try:
+            return operation()
+        except OperationalError as exc:
+            deadlock = bool(exc.args) and exc.args[0] == MYSQL_DEADLOCK
+            if nested or not deadlock or attempt == DEADLOCK_RETRIES - 1:
+                raise
+            time.sleep(random.uniform(0, 0.01 * (attempt + 1)))
+
+
+def join_event(event_id, user_id):
+    """Reserve one seat for `user_id`; returns JOINED, ALREADY_JOINED or FULL.
+
+    The seat is taken first with a single conditional UPDATE (reserved <
+    total), so concurrent joins can never oversell. That UPDATE takes the
+    event row's exclusive lock before the participant insert's foreign key
+    check asks for a shared one; the other order deadlocks concurrent joins
+    on InnoDB. A duplicate participant rolls the seat back with the rest of
+    the transaction.
+    """
+    return retry_deadlocks(partial(_join, event_id, user_id))
+
+
+def _join(event_id, user_id):
+    try:
+        with transaction.atomic():
+            admitted = Event.objects.filter(
+                pk=event_id,
+                status=Event.Status.PUBLISHED,
+                capacity_reserved__lt=F("capacity_total"),
+            ).update(capacity_reserved=F("capacity_reserved") + 1)
+            if not admitted:
+                raise _EventFull
+            EventParticipant.objects.create(
+                event_id=event_id,
+                user_id=user_id,
+                status=EventParticipant.Status.ACTIVE,
+            )
+            adjust_reserved_seats(event_id, 1)
+    except IntegrityError:
+        return ALREADY_JOINED
+    except _EventFull:
+        # A participant of a full event must not end up on its waitlist.
+        if EventParticipant.objects.filter(event_id=event_id, user_id=user_id).exists():
+            return ALREADY_JOINED
+        return FULL
+    return JOINED
+
+
+def leave_event(event_id, user_id):
+    """Release `user_id`'s seat or waitlist place; returns True when a seat was freed.
+
+    A freed seat goes to the head of the waitlist.
+    """
+    if not retry_deadlocks(partial(_leave, event_id, user_id)):
+        return False
+    promote_waitlist(event_id)
+    return True
+
+
+def _leave(event_id, user_id):
+    with transaction.atomic():
+        deleted, _ = EventParticipant.objects.filter(event_id=event_id, user_id=user_id).delete()
+        if not deleted:
+            WaitlistEntry.objects.filter(event_id=event_id, user_id=user_id).delete()
+            return False
+        Event.objects.filter(pk=event_id, capacity_reserved__gt=0).update(
+            capacity_reserved=F("capacity_reserved") - 1
+        )
+        adjust_reserved_seats(event_id, -1)
+    return True
+
+
+def enqueue(event_id, user_id):
+    entry, _ = WaitlistEntry.objects.get_or_create(event_id=event_id, user_id=user_id)
+    return waitlist_position(entry)
+
+
+def waitlist_position(entry):
+    ahead = WaitlistEntry.objects.filter(
+        Q(created_at__lt=entry.created_at) | Q(created_at=entry.created_at, id__lt=entry.id),
+        event_id=entry.event_id,
+    )
+    return ahead.count() + 1
+
+
+def promote_waitlist(event_id):
+    """Move waitlisted users into free seats, oldest first."""
+    promoted = []
+    while True:
+        result, user_id = retry_deadlocks(partial(_promote_next, event_id))
+        if result in (None, FULL):
+            break
+        if result == JOINED:
+            promoted.append(user_id)
+    if promoted:
+        WAITLIST_PROMOTIONS.inc(len(promoted))
+    return promoted
+
+
+def _promote_next(event_id):
+    with transaction.atomic():
+        entry = (
+            WaitlistEntry.objects.select_for_update(skip_locked=True)
+            .filter(event_id=event_id)
+            .order_by("created_at", "id")
+            .first()
+        )
+        if entry is None:
+            return None, None
+        result = _join(event_id, entry.user_id)
+        if result != FULL:
+            entry.delete()
+    return result, entry.user_id
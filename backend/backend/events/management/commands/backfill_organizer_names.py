@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from events.signals import refresh_organizer_name
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized organizer_name stored on every event."
+
+    def handle(self, *args, **options):
+        organizers = (
+            User.objects.filter(organized_events__isnull=False)
+            .distinct()
+            .select_related("profile")
+            .order_by("pk")
+        )
+        updated = 0
+        for organizer in organizers.iterator(chunk_size=500):
+            updated += refresh_organizer_name(organizer)
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} event(s)."))
@@ -0,0 +1,243 @@
+import json
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from accounts.models import Profile
+from accounts.tokens import tokens_for_user
+from events.benchmarking import compare_results, summarize
+from events.caching import bump_catalog_version
+from events.models import CatalogEntry, EventParticipant
+from monitoring.querybudget import QueryCounter
+
+
+User = get_user_model()
+
+API = "/api/marketplace"
+LOGIN_EMAIL = "benchmark-login@example.com"
+LOGIN_PASSWORD = "benchmark-pass-1"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main API endpoints against datasets of several sizes and report "
+        "throughput, p50/p95/p99 latency and queries per request. Each dataset is "
+        "generated inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000])
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", default="benchmark-results.json")
+        parser.add_argument(
+            "--existing",
+            action="store_true",
+            help="Benchmark the current database instead of generating datasets.",
+        )
+        parser.add_argument("--cold", action="store_true", help="Clear the cache before every request.")
+        parser.add_argument("--baseline", help="Compare this run with a previous JSON result.")
+        parser.add_argument(
+            "--compare",
+            nargs=2,
+            metavar=("BASELINE", "CURRENT"),
+            help="Only compare two saved JSON results.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.1,
+            help="Relative slow-down tolerated before a change is flagged (default 0.1).",
+        )
+
+    def handle(self, *args, **options):
+        if options["compare"]:
+            baseline, current = (self._load(path) for path in options["compare"])
+            self._report_regressions(baseline, current, options["tolerance"])
+            return
+
+        self.options = options
+        self.rng = random.Random(options["seed"])
+        scales = ["existing"] if options["existing"] else options["scales"]
+        results = {}
+        with override_settings(
+            ALLOWED_HOSTS=["testserver"], EVENT_JOIN_ADMISSION_RATE=0, QUERY_BUDGET_MODE=""
+        ):
+            for scale in scales:
+                with transaction.atomic():
+                    if scale != "existing":
+                        self.stdout.write(f"Generating {scale:,} events...")
+                        call_command("generate_dataset", stdout=self.stdout, **self._dataset_size(scale))
+                    results[str(scale)] = self._run(str(scale))
+                    transaction.set_rollback(True)
+                bump_catalog_version()
+
+        with open(options["output"], "w") as handle:
+            json.dump(
+                {
+                    "generated_at": timezone.now().isoformat(),
+                    "database": connection.vendor,
+                    "requests": options["requests"],
+                    "cold_cache": options["cold"],
+                    "results": results,
+                },
+                handle,
+                indent=2,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+        if options["baseline"]:
+            self._report_regressions(self._load(options["baseline"]), results, options["tolerance"])
+
+    def _dataset_size(self, events):
+        users = max(events // 5, 1000)
+        return {
+            "seed": self.options["seed"],
+            "events": events,
+            "users": users,
+            "organizers": max(users // 20, 10),
+            "locations": min(max(events // 250, 50), 2000),
+            "favorites": users * 4,
+            "participants": events * 6,
+        }
+
+    def _run(self, scale):
+        client = Client()
+        athlete = self._athlete()
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {tokens_for_user(athlete).access_token}"}
+        User.objects.create_user(username=LOGIN_EMAIL, email=LOGIN_EMAIL, password=LOGIN_PASSWORD)
+
+        entries = list(CatalogEntry.objects.order_by("start_at", "event_id")[:500])
+        if not entries:
+            raise CommandError("No published event to benchmark.")
+        sample = entries[0]
+        slugs = [entry.slug for entry in entries]
+        joinable = (
+            CatalogEntry.objects.filter(is_free=True, seats_available__gt=0)
+            .exclude(event__participants__user_id=athlete.pk)
+            .first()
+        )
+
+        scenarios = [
+            ("events-list", lambda: client.get(f"{API}/events/")),
+            ("events-list-page", lambda: client.get(f"{API}/events/", {"page_size": 20})),
+            ("events-list-sport", lambda: client.get(f"{API}/events/", {"sport": sample.sport_slug})),
+            (
+                "events-list-category",
+                lambda: client.get(
+                    f"{API}/events/", {"sport": sample.sport_slug, "category": sample.category_slug}
+                ),
+            ),
+            ("events-list-city", lambda: client.get(f"{API}/events/", {"city": sample.city, "available": 1})),
+            ("events-list-search", lambda: client.get(f"{API}/events/", {"search": sample.category_name})),
+            ("event-detail", lambda: client.get(f"{API}/events/{self.rng.choice(slugs)}/")),
+            ("favorites", lambda: client.get(f"{API}/favorites/", **auth)),
+            ("participations", lambda: client.get(f"{API}/me/participations/", **auth)),
+            (
+                "login",
+                lambda: client.post(
+                    "/api/auth/login/",
+                    {"email": LOGIN_EMAIL, "password": LOGIN_PASSWORD},
+                    content_type="application/json",
+                ),
+            ),
+        ]
+        resets = {}
+        if joinable:
+            join_url = f"{API}/events/{joinable.slug}/join/"
+            join = lambda: client.post(join_url, **auth)
+            leave = lambda: client.delete(join_url, **auth)
+            # Each join is undone by a leave and the other way round; the undo
+            # is left out of the timings.
+            scenarios += [("join", join), ("leave", leave)]
+            resets = {"join": leave, "leave": join}
+        else:
+            self.stdout.write(self.style.WARNING("No free event with seats left: join is skipped."))
+
+        results = {}
+        for name, request in scenarios:
+            reset = resets.get(name)
+            if name == "leave":
+                reset()
+            results[name] = self._measure(request, reset)
+            self._print(scale, name, results[name])
+        return results
+
+    def _athlete(self):
+        busiest = (
+            EventParticipant.objects.filter(user__profile__role=Profile.ROLE_ATHLETE)
+            .values("user_id")
+            .annotate(total=Count("id"))
+            .order_by("-total")
+            .first()
+        )
+        if busiest:
+            return User.objects.get(pk=busiest["user_id"])
+        athlete = User.objects.filter(profile__role=Profile.ROLE_ATHLETE).order_by("pk").first()
+        if athlete is None:
+            raise CommandError("No athlete to authenticate with.")
+        return athlete
+
+    def _measure(self, request, reset=None):
+        for _ in range(self.options["warmup"]):
+            self._check(request())
+            if reset:
+                reset()
+
+        latencies = []
+        queries = []
+        started = time.perf_counter()
+        for _ in range(self.options["requests"]):
+            if self.options["cold"]:
+                cache.clear()
+            with QueryCounter() as counter:
+                request_started = time.perf_counter()
+                self._check(request())
+                latencies.append(time.perf_counter() - request_started)
+            queries.append(counter.count)
+            if reset:
+                paused = time.perf_counter()
+                reset()
+                started += time.perf_counter() - paused
+        elapsed = time.perf_counter() - started
+        return summarize(latencies, elapsed, queries)
+
+    def _check(self, response):
+        if response.status_code >= 400:
+            raise CommandError(
+                f"{response.request['REQUEST_METHOD']} {response.request['PATH_INFO']} "
+                f"returned {response.status_code}: {response.content[:200]!r}"
+            )
+
+    def _print(self, scale, name, summary):
+        self.stdout.write(
+            f"{scale:>8} {name:<22} {summary['throughput_rps']:>9,.1f} req/s  "
+            f"p50 {summary['p50_ms']:>8.2f} ms  p95 {summary['p95_ms']:>8.2f} ms  "
+            f"p99 {summary['p99_ms']:>8.2f} ms  {summary['queries_per_request']:>5} queries"
+        )
+
+    def _load(self, path):
+        try:
+            with open(path) as handle:
+                return json.load(handle)["results"]
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read benchmark results from {path}: {exc}")
+
+    def _report_regressions(self, baseline, current, tolerance):
+        regressions = compare_results(baseline, current, tolerance)
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regression."))
+            return
+        for scale, name, metric, before, after in regressions:
+            self.stdout.write(self.style.ERROR(f"{scale} {name}: {metric} {before} -> {after}"))
+        raise CommandError(f"{len(regressions)} regression(s) found.")
@@ -0,0 +1,91 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from events.fastpath import event_list_values, render_event_rows
+from events.models import Event, EventCategory, Location, Sport
+from events.serializers import EventListSerializer
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare EventListSerializer with the values() fast path. Synthetic events "
+        "are created inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._seed(options["events"])
+            queryset = Event.objects.filter(status=Event.Status.PUBLISHED).order_by("start_at", "id")
+
+            serializer_rate = self._measure(
+                options["repeat"],
+                lambda: EventListSerializer(
+                    queryset.select_related(
+                        "sport", "category", "location", "organizer", "organizer__profile"
+                    ),
+                    many=True,
+                ).data,
+            )
+            fast_rate = self._measure(
+                options["repeat"], lambda: render_event_rows(event_list_values(queryset))
+            )
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"EventListSerializer: {serializer_rate:,.0f} rows/sec")
+        self.stdout.write(f"Fast path:           {fast_rate:,.0f} rows/sec")
+        self.stdout.write(self.style.SUCCESS(f"Speed-up: {fast_rate / serializer_rate:.1f}x"))
+
+    def _measure(self, repeat, render):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = len(render())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return rows / best if best else 0
+
+    def _seed(self, count):
+        organizer = User.objects.create_user(
+            username="benchmark-organizer@example.com",
+            email="benchmark-organizer@example.com",
+            first_name="Bench",
+            last_name="Mark",
+        )
+        sport = Sport.objects.create(name="Benchmark sport", slug="benchmark-sport")
+        category = EventCategory.objects.create(sport=sport, name="Benchmark", slug="benchmark")
+        location = Location.objects.create(
+            venue_name="Benchmark arena", address_line1="1 rue", city="Tunis", country="Tunisie"
+        )
+        start_at = timezone.now()
+        Event.objects.bulk_create(
+            (
+                Event(
+                    organizer=organizer,
+                    title=f"Benchmark event {index}",
+                    slug=f"benchmark-event-{index}",
+                    description="Benchmark",
+                    sport=sport,
+                    category=category,
+                    event_type=Event.EventType.MATCH,
+                    start_at=start_at + timedelta(minutes=index),
+                    end_at=start_at + timedelta(minutes=index + 90),
+                    location=location,
+                    capacity_total=100,
+                    status=Event.Status.PUBLISHED,
+                )
+                for index in range(count)
+            ),
+            batch_size=1000,
+        )
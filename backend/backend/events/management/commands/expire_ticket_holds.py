@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from events.holds import expire_holds
+
+
+class Command(BaseCommand):
+    help = "Return the tickets of expired holds to their ticket types."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        freed = expire_holds(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Released {freed} held ticket(s)."))
@@ -0,0 +1,316 @@
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import dateparse, timezone
+from django.utils.text import slugify
+
+from accounts.models import Profile
+from events.caching import bump_catalog_version
+from events.models import (
+    Event,
+    EventCategory,
+    EventParticipant,
+    Favorite,
+    Location,
+    Sport,
+    TicketType,
+    create_stock_slots,
+)
+
+
+User = get_user_model()
+
+EMAIL_DOMAIN = "dataset.example.com"
+SPORTS = {
+    "Football": ["Match amical", "Tournoi", "Entrainement", "Five"],
+    "Padel": ["Tournoi", "Initiation", "Americano"],
+    "Tennis": ["Tournoi", "Stage", "Match libre"],
+    "Basketball": ["Match", "Tournoi 3x3", "Entrainement"],
+    "Running": ["Course 10 km", "Semi-marathon", "Trail"],
+    "Natation": ["Competition", "Cours collectif"],
+    "Cyclisme": ["Sortie route", "VTT"],
+    "Volleyball": ["Beach volley", "Tournoi"],
+}
+CITIES = [
+    ("Tunis", Decimal("36.806500"), Decimal("10.181500")),
+    ("Sfax", Decimal("34.740600"), Decimal("10.760300")),
+    ("Sousse", Decimal("35.825600"), Decimal("10.636900")),
+    ("Bizerte", Decimal("37.274400"), Decimal("9.873900")),
+    ("Nabeul", Decimal("36.456100"), Decimal("10.735600")),
+    ("Monastir", Decimal("35.777700"), Decimal("10.826200")),
+    ("Kairouan", Decimal("35.678100"), Decimal("10.096300")),
+    ("Gabes", Decimal("33.881500"), Decimal("10.098200")),
+    ("Djerba", Decimal("33.807600"), Decimal("10.845100")),
+    ("Hammamet", Decimal("36.400000"), Decimal("10.616700")),
+]
+FIRST_NAMES = ["Amine", "Sarra", "Youssef", "Ines", "Mehdi", "Nour", "Karim", "Lina", "Omar", "Maya"]
+LAST_NAMES = ["Ben Ali", "Trabelsi", "Jaziri", "Gharbi", "Haddad", "Mansour", "Bouazizi", "Chaabane"]
+STATUS_WEIGHTS = (
+    (Event.Status.PUBLISHED, 85),
+    (Event.Status.DRAFT, 10),
+    (Event.Status.CANCELLED, 5),
+)
+
+
+def _reference_time(value):
+    moment = dateparse.parse_datetime(value)
+    if moment is None:
+        day = dateparse.parse_date(value)
+        if day is None:
+            raise CommandError(f"--as-of must be a date or an ISO datetime, not {value!r}.")
+        moment = datetime.combine(day, datetime.min.time())
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset for scale testing. Rows are written "
+        "with bulk_create, so model save() and post_save handlers do not run; profiles, "
+        "slugs, organizer names, the search index and the catalog are filled in here."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--users", type=int, default=100000)
+        parser.add_argument("--organizers", type=int, default=5000)
+        parser.add_argument("--locations", type=int, default=2000)
+        parser.add_argument("--events", type=int, default=500000)
+        parser.add_argument("--favorites", type=int, default=2000000)
+        parser.add_argument("--participants", type=int, default=3000000)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument(
+            "--as-of",
+            help=(
+                "Date (YYYY-MM-DD) or ISO datetime the dates are generated around; defaults "
+                "to the current hour. Runs with the same seed and --as-of give the same rows."
+            ),
+        )
+        parser.add_argument(
+            "--skip-index",
+            action="store_true",
+            help="Do not rebuild the search index and the catalog afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        if options["organizers"] > options["users"]:
+            raise CommandError("--organizers cannot exceed --users.")
+        if options["events"] and not (options["organizers"] and options["locations"]):
+            raise CommandError("--events needs at least one organizer and one location.")
+        if User.objects.filter(username__endswith=f"@{EMAIL_DOMAIN}").exists():
+            raise CommandError(f"A dataset already exists (users @{EMAIL_DOMAIN}).")
+
+        self.rng = random.Random(options["seed"])
+        self.chunk_size = options["chunk_size"]
+        if options["as_of"]:
+            self.now = _reference_time(options["as_of"])
+        else:
+            self.now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        started = time.perf_counter()
+
+        categories = self._timed("sports and categories", self._create_catalog)
+        user_ids, organizers = self._timed(
+            "users and profiles", self._create_users, options["users"], options["organizers"]
+        )
+        location_ids = self._timed("locations", self._create_locations, options["locations"])
+        event_ids = self._timed(
+            "events, tickets and participants",
+            self._create_events,
+            options["events"],
+            options["participants"],
+            organizers,
+            categories,
+            location_ids,
+            user_ids,
+        )
+        self._timed("favorites", self._create_favorites, options["favorites"], user_ids, event_ids)
+
+        if not options["skip_index"]:
+            call_command("rebuild_search_index", chunk_size=self.chunk_size, stdout=self.stdout)
+            call_command("rebuild_catalog", stdout=self.stdout)
+        bump_catalog_version()
+
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - started:,.1f}s."))
+
+    def _timed(self, label, step, *args):
+        started = time.perf_counter()
+        self.rows = 0
+        result = step(*args)
+        elapsed = time.perf_counter() - started
+        rate = self.rows / elapsed if elapsed else 0
+        self.stdout.write(f"{label}: {self.rows:,} rows in {elapsed:,.1f}s ({rate:,.0f} rows/sec)")
+        return result
+
+    def _chunks(self, count):
+        for start in range(0, count, self.chunk_size):
+            yield range(start, min(start + self.chunk_size, count))
+
+    def _insert(self, model, objects):
+        model.objects.bulk_create(objects, batch_size=self.chunk_size)
+        self.rows += len(objects)
+
+    def _create_catalog(self):
+        categories = []
+        for sport_name, category_names in SPORTS.items():
+            sport, _created = Sport.objects.get_or_create(
+                name=sport_name, defaults={"slug": slugify(sport_name)}
+            )
+            for category_name in category_names:
+                category, _created = EventCategory.objects.get_or_create(
+                    sport=sport, slug=slugify(category_name), defaults={"name": category_name}
+                )
+                categories.append((sport.pk, category.pk, category_name))
+            self.rows += 1 + len(category_names)
+        return categories
+
+    def _create_users(self, count, organizer_count):
+        user_ids = []
+        organizers = []
+        for indexes in self._chunks(count):
+            users = []
+            for index in indexes:
+                email = f"user{index}@{EMAIL_DOMAIN}"
+                users.append(
+                    User(
+                        username=email,
+                        email=email,
+                        first_name=self.rng.choice(FIRST_NAMES),
+                        last_name=self.rng.choice(LAST_NAMES),
+                        # Unusable password: hashing is far too slow at this volume.
+                        password="!",
+                        date_joined=self.now - timedelta(days=self.rng.randrange(1000)),
+                    )
+                )
+            with transaction.atomic():
+                self._insert(User, users)
+                # MySQL does not return primary keys from bulk inserts.
+                ids = dict(
+                    User.objects.filter(username__in=[user.username for user in users])
+                    .values_list("username", "id")
+                )
+                profiles = []
+                for index, user in zip(indexes, users):
+                    user.pk = ids[user.username]
+                    is_organizer = index < organizer_count
+                    profile = Profile(
+                        user_id=user.pk,
+                        role=Profile.ROLE_ORGANIZER if is_organizer else Profile.ROLE_ATHLETE,
+                        handle=f"user{index}",
+                        city=self.rng.choice(CITIES)[0],
+                        country="Tunisie",
+                    )
+                    if is_organizer:
+                        profile.organization_name = f"Club {user.last_name} {index}"
+                        organizers.append((user.pk, profile.organization_name))
+                    profiles.append(profile)
+                self._insert(Profile, profiles)
+            user_ids.extend(user.pk for user in users)
+        return user_ids, organizers
+
+    def _create_locations(self, count):
+        locations = []
+        for index in range(count):
+            city, latitude, longitude = self.rng.choice(CITIES)
+            locations.append(
+                Location(
+                    venue_name=f"Complexe sportif {index}",
+                    address_line1=f"{self.rng.randrange(1, 200)} avenue Habib Bourguiba",
+                    city=city,
+                    country="Tunisie",
+                    latitude=latitude + Decimal(self.rng.randrange(-5000, 5000)) / 100000,
+                    longitude=longitude + Decimal(self.rng.randrange(-5000, 5000)) / 100000,
+                )
+            )
+        self._insert(Location, locations)
+        return sorted(Location.objects.order_by("-id").values_list("id", flat=True)[:count])
+
+    def _create_events(self, count, participant_count, organizers, categories, location_ids, user_ids):
+        statuses = [status for status, _weight in STATUS_WEIGHTS]
+        weights = [weight for _status, weight in STATUS_WEIGHTS]
+        mean_participants = participant_count / count if count else 0
+        event_ids = []
+        for indexes in self._chunks(count):
+            events = []
+            attendees = []
+            for index in indexes:
+                organizer_id, organizer_name = self.rng.choice(organizers)
+                sport_id, category_id, category_name = self.rng.choice(categories)
+                city_location = self.rng.choice(location_ids)
+                status = self.rng.choices(statuses, weights)[0]
+                start_at = self.now + timedelta(hours=self.rng.randrange(-90 * 24, 365 * 24))
+                capacity = self.rng.choice((10, 16, 20, 32, 50, 100, 200, 500))
+                taken = 0
+                if status == Event.Status.PUBLISHED and mean_participants:
+                    taken = min(capacity, len(user_ids), int(self.rng.expovariate(1 / mean_participants)))
+                title = f"{category_name} {index}"
+                events.append(
+                    Event(
+                        organizer_id=organizer_id,
+                        organizer_name=organizer_name,
+                        title=title,
+                        slug=f"{slugify(title)}-{index}",
+                        short_description=f"{category_name} ouvert a tous les niveaux.",
+                        description=f"{category_name} organise par {organizer_name}.",
+                        sport_id=sport_id,
+                        category_id=category_id,
+                        event_type=self.rng.choice(Event.EventType.values),
+                        level_required=self.rng.choice(Event.Level.values),
+                        start_at=start_at,
+                        end_at=start_at + timedelta(minutes=self.rng.choice((60, 90, 120, 240))),
+                        timezone="Africa/Tunis",
+                        location_id=city_location,
+                        capacity_total=capacity,
+                        capacity_reserved=taken,
+                        is_free=self.rng.random() < 0.4,
+                        status=status,
+                        published_at=start_at - timedelta(days=30) if status != Event.Status.DRAFT else None,
+                    )
+                )
+                attendees.append(self.rng.sample(user_ids, taken))
+
+            with transaction.atomic():
+                self._insert(Event, events)
+                ids = dict(
+                    Event.objects.filter(slug__in=[event.slug for event in events]).values_list("slug", "id")
+                )
+                tickets = []
+                participants = []
+                for event, users in zip(events, attendees):
+                    event.pk = ids[event.slug]
+                    if not event.is_free:
+                        tickets.append(
+                            TicketType(
+                                event_id=event.pk,
+                                name="Standard",
+                                price=Decimal(self.rng.randrange(10, 150)),
+                                quantity_total=event.capacity_total,
+                            )
+                        )
+                    participants.extend(EventParticipant(event_id=event.pk, user_id=user_id) for user_id in users)
+                self._insert(TicketType, tickets)
+                create_stock_slots(
+                    TicketType.objects.filter(event_id__in=ids.values()).only("id", "quantity_total")
+                )
+                self._insert(EventParticipant, participants)
+            event_ids.extend(event.pk for event in events)
+        return event_ids
+
+    def _create_favorites(self, count, user_ids, event_ids):
+        if not user_ids or not event_ids:
+            return
+        per_user = count / len(user_ids)
+        for start in range(0, len(user_ids), self.chunk_size):
+            favorites = []
+            for user_id in user_ids[start:start + self.chunk_size]:
+                picks = min(len(event_ids), int(self.rng.expovariate(1 / per_user))) if per_user else 0
+                favorites.extend(
+                    Favorite(user_id=user_id, event_id=event_id)
+                    for event_id in self.rng.sample(event_ids, picks)
+                )
+            with transaction.atomic():
+                self._insert(Favorite, favorites)
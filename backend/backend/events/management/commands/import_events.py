@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from events.imports import IMPORT_CHUNK_SIZE, EventImporter, file_format, read_rows
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import events for an organizer from a CSV, JSON or NDJSON file. "
+        "Statuses are kept as given, as for an admin import through the API."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--organizer", required=True, help="Organizer email.")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument("--max-errors", type=int, default=20, help="Row errors to print.")
+
+    def handle(self, *args, **options):
+        fmt = file_format(options["path"])
+        if fmt is None:
+            raise CommandError("Use a .csv, .json, .jsonl or .ndjson file.")
+        try:
+            organizer = User.objects.select_related("profile").get(
+                email__iexact=options["organizer"], profile__role="organizer"
+            )
+        except User.DoesNotExist:
+            raise CommandError(f"No organizer with email {options['organizer']}.")
+
+        importer = EventImporter(organizer, is_staff=True, chunk_size=options["chunk_size"])
+        with open(options["path"], "rb") as stream:
+            report = importer.run(read_rows(stream, fmt))
+
+        for error in report["errors"][: options["max_errors"]]:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if len(report["errors"]) > options["max_errors"]:
+            self.stderr.write(f"... {len(report['errors']) - options['max_errors']} more row error(s).")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} of {report['rows']} row(s) in {report['seconds']}s "
+                f"({report['rows_per_sec']:,.0f} rows/sec)."
+            )
+        )
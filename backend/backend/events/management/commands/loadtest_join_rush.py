@@ -0,0 +1,314 @@
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from accounts.models import Profile
+from accounts.tokens import tokens_for_user
+from events.benchmarking import percentile, summarize
+from events.models import CatalogEntry, Event, EventCategory, Location, Sport, WaitlistEntry
+
+
+User = get_user_model()
+
+EMAIL_DOMAIN = "loadtest.example.com"
+LOCKING_PREFIXES = ("UPDATE", "DELETE")
+
+
+class LockingStatementTimer:
+    """Time the statements that take row locks (UPDATE, DELETE, SELECT ... FOR UPDATE).
+
+    This is the whole statement time, lock wait included; the wait alone is
+    only known to the server (see `_row_lock_status`).
+    """
+
+    def __init__(self):
+        self.durations = []
+
+    def __call__(self, execute, sql, params, many, context):
+        statement = sql.lstrip().upper()
+        if not (statement.startswith(LOCKING_PREFIXES) or "FOR UPDATE" in statement):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations.append(time.perf_counter() - started)
+
+
+def _row_lock_status():
+    """InnoDB row lock wait counters, or None on other databases.
+
+    They are server-wide: concurrent traffic on the same server is counted too.
+    """
+    if connection.vendor != "mysql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW GLOBAL STATUS LIKE %s", ["Innodb_row_lock_%"])
+        return {name: int(value) for name, value in cursor.fetchall()}
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a registration rush: worker threads join (and sometimes leave) one "
+        "event with limited capacity through EventJoinView, then report admissions, "
+        "oversell, locking statement time (and InnoDB row lock waits on MySQL), errors "
+        "and latency percentiles. The event, its users, sport and category are created "
+        "for the run and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=50)
+        parser.add_argument("--capacity", type=int, default=100)
+        parser.add_argument(
+            "--leave-rate",
+            type=float,
+            default=0.1,
+            help="Share of admitted users who cancel right away (default 0.1).",
+        )
+        parser.add_argument(
+            "--admission-rate",
+            type=float,
+            help="Override EVENT_JOIN_ADMISSION_RATE (0 lets every request through).",
+        )
+        parser.add_argument("--max-retries", type=int, default=30)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", help="Also write the report as JSON to this path.")
+        parser.add_argument("--keep", action="store_true", help="Keep the event and users afterwards.")
+
+    def handle(self, *args, **options):
+        self.options = options
+        run_id = uuid.uuid4().hex[:8]
+        admission_rate = options["admission_rate"]
+        if admission_rate is None:
+            admission_rate = settings.EVENT_JOIN_ADMISSION_RATE
+
+        fixture = self._create_fixture(run_id, options["users"], options["capacity"])
+        try:
+            row_locks = _row_lock_status()
+            with override_settings(
+                ALLOWED_HOSTS=["testserver"],
+                EVENT_JOIN_ADMISSION_RATE=admission_rate,
+                QUERY_BUDGET_MODE="",
+            ):
+                report = self._rush(fixture)
+            if row_locks is not None:
+                after = _row_lock_status()
+                report["row_lock_waits"] = {
+                    "waits": after["Innodb_row_lock_waits"] - row_locks["Innodb_row_lock_waits"],
+                    "wait_ms": after["Innodb_row_lock_time"] - row_locks["Innodb_row_lock_time"],
+                }
+            report.update(self._check_counters(fixture["event"]))
+            report["database"] = connection.vendor
+            report["admission_rate"] = admission_rate
+        finally:
+            if not options["keep"]:
+                self._delete_fixture(fixture)
+
+        self._print(report)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+
+    def _create_fixture(self, run_id, user_count, capacity):
+        sport = Sport.objects.create(name=f"Load test {run_id}", slug=f"load-test-{run_id}")
+        category = EventCategory.objects.create(sport=sport, name="Load test", slug="load-test")
+        organizer = User.objects.create_user(
+            username=f"organizer-{run_id}@{EMAIL_DOMAIN}", email=f"organizer-{run_id}@{EMAIL_DOMAIN}"
+        )
+        Profile.objects.filter(user=organizer).update(role=Profile.ROLE_ORGANIZER)
+        location = Location.objects.create(
+            venue_name="Load test arena", address_line1="1 rue", city="Tunis", country="Tunisie"
+        )
+        start_at = timezone.now() + timedelta(days=30)
+        event = Event.objects.create(
+            organizer=organizer,
+            title=f"Join rush {run_id}",
+            description="Load test",
+            sport=sport,
+            category=category,
+            event_type=Event.EventType.TOURNAMENT,
+            start_at=start_at,
+            end_at=start_at + timedelta(hours=2),
+            location=location,
+            capacity_total=capacity,
+            is_free=True,
+            status=Event.Status.PUBLISHED,
+        )
+
+        # bulk_create skips the create_profile signal, so profiles are written here.
+        emails = [f"rush{index}-{run_id}@{EMAIL_DOMAIN}" for index in range(user_count)]
+        User.objects.bulk_create(
+            [User(username=email, email=email, password="!") for email in emails], batch_size=1000
+        )
+        athletes = list(User.objects.filter(username__in=emails).order_by("pk"))
+        Profile.objects.bulk_create(
+            [Profile(user=user, role=Profile.ROLE_ATHLETE) for user in athletes], batch_size=1000
+        )
+        tokens = [str(tokens_for_user(user).access_token) for user in athletes]
+        return {
+            "run_id": run_id,
+            "event": event,
+            "organizer": organizer,
+            "sport": sport,
+            "category": category,
+            "location": location,
+            "tokens": tokens,
+        }
+
+    def _delete_fixture(self, fixture):
+        # Deleting the organizer deletes the event, which protects the rest.
+        User.objects.filter(username__endswith=f"-{fixture['run_id']}@{EMAIL_DOMAIN}").delete()
+        fixture["location"].delete()
+        fixture["category"].delete()
+        fixture["sport"].delete()
+
+    def _rush(self, fixture):
+        workers = max(min(self.options["workers"], len(fixture["tokens"])), 1)
+        url = f"/api/marketplace/events/{fixture['event'].slug}/join/"
+        slices = [fixture["tokens"][index::workers] for index in range(workers)]
+        barrier = threading.Barrier(workers)
+        outcomes = []
+        lock = threading.Lock()
+
+        def worker(index, tokens):
+            client = Client(raise_request_exception=False)
+            rng = random.Random(self.options["seed"] + index)
+            timer = LockingStatementTimer()
+            local = {"join": [], "leave": [], "statuses": {}, "retries": 0, "errors": 0}
+            try:
+                barrier.wait()
+                with connection.execute_wrapper(timer):
+                    for token in tokens:
+                        auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+                        response = self._join(client, url, auth, local)
+                        if response.status_code == 201 and rng.random() < self.options["leave_rate"]:
+                            self._request(client.delete, url, auth, local, "leave")
+            finally:
+                connections.close_all()
+            local["locks"] = timer.durations
+            with lock:
+                outcomes.append(local)
+
+        threads = [threading.Thread(target=worker, args=item) for item in enumerate(slices)]
+        # Every full-event answer is a 400: keep the request log to errors only.
+        request_logger = logging.getLogger("django.request")
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        started = time.perf_counter()
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            request_logger.setLevel(level)
+        elapsed = time.perf_counter() - started
+
+        statuses = {}
+        for outcome in outcomes:
+            for key, count in outcome["statuses"].items():
+                statuses[key] = statuses.get(key, 0) + count
+        join_latencies = [value for outcome in outcomes for value in outcome["join"]]
+        leave_latencies = [value for outcome in outcomes for value in outcome["leave"]]
+        locks = [value for outcome in outcomes for value in outcome["locks"]]
+        requests = len(join_latencies) + len(leave_latencies)
+        errors = sum(outcome["errors"] for outcome in outcomes)
+        return {
+            "users": len(fixture["tokens"]),
+            "workers": workers,
+            "capacity": fixture["event"].capacity_total,
+            "elapsed_s": round(elapsed, 2),
+            "statuses": statuses,
+            "queue_retries": sum(outcome["retries"] for outcome in outcomes),
+            "error_rate": round(errors / requests, 4) if requests else 0,
+            "join": summarize(join_latencies, elapsed),
+            "leave": summarize(leave_latencies, elapsed),
+            "locking_statements": {
+                "count": len(locks),
+                "total_s": round(sum(locks), 3),
+                "p50_ms": round(percentile(locks, 50) * 1000, 2),
+                "p99_ms": round(percentile(locks, 99) * 1000, 2),
+            },
+        }
+
+    def _join(self, client, url, auth, local):
+        for _attempt in range(self.options["max_retries"] + 1):
+            response = self._request(client.post, url, auth, local, "join")
+            if response.status_code != 429:
+                return response
+            local["retries"] += 1
+            time.sleep(float(response.get("Retry-After", 1)))
+        return response
+
+    def _request(self, method, url, auth, local, action):
+        started = time.perf_counter()
+        response = method(url, **auth)
+        local[action].append(time.perf_counter() - started)
+        key = f"{action} {response.status_code}"
+        local["statuses"][key] = local["statuses"].get(key, 0) + 1
+        if response.status_code >= 500:
+            local["errors"] += 1
+        return response
+
+    def _check_counters(self, event):
+        event.refresh_from_db()
+        participants = event.participants.count()
+        entry = CatalogEntry.objects.filter(pk=event.pk).values("capacity_reserved").first()
+        return {
+            "admitted": participants,
+            "waitlisted": WaitlistEntry.objects.filter(event=event).count(),
+            "oversell": max(participants - event.capacity_total, 0),
+            "capacity_reserved": event.capacity_reserved,
+            "counter_drift": event.capacity_reserved - participants,
+            "catalog_drift": (entry["capacity_reserved"] - participants) if entry else None,
+        }
+
+    def _print(self, report):
+        self.stdout.write(
+            f"{report['users']} users, {report['workers']} workers, capacity {report['capacity']} "
+            f"on {report['database']} in {report['elapsed_s']}s"
+        )
+        self.stdout.write(f"Responses: {json.dumps(report['statuses'], sort_keys=True)}")
+        self.stdout.write(f"Queue retries (429): {report['queue_retries']}")
+        for action in ("join", "leave"):
+            summary = report[action]
+            self.stdout.write(
+                f"{action:<5} {summary['requests']:>6} requests  p50 {summary['p50_ms']:.2f} ms  "
+                f"p95 {summary['p95_ms']:.2f} ms  p99 {summary['p99_ms']:.2f} ms"
+            )
+        locking = report["locking_statements"]
+        self.stdout.write(
+            f"Locking statements: {locking['count']} ({locking['total_s']}s total, "
+            f"p50 {locking['p50_ms']:.2f} ms, p99 {locking['p99_ms']:.2f} ms, lock waits included)"
+        )
+        if "row_lock_waits" in report:
+            waits = report["row_lock_waits"]
+            self.stdout.write(f"InnoDB row lock waits: {waits['waits']} ({waits['wait_ms']} ms)")
+        self.stdout.write(f"Error rate: {report['error_rate']:.2%}")
+        self.stdout.write(
+            f"Admitted {report['admitted']}, waitlisted {report['waitlisted']}, "
+            f"capacity_reserved {report['capacity_reserved']}, catalog drift {report['catalog_drift']}"
+        )
+        consistent = not report["oversell"] and not report["counter_drift"] and not report["catalog_drift"]
+        if consistent:
+            self.stdout.write(self.style.SUCCESS("No oversell, counters consistent."))
+        else:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"Oversell {report['oversell']}, counter drift {report['counter_drift']}, "
+                    f"catalog drift {report['catalog_drift']}."
+                )
+            )
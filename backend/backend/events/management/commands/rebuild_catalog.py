@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from events.catalog import sync_catalog
+from events.models import CatalogEntry, Event
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized catalog table from the events."
+
+    def handle(self, *args, **options):
+        published = Event.objects.filter(status=Event.Status.PUBLISHED)
+        event_ids = set(published.values_list("pk", flat=True))
+        event_ids.update(CatalogEntry.objects.values_list("pk", flat=True))
+        sync_catalog(sorted(event_ids))
+        self.stdout.write(
+            self.style.SUCCESS(f"Catalog holds {CatalogEntry.objects.count()} event(s).")
+        )
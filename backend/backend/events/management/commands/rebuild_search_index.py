@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from events.models import Event
+from events.search import index_events
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for every event."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        queryset = Event.objects.only("id", "title", "short_description", "description").order_by("id")
+        total = 0
+        chunk = []
+        for event in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(event)
+            if len(chunk) >= chunk_size:
+                total += self._flush(chunk)
+                chunk = []
+        if chunk:
+            total += self._flush(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} event(s)."))
+
+    def _flush(self, chunk):
+        with transaction.atomic():
+            index_events(chunk)
+        return len(chunk)
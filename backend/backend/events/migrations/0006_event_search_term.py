@@ -0,0 +1,71 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:24
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of events.search as of this migration, so later changes to the
+# live tokenizer cannot break or alter a fresh migrate.
+FIELD_WEIGHTS = (
+    ("title", 5),
+    ("short_description", 2),
+    ("description", 1),
+)
+STOPWORDS = frozenset(
+    "a au aux avec ce ces dans de des du en et la le les leur ou par pour sur un une "
+    "the and of for in on at to".split()
+)
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def build_terms(event):
+    weights = {}
+    for field, weight in FIELD_WEIGHTS:
+        decomposed = unicodedata.normalize("NFKD", getattr(event, field) or "")
+        folded = "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+        for token in TOKEN_RE.findall(folded):
+            if len(token) < 2 or token in STOPWORDS:
+                continue
+            token = token[:64]
+            weights[token] = weights.get(token, 0) + weight
+    return weights
+
+
+def index_existing_events(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventSearchTerm = apps.get_model("events", "EventSearchTerm")
+    terms = []
+    for event in Event.objects.only("id", "title", "short_description", "description").iterator():
+        for term, weight in build_terms(event).items():
+            terms.append(EventSearchTerm(event_id=event.pk, term=term, weight=min(weight, 32767)))
+        if len(terms) >= 1000:
+            EventSearchTerm.objects.bulk_create(terms)
+            terms = []
+    EventSearchTerm.objects.bulk_create(terms)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_eventparticipant'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='events.event')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'event'], name='events_even_term_de9493_idx')],
+                'constraints': [models.UniqueConstraint(fields=('event', 'term'), name='unique_event_search_term')],
+            },
+        ),
+        migrations.RunPython(index_existing_events, migrations.RunPython.noop),
+    ]
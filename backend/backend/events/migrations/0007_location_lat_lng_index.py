@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_event_search_term'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['latitude', 'longitude'], name='events_loca_latitud_19c993_idx'),
+        ),
+    ]
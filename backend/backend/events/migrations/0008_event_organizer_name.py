@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:30
+
+from django.db import migrations, models
+
+
+def backfill_organizer_names(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    User = apps.get_model("auth", "User")
+    Profile = apps.get_model("accounts", "Profile")
+    organizations = dict(Profile.objects.values_list("user_id", "organization_name"))
+    organizers = User.objects.filter(organized_events__isnull=False).distinct()
+    for user_id, first_name, last_name, email in organizers.values_list(
+        "pk", "first_name", "last_name", "email"
+    ).iterator():
+        # Same precedence as events.models.organizer_display_name at this point.
+        name = (
+            (organizations.get(user_id) or "").strip()
+            or f"{first_name} {last_name}".strip()
+            or email
+        )
+        Event.objects.filter(organizer_id=user_id).update(organizer_name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_profile_details'),
+        ('events', '0007_location_lat_lng_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='organizer_name',
+            field=models.CharField(blank=True, editable=False, max_length=320),
+        ),
+        migrations.RunPython(backfill_organizer_names, migrations.RunPython.noop),
+    ]
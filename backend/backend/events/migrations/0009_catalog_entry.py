@@ -0,0 +1,123 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:32
+
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of events.catalog as of this migration: the live COPIED_FIELDS
+# and sync_catalog follow the current models and would break a fresh migrate.
+COPIED_FIELDS = (
+    "title",
+    "slug",
+    "short_description",
+    "sport_id",
+    "category_id",
+    "event_type",
+    "level_required",
+    "start_at",
+    "end_at",
+    "timezone",
+    "capacity_total",
+    "capacity_reserved",
+    "is_free",
+    "currency",
+    "cancellation_policy",
+    "cancellation_public",
+    "cover_image_url",
+    "status",
+    "organizer_name",
+)
+
+
+def normalize_city(city):
+    decomposed = unicodedata.normalize("NFKD", city or "")
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return folded.lower().strip()[:80]
+
+
+def build_catalog(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    CatalogEntry = apps.get_model("events", "CatalogEntry")
+    events = (
+        Event.objects.filter(status="published")
+        .select_related("sport", "category", "location")
+        .annotate(min_price=models.Min("ticket_types__price"))
+        .order_by("pk")
+    )
+    entries = []
+    for event in events.iterator(chunk_size=500):
+        location = event.location
+        entries.append(
+            CatalogEntry(
+                event_id=event.pk,
+                sport_slug=event.sport.slug,
+                sport_name=event.sport.name,
+                category_slug=event.category.slug,
+                category_name=event.category.name,
+                city=location.city,
+                city_normalized=normalize_city(location.city),
+                country=location.country,
+                latitude=location.latitude,
+                longitude=location.longitude,
+                seats_available=max(event.capacity_total - event.capacity_reserved, 0),
+                min_price=event.min_price,
+                **{field: getattr(event, field) for field in COPIED_FIELDS},
+            )
+        )
+        if len(entries) >= 500:
+            CatalogEntry.objects.bulk_create(entries)
+            entries = []
+    CatalogEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_event_organizer_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogEntry',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalog_entry', serialize=False, to='events.event')),
+                ('title', models.CharField(max_length=160)),
+                ('slug', models.SlugField(max_length=180)),
+                ('short_description', models.CharField(blank=True, max_length=220)),
+                ('sport_slug', models.SlugField(max_length=80)),
+                ('sport_name', models.CharField(max_length=80)),
+                ('category_slug', models.SlugField(max_length=80)),
+                ('category_name', models.CharField(max_length=80)),
+                ('event_type', models.CharField(max_length=30)),
+                ('level_required', models.CharField(max_length=30)),
+                ('start_at', models.DateTimeField()),
+                ('end_at', models.DateTimeField()),
+                ('timezone', models.CharField(max_length=60)),
+                ('city', models.CharField(max_length=80)),
+                ('city_normalized', models.CharField(max_length=80)),
+                ('country', models.CharField(max_length=80)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('capacity_total', models.PositiveIntegerField(default=0)),
+                ('capacity_reserved', models.PositiveIntegerField(default=0)),
+                ('seats_available', models.PositiveIntegerField(default=0)),
+                ('is_free', models.BooleanField(default=False)),
+                ('currency', models.CharField(max_length=3)),
+                ('cancellation_policy', models.TextField(blank=True)),
+                ('cancellation_public', models.BooleanField(default=False)),
+                ('cover_image_url', models.URLField(blank=True)),
+                ('status', models.CharField(max_length=20)),
+                ('organizer_name', models.CharField(blank=True, max_length=320)),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.eventcategory')),
+                ('sport', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.sport')),
+            ],
+            options={
+                'ordering': ['start_at', 'event'],
+                'indexes': [models.Index(fields=['start_at', 'event'], name='events_cata_start_a_73f06a_idx'), models.Index(fields=['sport_slug', 'start_at'], name='events_cata_sport_s_457e4b_idx'), models.Index(fields=['category_slug', 'start_at'], name='events_cata_categor_08cd07_idx'), models.Index(fields=['city_normalized', 'start_at'], name='events_cata_city_no_59a872_idx'), models.Index(fields=['latitude', 'longitude'], name='events_cata_latitud_4a3dd7_idx')],
+            },
+        ),
+        migrations.RunPython(build_catalog, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_waitlistentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tickettype',
+            name='quantity_held',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TicketHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('quantity', models.PositiveSmallIntegerField()),
+                ('status', models.CharField(choices=[('active', 'Active'), ('confirmed', 'Confirmed'), ('released', 'Released'), ('expired', 'Expired')], default='active', max_length=20)),
+                ('expires_at', models.DateTimeField()),
+                ('ticket_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='events.tickettype')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='events_hold_expiry_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of events.models.STOCK_SLOTS as of this migration.
+STOCK_SLOTS = 8
+
+
+def split_stock(quantity, slots=STOCK_SLOTS):
+    share, extra = divmod(quantity, slots)
+    return [share + (slot < extra) for slot in range(slots)]
+
+
+def create_slots(apps, schema_editor):
+    # Existing holds keep slot 0, so slot 0 takes every sold and held ticket
+    # and the free stock is spread over all slots.
+    TicketType = apps.get_model("events", "TicketType")
+    TicketStockSlot = apps.get_model("events", "TicketStockSlot")
+    slots = []
+    for pk, total, sold, held in TicketType.objects.values_list(
+        "pk", "quantity_total", "quantity_sold", "quantity_held"
+    ).iterator():
+        shares = split_stock(max(total - sold - held, 0))
+        shares[0] += sold + held
+        slots.extend(
+            TicketStockSlot(
+                ticket_type_id=pk,
+                slot=slot,
+                quantity_total=share,
+                quantity_sold=sold if slot == 0 else 0,
+                quantity_held=held if slot == 0 else 0,
+            )
+            for slot, share in enumerate(shares)
+        )
+    TicketStockSlot.objects.bulk_create(slots, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_ticket_holds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tickethold',
+            name='slot',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TicketStockSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('quantity_total', models.PositiveIntegerField(default=0)),
+                ('quantity_sold', models.PositiveIntegerField(default=0)),
+                ('quantity_held', models.PositiveIntegerField(default=0)),
+                ('ticket_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_slots', to='events.tickettype')),
+            ],
+            options={
+                'ordering': ['ticket_type_id', 'slot'],
+                'constraints': [models.UniqueConstraint(fields=('ticket_type', 'slot'), name='unique_ticket_stock_slot')],
+            },
+        ),
+        migrations.RunPython(create_slots, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='tickettype',
+            name='quantity_held',
+        ),
+        migrations.RemoveField(
+            model_name='tickettype',
+            name='quantity_sold',
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def rename_reserved_slug(apps, schema_editor):
+    # /events/facets/ now routes to the facet counts, ahead of the detail route.
+    Event = apps.get_model("events", "Event")
+    CatalogEntry = apps.get_model("events", "CatalogEntry")
+    event = Event.objects.filter(slug="facets").first()
+    if event is None:
+        return
+    taken = set(Event.objects.filter(slug__startswith="facets-").values_list("slug", flat=True))
+    counter = 2
+    while f"facets-{counter}" in taken:
+        counter += 1
+    slug = f"facets-{counter}"
+    Event.objects.filter(pk=event.pk).update(slug=slug)
+    CatalogEntry.objects.filter(event_id=event.pk).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_ticket_stock_slots'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_reserved_slug, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,20 @@
+import operator
+import re
+from functools import partial, reduce
+
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q, prefetch_related_objects
 from django.utils.text import slugify
 
 
+SLUG_SAVE_ATTEMPTS = 3
+# Longest suffix the prefix query has to cover when a base slug is cut short.
+SLUG_SUFFIX_ROOM = 8
+# Rows a ticket type's stock is spread over, see TicketStockSlot.
+STOCK_SLOTS = 8
+
+
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -11,17 +23,83 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
-def _unique_slug(model_class, value, slug_field="slug", max_length=140, instance_id=None):
-    base_slug = slugify(value)[:max_length] or "item"
-    slug = base_slug
-    counter = 1
+def allocate_slugs(model_class, values, slug_field="slug", max_length=140, scope=None, instance_id=None):
+    """Return a free slug for each of `values`, reading the taken ones in one query.
+
+    Values sharing a base slug get consecutive suffixes ("tournoi", "tournoi-2",
+    ...). `scope` restricts uniqueness to the rows matching those filters, e.g.
+    {"sport_id": 3} for categories. Slugs listed in the model's
+    `reserved_slugs` are never handed out.
+    """
+    bases = [slugify(value)[:max_length] or "item" for value in values]
+    if not bases:
+        return []
+
+    # Only the base and its numbered variants are read, not every slug that
+    # merely shares the prefix ("tournoi-de-padel" for "tournoi").
+    lookups = []
+    for base in set(bases):
+        if len(base) > max_length - SLUG_SUFFIX_ROOM:
+            # A suffix may replace the end of a long base.
+            stem = f"{re.escape(base[: max_length - SLUG_SUFFIX_ROOM])}.*"
+        else:
+            stem = re.escape(base)
+        lookups.append(Q(**{slug_field: base}) | Q(**{f"{slug_field}__regex": rf"^{stem}-[0-9]+$"}))
+    queryset = model_class.objects.filter(reduce(operator.or_, lookups), **(scope or {}))
+    if instance_id is not None:
+        queryset = queryset.exclude(pk=instance_id)
+    taken = set(queryset.values_list(slug_field, flat=True))
+    taken.update(getattr(model_class, "reserved_slugs", ()))
+
+    slugs = []
+    for base in bases:
+        slug = base
+        counter = 1
+        while slug in taken:
+            counter += 1
+            suffix = f"-{counter}"
+            slug = f"{base[: max_length - len(suffix)]}{suffix}"
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def _unique_slug(model_class, value, slug_field="slug", max_length=140, instance_id=None, scope=None):
+    return allocate_slugs(
+        model_class, [value], slug_field, max_length, scope=scope, instance_id=instance_id
+    )[0]
+
+
+def _save_with_slug(instance, save, value, max_length, scope=None):
+    """Allocate `instance.slug` and save, retrying when a concurrent writer
+    takes the same slug first instead of locking or probing beforehand."""
+    model_class = type(instance)
+    for attempt in range(SLUG_SAVE_ATTEMPTS):
+        instance.slug = _unique_slug(
+            model_class, value, max_length=max_length, instance_id=instance.pk, scope=scope
+        )
+        try:
+            with transaction.atomic():
+                save()
+            return
+        except IntegrityError:
+            taken = (
+                model_class.objects.filter(slug=instance.slug, **(scope or {}))
+                .exclude(pk=instance.pk)
+                .exists()
+            )
+            instance.slug = ""
+            if not taken or attempt == SLUG_SAVE_ATTEMPTS - 1:
+                raise
 
-    while model_class.objects.filter(**{slug_field: slug}).exclude(pk=instance_id).exists():
-        counter += 1
-        suffix = f"-{counter}"
-        slug = f"{base_slug[: max_length - len(suffix)]}{suffix}"
 
-    return slug
+def organizer_display_name(user):
+    profile = getattr(user, "profile", None)
+    org_name = ""
+    if profile:
+        org_name = (profile.organization_name or "").strip()
+    full_name = f"{user.first_name} {user.last_name}".strip()
+    return org_name or full_name or user.email
 
 
 class Sport(TimeStampedModel):
@@ -33,9 +111,10 @@ class Sport(TimeStampedModel):
         ordering = ["name"]
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = _unique_slug(Sport, self.name, max_length=80, instance_id=self.pk)
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            _save_with_slug(self, partial(super().save, *args, **kwargs), self.name, 80)
 
     def __str__(self):
         return self.name
@@ -54,14 +133,17 @@ class EventCategory(TimeStampedModel):
         ]
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = _unique_slug(
-                EventCategory,
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            # Category slugs are only unique within their sport.
+            _save_with_slug(
+                self,
+                partial(super().save, *args, **kwargs),
                 self.name,
-                max_length=80,
-                instance_id=self.pk,
+                80,
+                scope={"sport_id": self.sport_id},
             )
-        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.sport.name} - {self.name}"
@@ -80,6 +162,9 @@ class Location(TimeStampedModel):
 
     class Meta:
         ordering = ["country", "city", "venue_name"]
+        indexes = [
+            models.Index(fields=["latitude", "longitude"]),
+        ]
 
     def __str__(self):
         return f"{self.venue_name} - {self.city}"
@@ -112,6 +197,7 @@ class Event(TimeStampedModel):
         related_name="organized_events",
         limit_choices_to={"profile__role": "organizer"},
     )
+    organizer_name = models.CharField(max_length=320, blank=True, editable=False)
     title = models.CharField(max_length=160)
     slug = models.SlugField(max_length=180, unique=True, blank=True)
     short_description = models.CharField(max_length=220, blank=True)
@@ -136,6 +222,9 @@ class Event(TimeStampedModel):
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.DRAFT)
     published_at = models.DateTimeField(null=True, blank=True)
 
+    # Routed under /events/ ahead of the detail route.
+    reserved_slugs = frozenset({"facets"})
+
     class Meta:
         ordering = ["start_at"]
         indexes = [
@@ -143,14 +232,28 @@ class Event(TimeStampedModel):
             models.Index(fields=["sport", "category"]),
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Read from __dict__ so a deferred organizer does not cost a query.
+        self._named_organizer_id = self.__dict__.get("organizer_id")
+
     @property
     def capacity_available(self):
         return max(self.capacity_total - self.capacity_reserved, 0)
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = _unique_slug(Event, self.title, max_length=180, instance_id=self.pk)
-        super().save(*args, **kwargs)
+        if self.organizer_id and (
+            self.organizer_id != self._named_organizer_id or not self.organizer_name
+        ):
+            self.organizer_name = organizer_display_name(self.organizer)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "organizer_name"}
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            _save_with_slug(self, partial(super().save, *args, **kwargs), self.title, 180)
+        self._named_organizer_id = self.organizer_id
 
     def __str__(self):
         return self.title
@@ -181,7 +284,6 @@ class TicketType(TimeStampedModel):
     name = models.CharField(max_length=80)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     quantity_total = models.PositiveIntegerField(default=0)
-    quantity_sold = models.PositiveIntegerField(default=0)
     sales_start = models.DateTimeField(null=True, blank=True)
     sales_end = models.DateTimeField(null=True, blank=True)
     is_refundable = models.BooleanField(default=False)
@@ -195,6 +297,164 @@ class TicketType(TimeStampedModel):
     def __str__(self):
         return f"{self.event.title} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                create_stock_slots([self])
+
+    def _stock(self, field):
+        # The slots are read once per instance, not at all when prefetched.
+        prefetch_related_objects([self], "stock_slots")
+        return sum(getattr(slot, field) for slot in self.stock_slots.all())
+
+    @property
+    def quantity_sold(self):
+        return self._stock("quantity_sold")
+
+    @property
+    def quantity_held(self):
+        return self._stock("quantity_held")
+
+    @property
+    def quantity_available(self):
+        return max(self.quantity_total - self.quantity_sold - self.quantity_held, 0)
+
+
+def split_stock(quantity, slots=STOCK_SLOTS):
+    """Split `quantity` tickets into `slots` shares that differ by at most one."""
+    share, extra = divmod(quantity, slots)
+    return [share + (slot < extra) for slot in range(slots)]
+
+
+def create_stock_slots(ticket_types):
+    """Create the stock slots of newly inserted ticket types (bulk inserts skip save())."""
+    TicketStockSlot.objects.bulk_create(
+        TicketStockSlot(ticket_type_id=ticket_type.pk, slot=slot, quantity_total=share)
+        for ticket_type in ticket_types
+        for slot, share in enumerate(split_stock(ticket_type.quantity_total))
+    )
+
+
+class TicketStockSlot(models.Model):
+    """One shard of a ticket type's stock.
+
+    Holds take tickets from a random slot, so concurrent checkouts lock
+    different rows; a ticket type's counters are the sums over its slots.
+    """
+
+    ticket_type = models.ForeignKey(TicketType, on_delete=models.CASCADE, related_name="stock_slots")
+    slot = models.PositiveSmallIntegerField()
+    quantity_total = models.PositiveIntegerField(default=0)
+    quantity_sold = models.PositiveIntegerField(default=0)
+    quantity_held = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["ticket_type_id", "slot"]
+        constraints = [
+            models.UniqueConstraint(fields=["ticket_type", "slot"], name="unique_ticket_stock_slot"),
+        ]
+
+    def __str__(self):
+        return f"{self.ticket_type_id}#{self.slot}"
+
+
+class TicketHold(TimeStampedModel):
+    class Status(models.TextChoices):
+        ACTIVE = "active", "Active"
+        CONFIRMED = "confirmed", "Confirmed"
+        RELEASED = "released", "Released"
+        EXPIRED = "expired", "Expired"
+
+    ticket_type = models.ForeignKey(TicketType, on_delete=models.CASCADE, related_name="holds")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="ticket_holds")
+    quantity = models.PositiveSmallIntegerField()
+    slot = models.PositiveSmallIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.ACTIVE)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "expires_at"], name="events_hold_expiry_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.ticket_type_id} x{self.quantity}"
+
+
+class CatalogEntry(models.Model):
+    """Denormalized, single-table copy of a published event for catalog reads.
+
+    Rows are maintained by `events.catalog.sync_catalog` and only exist while
+    the event is published.
+    """
+
+    event = models.OneToOneField(
+        Event, on_delete=models.CASCADE, primary_key=True, related_name="catalog_entry"
+    )
+    title = models.CharField(max_length=160)
+    slug = models.SlugField(max_length=180)
+    short_description = models.CharField(max_length=220, blank=True)
+    sport = models.ForeignKey(Sport, on_delete=models.CASCADE, related_name="+")
+    sport_slug = models.SlugField(max_length=80)
+    sport_name = models.CharField(max_length=80)
+    category = models.ForeignKey(EventCategory, on_delete=models.CASCADE, related_name="+")
+    category_slug = models.SlugField(max_length=80)
+    category_name = models.CharField(max_length=80)
+    event_type = models.CharField(max_length=30)
+    level_required = models.CharField(max_length=30)
+    start_at = models.DateTimeField()
+    end_at = models.DateTimeField()
+    timezone = models.CharField(max_length=60)
+    city = models.CharField(max_length=80)
+    city_normalized = models.CharField(max_length=80)
+    country = models.CharField(max_length=80)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    capacity_total = models.PositiveIntegerField(default=0)
+    capacity_reserved = models.PositiveIntegerField(default=0)
+    seats_available = models.PositiveIntegerField(default=0)
+    is_free = models.BooleanField(default=False)
+    currency = models.CharField(max_length=3)
+    cancellation_policy = models.TextField(blank=True)
+    cancellation_public = models.BooleanField(default=False)
+    cover_image_url = models.URLField(blank=True)
+    status = models.CharField(max_length=20)
+    organizer_name = models.CharField(max_length=320, blank=True)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        ordering = ["start_at", "event"]
+        indexes = [
+            models.Index(fields=["start_at", "event"]),
+            models.Index(fields=["sport_slug", "start_at"]),
+            models.Index(fields=["category_slug", "start_at"]),
+            models.Index(fields=["city_normalized", "start_at"]),
+            models.Index(fields=["latitude", "longitude"]),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class EventSearchTerm(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="search_terms")
+    term = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["term", "event"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["event", "term"], name="unique_event_search_term"),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.event_id}"
+
 
 class Favorite(TimeStampedModel):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="favorites")
@@ -226,3 +486,20 @@ class EventParticipant(TimeStampedModel):
 
     def __str__(self):
         return f"{self.user_id} -> {self.event.title}"
+
+
+class WaitlistEntry(TimeStampedModel):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="waitlist")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="waitlist_entries")
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["event", "user"], name="unique_waitlist_entry"),
+        ]
+        indexes = [
+            models.Index(fields=["event", "created_at", "id"], name="events_waitlist_fifo_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.event_id}"
@@ -0,0 +1,116 @@
+import json
+import operator
+from functools import reduce
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Cursor pagination keyed on every ordering field, e.g. (start_at, id).
+
+    DRF's CursorPagination keys on the first field only and uses OFFSET to skip
+    ties. Lists stay unpaginated unless `cursor` or `page_size` is sent.
+    """
+
+    ordering = ("start_at", "id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request) or self.page_size
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*[_flip(field) for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            # A position of the wrong type only fails once the lookups are
+            # prepared against the model fields.
+            try:
+                queryset = queryset.filter(self._keyset_filter(current_position, reverse))
+            except (DjangoValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[: self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "cursor_ordering", None) or self.ordering
+        return tuple(ordering)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip("-")
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(None if value is None else str(value))
+        return json.dumps(values, separators=(",", ":"))
+
+    def _keyset_filter(self, position, reverse):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        conditions = []
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            lookup = "lt" if descending else "gt"
+            conditions.append(equal & Q(**{f"{name}__{lookup}": value}))
+            equal &= Q(**{name: value})
+        return reduce(operator.or_, conditions)
+
+
+def _flip(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
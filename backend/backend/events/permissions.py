@@ -1,13 +1,14 @@
 from rest_framework import permissions
 
+from accounts.tokens import user_role
+
 
 class IsOrganizer(permissions.BasePermission):
     def has_permission(self, request, view):
         user = request.user
         if not user or not user.is_authenticated:
             return False
-        profile = getattr(user, "profile", None)
-        return bool(profile and profile.role == "organizer")
+        return user_role(user) == "organizer"
 
 
 class IsOrganizerOwner(permissions.BasePermission):
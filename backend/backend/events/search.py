@@ -0,0 +1,94 @@
+import re
+import unicodedata
+from functools import reduce
+from operator import or_
+
+from django.db.models import IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import EventSearchTerm
+
+
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+FIELD_WEIGHTS = (
+    ("title", 5),
+    ("short_description", 2),
+    ("description", 1),
+)
+STOPWORDS = frozenset(
+    "a au aux avec ce ces dans de des du en et la le les leur ou par pour sur un une "
+    "the and of for in on at to".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return folded.lower()
+
+
+def tokenize(text):
+    tokens = []
+    for token in _TOKEN_RE.findall(normalize(text)):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        tokens.append(token[:MAX_TERM_LENGTH])
+    return tokens
+
+
+def build_terms(event):
+    weights = {}
+    for field, weight in FIELD_WEIGHTS:
+        for token in tokenize(getattr(event, field, "")):
+            weights[token] = weights.get(token, 0) + weight
+    return weights
+
+
+def index_event(event):
+    index_events([event])
+
+
+def index_events(events):
+    events = list(events)
+    EventSearchTerm.objects.filter(event_id__in=[event.pk for event in events]).delete()
+    EventSearchTerm.objects.bulk_create(
+        [
+            EventSearchTerm(event_id=event.pk, term=term, weight=min(weight, 32767))
+            for event in events
+            for term, weight in build_terms(event).items()
+        ],
+        batch_size=1000,
+    )
+
+
+def search_events(queryset, query):
+    """Filter `queryset` to events matching every term of `query`.
+
+    Each term is matched as a prefix against the accent-folded index, so the
+    lookups stay index range scans. Matches are annotated with `search_rank`.
+    A query with no indexable term (only stopwords or one-letter tokens)
+    matches nothing rather than the whole catalog.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return queryset.none().annotate(search_rank=Value(0, output_field=IntegerField()))
+
+    for term in terms:
+        queryset = queryset.filter(
+            pk__in=EventSearchTerm.objects.filter(term__startswith=term).values("event_id")
+        )
+
+    rank = (
+        EventSearchTerm.objects.filter(event_id=OuterRef("pk"))
+        .filter(reduce(or_, (Q(term__startswith=term) for term in terms)))
+        .order_by()
+        .values("event_id")
+        .annotate(total=Sum("weight"))
+        .values("total")[:1]
+    )
+    return queryset.annotate(
+        search_rank=Coalesce(Subquery(rank, output_field=IntegerField()), 0)
+    )
@@ -1,6 +1,12 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 
+from .holds import resize_stock
+from .joins import retry_deadlocks
 from .models import (
     Event,
     EventCategory,
@@ -9,10 +15,35 @@ from .models import (
     Favorite,
     Location,
     Sport,
+    TicketHold,
     TicketType,
 )
 
 
+class SparseFieldsMixin:
+    """Serializer that can be limited to a subset of its fields.
+
+    `field_columns` maps output fields to the model columns they read, so the
+    view can project the same subset in SQL with `only()`.
+    """
+
+    field_columns = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_columns(cls, fields):
+        columns = {"id"}
+        for name in fields:
+            columns.update(cls.field_columns.get(name, (name,)))
+        return columns
+
+
 class SportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Sport
@@ -61,6 +92,10 @@ class EventMediaSerializer(serializers.ModelSerializer):
 
 
 class TicketTypeSerializer(serializers.ModelSerializer):
+    quantity_sold = serializers.IntegerField(read_only=True)
+    quantity_held = serializers.IntegerField(read_only=True)
+    quantity_available = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = TicketType
         fields = [
@@ -69,17 +104,48 @@ class TicketTypeSerializer(serializers.ModelSerializer):
             "price",
             "quantity_total",
             "quantity_sold",
+            "quantity_held",
+            "quantity_available",
             "sales_start",
             "sales_end",
             "is_refundable",
         ]
-        read_only_fields = ["id", "quantity_sold"]
+        read_only_fields = ["id"]
+
+    def update(self, instance, validated_data):
+        return retry_deadlocks(partial(self._update, instance, validated_data))
+
+    def _update(self, instance, validated_data):
+        # The stock slots are locked and checked before quantity_total moves,
+        # so a concurrent checkout cannot push it below the tickets taken.
+        with transaction.atomic():
+            if "quantity_total" in validated_data and not resize_stock(
+                instance, validated_data["quantity_total"]
+            ):
+                raise serializers.ValidationError(
+                    {"quantity_total": ["Quantite inferieure aux billets vendus ou reserves."]}
+                )
+            return super().update(instance, validated_data)
+
+
+class TicketHoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TicketHold
+        fields = ["id", "ticket_type", "quantity", "status", "expires_at", "created_at"]
+        read_only_fields = ["id", "ticket_type", "status", "expires_at", "created_at"]
+
+    def validate_quantity(self, value):
+        if not 1 <= value <= settings.TICKET_HOLD_MAX_QUANTITY:
+            raise serializers.ValidationError(
+                f"Entre 1 et {settings.TICKET_HOLD_MAX_QUANTITY} billets par reservation."
+            )
+        return value
 
 
-class EventListSerializer(serializers.ModelSerializer):
+class EventListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     sport_name = serializers.CharField(source="sport.name", read_only=True)
     category_name = serializers.CharField(source="category.name", read_only=True)
-    organizer_name = serializers.SerializerMethodField()
+    organizer_name = serializers.CharField(read_only=True)
     city = serializers.CharField(source="location.city", read_only=True)
     country = serializers.CharField(source="location.country", read_only=True)
     capacity_available = serializers.IntegerField(read_only=True)
@@ -114,22 +180,29 @@ class EventListSerializer(serializers.ModelSerializer):
             "organizer_name",
         ]
 
-    def get_organizer_name(self, obj):
-        profile = getattr(obj.organizer, "profile", None)
-        org_name = ""
-        if profile:
-            org_name = (profile.organization_name or "").strip()
-        full_name = f"{obj.organizer.first_name} {obj.organizer.last_name}".strip()
-        return org_name or full_name or obj.organizer.email
+    field_columns = {
+        "sport_name": ("sport__name",),
+        "category_name": ("category__name",),
+        "city": ("location__city",),
+        "country": ("location__country",),
+        "capacity_available": ("capacity_total", "capacity_reserved"),
+    }
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        distance_km = getattr(instance, "distance_km", None)
+        if distance_km is not None:
+            data["distance_km"] = round(distance_km, 2)
+        return data
 
 
-class EventDetailSerializer(serializers.ModelSerializer):
+class EventDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     sport = SportSerializer(read_only=True)
     category = EventCategorySerializer(read_only=True)
     location = LocationSerializer(read_only=True)
     ticket_types = TicketTypeSerializer(many=True, read_only=True)
     media = EventMediaSerializer(many=True, read_only=True)
-    organizer_name = serializers.SerializerMethodField()
+    organizer_name = serializers.CharField(read_only=True)
     capacity_available = serializers.IntegerField(read_only=True)
 
     class Meta:
@@ -163,13 +236,21 @@ class EventDetailSerializer(serializers.ModelSerializer):
             "media",
         ]
 
-    def get_organizer_name(self, obj):
-        profile = getattr(obj.organizer, "profile", None)
-        org_name = ""
-        if profile:
-            org_name = (profile.organization_name or "").strip()
-        full_name = f"{obj.organizer.first_name} {obj.organizer.last_name}".strip()
-        return org_name or full_name or obj.organizer.email
+    expandable_fields = ("ticket_types", "media")
+    field_columns = {
+        "sport": ("sport__id", "sport__name", "sport__slug"),
+        "category": (
+            "category__id",
+            "category__sport_id",
+            "category__name",
+            "category__slug",
+            "category__sport__name",
+        ),
+        "location": tuple(f"location__{name}" for name in LocationSerializer.Meta.fields),
+        "capacity_available": ("capacity_total", "capacity_reserved"),
+        "ticket_types": (),
+        "media": (),
+    }
 
 
 class EventCreateUpdateSerializer(serializers.ModelSerializer):
@@ -219,7 +300,9 @@ class EventCreateUpdateSerializer(serializers.ModelSerializer):
             return
 
         request = self.context.get("request")
-        is_staff = bool(request and request.user and request.user.is_staff)
+        is_staff = self.context.get("is_staff") or bool(
+            request and request.user and request.user.is_staff
+        )
 
         if not is_staff:
             if status_value == Event.Status.PUBLISHED:
@@ -237,12 +320,15 @@ class EventCreateUpdateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         location_data = validated_data.pop("location")
         organizer = validated_data.pop("organizer", None)
-        if organizer is None:
+        organizer_id = validated_data.pop("organizer_id", None)
+        if organizer is not None:
+            organizer_id = organizer.pk
+        if organizer_id is None:
             request = self.context.get("request")
-            organizer = getattr(request, "user", None)
+            organizer_id = getattr(getattr(request, "user", None), "id", None)
         self._apply_status(None, validated_data)
         location = Location.objects.create(**location_data)
-        return Event.objects.create(organizer=organizer, location=location, **validated_data)
+        return Event.objects.create(organizer_id=organizer_id, location=location, **validated_data)
 
     def update(self, instance, validated_data):
         location_data = validated_data.pop("location", None)
@@ -256,6 +342,47 @@ class EventCreateUpdateSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class PreloadedRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field resolved from `context["preloaded"][model]` when given.
+
+    Bulk validation preloads small lookup tables once instead of running a
+    query per row.
+    """
+
+    def to_internal_value(self, data):
+        objects = self.context.get("preloaded", {}).get(self.get_queryset().model)
+        if objects is None:
+            return super().to_internal_value(data)
+        try:
+            return objects[int(data)]
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+class EventImportSerializer(EventCreateUpdateSerializer):
+    sport = PreloadedRelatedField(queryset=Sport.objects.all())
+    category = PreloadedRelatedField(queryset=EventCategory.objects.all())
+    ticket_types = TicketTypeSerializer(many=True, required=False)
+
+    class Meta(EventCreateUpdateSerializer.Meta):
+        fields = [*EventCreateUpdateSerializer.Meta.fields, "ticket_types"]
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if attrs["category"].sport_id != attrs["sport"].pk:
+            raise serializers.ValidationError({"category": "Categorie d'un autre sport."})
+
+        tickets = attrs.get("ticket_types", [])
+        names = [ticket["name"] for ticket in tickets]
+        if len(set(names)) != len(names):
+            raise serializers.ValidationError({"ticket_types": "Noms de billets en double."})
+        if attrs.get("is_free") and any(ticket["price"] > 0 for ticket in tickets):
+            raise serializers.ValidationError({"ticket_types": "Free event must have zero price"})
+        return attrs
+
+
 class EventModerationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
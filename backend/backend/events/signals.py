@@ -0,0 +1,111 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import Profile
+
+from .caching import bump_catalog_version
+from .catalog import sync_catalog
+from .models import (
+    CatalogEntry,
+    Event,
+    EventCategory,
+    EventMedia,
+    Location,
+    Sport,
+    TicketType,
+    organizer_display_name,
+)
+from .search import FIELD_WEIGHTS, index_event
+
+
+User = get_user_model()
+SEARCH_FIELDS = {field for field, _weight in FIELD_WEIGHTS}
+ORGANIZER_NAME_FIELDS = {"first_name", "last_name", "email", "organization_name"}
+
+
+def refresh_organizer_name(user):
+    name = organizer_display_name(user)
+    updated = (
+        Event.objects.filter(organizer_id=user.pk)
+        .exclude(organizer_name=name)
+        .update(organizer_name=name, updated_at=timezone.now())
+    )
+    if updated:
+        CatalogEntry.objects.filter(event__organizer_id=user.pk).update(organizer_name=name)
+        bump_catalog_version()
+    return updated
+
+
+@receiver(post_save, sender=Event)
+def reindex_event(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    index_event(instance)
+
+
+@receiver(post_save, sender=Event)
+def sync_event_catalog_entry(sender, instance, **kwargs):
+    sync_catalog([instance.pk])
+
+
+@receiver(post_save, sender=TicketType)
+@receiver(post_delete, sender=TicketType)
+def sync_ticket_event_catalog_entry(sender, instance, origin=None, **kwargs):
+    # Ticket types removed by an event's cascade delete must not re-create
+    # the catalog row of the event being deleted.
+    if origin is not None and getattr(origin, "model", type(origin)) is not TicketType:
+        return
+    sync_catalog([instance.event_id])
+
+
+@receiver(post_save, sender=Location)
+def sync_location_catalog_entries(sender, instance, created, **kwargs):
+    if not created:
+        sync_catalog(Event.objects.filter(location=instance).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Sport)
+def sync_sport_catalog_entries(sender, instance, created, **kwargs):
+    if not created:
+        sync_catalog(Event.objects.filter(sport=instance).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=EventCategory)
+def sync_category_catalog_entries(sender, instance, created, **kwargs):
+    if not created:
+        sync_catalog(Event.objects.filter(category=instance).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=TicketType)
+@receiver(post_delete, sender=TicketType)
+@receiver(post_save, sender=EventMedia)
+@receiver(post_delete, sender=EventMedia)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=Sport)
+@receiver(post_delete, sender=Sport)
+@receiver(post_save, sender=EventCategory)
+@receiver(post_delete, sender=EventCategory)
+def invalidate_catalog(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=User)
+def sync_organizer_name_from_user(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields is not None and not ORGANIZER_NAME_FIELDS.intersection(update_fields):
+        return
+    refresh_organizer_name(instance)
+
+
+@receiver(post_save, sender=Profile)
+def sync_organizer_name_from_profile(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields is not None and not ORGANIZER_NAME_FIELDS.intersection(update_fields):
+        return
+    refresh_organizer_name(instance.user)
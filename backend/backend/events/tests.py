@@ -1,3 +1,1251 @@
-from django.test import TestCase
+import base64
+import csv
+import json
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection, transaction
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from accounts.models import Profile
+from accounts.tokens import tokens_for_user
+from monitoring.testing import QueryBudgetTestMixin
+
+from .fastpath import CATALOG_SOURCES, event_list_values, render_event_rows
+from .geo import bounding_box, parse_point
+from .admission import ROOM_TIMEOUT, admit
+from .benchmarking import compare_results, percentile, summarize
+from .caching import get_catalog_version
+from .exports import iter_rows
+from .imports import EventImporter, read_rows
+from .holds import HoldUnavailable, SoldOut, confirm_hold, expire_holds, hold_tickets, release_hold
+from .joins import ALREADY_JOINED, FULL, JOINED, enqueue, join_event, leave_event
+from .models import (
+    CatalogEntry,
+    Event,
+    EventCategory,
+    EventMedia,
+    EventParticipant,
+    EventSearchTerm,
+    Favorite,
+    Location,
+    Sport,
+    TicketHold,
+    TicketStockSlot,
+    TicketType,
+    WaitlistEntry,
+    _unique_slug as unique_slug,
+    allocate_slugs,
+)
+from .serializers import EventDetailSerializer, EventListSerializer
+from .views import FavoriteListCreateView
+
+
+User = get_user_model()
+
+
+def create_organizer(email="club@example.com", organization_name="", **extra):
+    user = User.objects.create_user(username=email, email=email, password="secret-pass-1", **extra)
+    user.profile.role = "organizer"
+    user.profile.organization_name = organization_name
+    user.profile.save()
+    return user
+
+
+def create_event(organizer, sport, category, location, **extra):
+    start_at = extra.pop("start_at", timezone.now() + timedelta(days=7))
+    values = {
+        "title": "Tournoi de Padel",
+        "description": "Tournoi ouvert a tous.",
+        "event_type": Event.EventType.TOURNAMENT,
+        "start_at": start_at,
+        "end_at": start_at + timedelta(hours=3),
+        "capacity_total": 16,
+        "is_free": True,
+        "status": Event.Status.PUBLISHED,
+    }
+    values.update(extra)
+    return Event.objects.create(
+        organizer=organizer, sport=sport, category=category, location=location, **values
+    )
+
+
+class CatalogFixtureMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.sport = Sport.objects.create(name="Padel")
+        cls.category = EventCategory.objects.create(sport=cls.sport, name="Tournoi")
+        cls.location = Location.objects.create(
+            venue_name="Padel Club",
+            address_line1="Rue du Lac",
+            city="Tunis",
+            country="Tunisie",
+            latitude="36.806500",
+            longitude="10.181500",
+        )
+        cls.organizer = create_organizer(organization_name="Club Elan")
+
+
+class EventListFastPathTests(CatalogFixtureMixin, TestCase):
+    def test_rows_match_event_list_serializer(self):
+        named = create_organizer("named@example.com", first_name="Sami", last_name="Ben Ali")
+        anonymous = create_organizer("anon@example.com")
+        create_event(self.organizer, self.sport, self.category, self.location, short_description="Open")
+        create_event(named, self.sport, self.category, self.location, capacity_reserved=20)
+        create_event(anonymous, self.sport, self.category, self.location, is_free=False)
+
+        queryset = Event.objects.select_related(
+            "sport", "category", "location", "organizer", "organizer__profile"
+        ).order_by("id")
+        expected = EventListSerializer(queryset, many=True).data
+        actual = render_event_rows(event_list_values(queryset))
+
+        self.assertEqual([dict(row) for row in expected], actual)
+        self.assertEqual(
+            [row["organizer_name"] for row in actual],
+            ["Club Elan", "Sami Ben Ali", "anon@example.com"],
+        )
+
+    def test_sparse_fields_match_serializer(self):
+        create_event(self.organizer, self.sport, self.category, self.location)
+        fields = ["id", "title", "sport_name", "start_at", "capacity_available"]
+
+        queryset = Event.objects.order_by("id")
+        expected = EventListSerializer(queryset, many=True, fields=fields).data
+        actual = render_event_rows(event_list_values(queryset, fields), fields)
+
+        self.assertEqual([dict(row) for row in expected], actual)
+
+
+class KeysetPaginationTests(CatalogFixtureMixin, TestCase):
+    url = "/api/marketplace/events/"
+
+    def setUp(self):
+        cache.clear()
+        start_at = timezone.now() + timedelta(days=3)
+        # Three events share a start_at so pages split inside the tie.
+        self.events = [
+            create_event(self.organizer, self.sport, self.category, self.location, start_at=start_at + offset)
+            for offset in (timedelta(0), timedelta(0), timedelta(0), timedelta(hours=1), timedelta(hours=2))
+        ]
+
+    def ids(self, response):
+        return [row["id"] for row in response.data["results"]]
+
+    def walk(self, url, direction="next"):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(self.ids(response))
+            url = response.data[direction]
+        return pages, response.data
+
+    def test_walks_forward_and_backward_through_ties(self):
+        expected = [event.id for event in self.events]
+        pages, last = self.walk(f"{self.url}?page_size=2")
+        self.assertEqual(pages, [expected[0:2], expected[2:4], expected[4:]])
+
+        backward, _first = self.walk(last["previous"], direction="previous")
+        self.assertEqual(backward, [expected[2:4], expected[0:2]])
+
+    def test_rows_inserted_between_pages_are_not_repeated_or_skipped(self):
+        first = self.client.get(f"{self.url}?page_size=2").data
+        # One row lands before the cursor, one inside the tie after it.
+        start_at = self.events[0].start_at
+        create_event(
+            self.organizer, self.sport, self.category, self.location, start_at=start_at - timedelta(hours=1)
+        )
+        late = create_event(self.organizer, self.sport, self.category, self.location, start_at=start_at)
+
+        seen = [row["id"] for row in first["results"]]
+        pages, _last = self.walk(first["next"])
+        for page in pages:
+            seen.extend(page)
+        expected = [event.id for event in self.events]
+        self.assertEqual(seen, expected[:3] + [late.id] + expected[3:])
+
+    def test_tampered_cursor_is_not_found(self):
+        payloads = (
+            b"p=not-json", b'p=["only-one"]', b"o=abc", b"\xff",
+            b'p=["garbage","1"]', b'p=[null,null]', b'p=["2030-01-01T10:00:00+00:00","abc"]',
+        )
+        for payload in payloads:
+            cursor = base64.b64encode(payload).decode()
+            response = self.client.get(self.url, {"cursor": cursor})
+            self.assertEqual(response.status_code, 404, payload)
+
+    def test_requests_without_cursor_keep_the_plain_list(self):
+        response = self.client.get(self.url)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual([row["id"] for row in response.data], [event.id for event in self.events])
+
+
+class CatalogSearchTests(CatalogFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query):
+        response = self.client.get("/api/marketplace/events/", {"search": query})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data]
+
+    def test_accents_are_folded_on_both_sides(self):
+        event = create_event(self.organizer, self.sport, self.category, self.location, title="Fête du Padel")
+        self.assertEqual(self.search("fete"), [event.id])
+        self.assertEqual(self.search("FÊTE padel"), [event.id])
+
+    def test_terms_match_as_prefixes_and_all_must_match(self):
+        event = create_event(self.organizer, self.sport, self.category, self.location, title="Championnat régional")
+        create_event(self.organizer, self.sport, self.category, self.location, title="Open national")
+        self.assertEqual(self.search("champ reg"), [event.id])
+        self.assertEqual(self.search("champ national"), [])
+
+    def test_title_matches_rank_above_description_matches(self):
+        later = timezone.now() + timedelta(days=20)
+        in_description = create_event(
+            self.organizer, self.sport, self.category, self.location, title="Open", description="Americano"
+        )
+        in_title = create_event(
+            self.organizer, self.sport, self.category, self.location, title="Americano", start_at=later
+        )
+        self.assertEqual(self.search("americano"), [in_title.id, in_description.id])
+
+    def test_edited_event_is_reindexed(self):
+        event = create_event(self.organizer, self.sport, self.category, self.location, title="Open d'hiver")
+        event.title = "Open d'ete"
+        event.save()
+        self.assertEqual(self.search("hiver"), [])
+        self.assertEqual(self.search("ete"), [event.id])
+
+    def test_query_without_indexable_terms_matches_nothing(self):
+        create_event(self.organizer, self.sport, self.category, self.location)
+        self.assertEqual(self.search("de la a"), [])
+        self.assertEqual(len(self.search("")), 1)
+
+
+class SparseFieldsTests(CatalogFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = create_event(self.organizer, self.sport, self.category, self.location, capacity_reserved=3)
+        TicketType.objects.create(event=self.event, name="Standard", price="0", quantity_total=10)
+
+    def test_list_fields_match_the_serializer_payload(self):
+        fields = ["id", "title", "sport_name", "city", "capacity_available", "organizer_name"]
+        response = self.client.get("/api/marketplace/events/", {"fields": ",".join(fields)})
+
+        expected = EventListSerializer(Event.objects.all(), many=True, fields=fields).data
+        self.assertEqual(response.data, [dict(row) for row in expected])
+        self.assertEqual(list(response.data[0]), fields)
+
+    def test_detail_fields_and_expand_match_the_serializer_payload(self):
+        url = f"/api/marketplace/events/{self.event.slug}/"
+        response = self.client.get(url, {"fields": "id,title", "expand": "ticket_types"})
+
+        expected = EventDetailSerializer(self.event, fields=["id", "title", "ticket_types"]).data
+        self.assertEqual(response.data, expected)
+
+    def test_unknown_field_names_are_rejected(self):
+        response = self.client.get("/api/marketplace/events/", {"fields": "id,secret"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("secret", str(response.data["fields"]))
+        url = f"/api/marketplace/events/{self.event.slug}/"
+        self.assertEqual(self.client.get(url, {"expand": "organizer"}).status_code, 400)
+
+
+class OrganizerNameTests(CatalogFixtureMixin, TestCase):
+    def test_event_stores_organizer_display_name(self):
+        event = create_event(self.organizer, self.sport, self.category, self.location)
+        self.assertEqual(event.organizer_name, "Club Elan")
+
+    def test_profile_and_user_changes_update_events(self):
+        event = create_event(self.organizer, self.sport, self.category, self.location)
+
+        self.organizer.profile.organization_name = ""
+        self.organizer.profile.save()
+        event.refresh_from_db()
+        self.assertEqual(event.organizer_name, self.organizer.email)
+
+        self.organizer.first_name = "Ines"
+        self.organizer.save()
+        event.refresh_from_db()
+        self.assertEqual(event.organizer_name, "Ines")
+
+    def test_reassigning_the_organizer_renames_the_event(self):
+        event = create_event(self.organizer, self.sport, self.category, self.location)
+        other = create_organizer("other@example.com", organization_name="Club Nour")
+
+        event = Event.objects.get(pk=event.pk)
+        event.organizer = other
+        event.save(update_fields=["organizer"])
+
+        event.refresh_from_db()
+        self.assertEqual(event.organizer_name, "Club Nour")
+        self.assertEqual(CatalogEntry.objects.get(pk=event.pk).organizer_name, "Club Nour")
+
+
+class ProximityFilterTests(CatalogFixtureMixin, TestCase):
+    lat, lng, radius_km = 36.8, 10.18, 10
+
+    def setUp(self):
+        cache.clear()
+
+    def event_at(self, lat, lng):
+        location = Location.objects.create(
+            venue_name="Club", address_line1="Rue", city="Tunis", country="Tunisie",
+            latitude=f"{lat:.6f}", longitude=f"{lng:.6f}",
+        )
+        return create_event(self.organizer, self.sport, self.category, location)
+
+    def near(self, **params):
+        params = {"near": f"{self.lat},{self.lng}", "radius_km": self.radius_km, **params}
+        return self.client.get("/api/marketplace/events/", params)
+
+    def test_bounding_box_corners_are_cut_by_the_haversine_distance(self):
+        min_lat, max_lat, min_lng, max_lng = bounding_box(self.lat, self.lng, self.radius_km)
+        lat_step, lng_step = (max_lat - self.lat) * 0.98, (max_lng - self.lng) * 0.98
+        inside = [self.event_at(self.lat + lat_step, self.lng), self.event_at(self.lat, self.lng - lng_step)]
+        # Corners are inside the box but about radius * sqrt(2) away.
+        self.event_at(self.lat + lat_step, self.lng + lng_step)
+        self.event_at(self.lat - lat_step, self.lng - lng_step)
+
+        rows = self.near(sort="distance").data
+        self.assertEqual(sorted(row["id"] for row in rows), sorted(event.id for event in inside))
+        self.assertTrue(all(9.5 < row["distance_km"] <= self.radius_km for row in rows))
+
+    def test_non_finite_coordinates_and_radius_are_rejected(self):
+        self.assertIsNone(parse_point("nan,10"))
+        self.assertIsNone(parse_point("36.8,inf"))
+        self.assertIsNone(parse_point("1e400,10"))
+        self.assertEqual(self.near(near="nan,nan").status_code, 400)
+        for radius in ("nan", "inf", "-inf"):
+            self.assertEqual(self.near(radius_km=radius).status_code, 400)
+
+
+class FacetTests(CatalogFixtureMixin, TestCase):
+    url = "/api/marketplace/events/facets/"
+
+    def setUp(self):
+        cache.clear()
+        tennis = Sport.objects.create(name="Tennis")
+        sousse = Location.objects.create(
+            venue_name="Tennis Club", address_line1="Corniche", city="Sousse", country="Tunisie"
+        )
+        create_event(self.organizer, self.sport, self.category, self.location)
+        create_event(self.organizer, self.sport, self.category, sousse, event_type=Event.EventType.MATCH)
+        create_event(
+            self.organizer, tennis, EventCategory.objects.create(sport=tennis, name="Tournoi"), sousse
+        )
+        create_event(self.organizer, self.sport, self.category, self.location, status=Event.Status.DRAFT)
+
+    def counts(self, facets, name, key="value"):
+        return {row[key]: row["count"] for row in facets[name]}
+
+    def test_unfiltered_counts_cover_published_events(self):
+        facets = self.client.get(self.url).data
+        self.assertEqual(facets["total"], 3)
+        self.assertEqual(self.counts(facets, "sport", "slug"), {"padel": 2, "tennis": 1})
+        self.assertEqual(self.counts(facets, "city"), {"Tunis": 1, "Sousse": 2})
+        self.assertEqual(self.counts(facets, "event_type"), {"tournament": 2, "match": 1})
+
+    def test_filtered_counts_follow_catalog_filters(self):
+        facets = self.client.get(self.url, {"city": "sousse", "sport": "padel"}).data
+        self.assertEqual(facets["total"], 1)
+        self.assertEqual(self.counts(facets, "sport", "slug"), {"padel": 1})
+        self.assertEqual(self.counts(facets, "event_type"), {"match": 1})
+        self.assertEqual(self.client.get(self.url, {"city": "bizerte"}).data["total"], 0)
+
+    def test_event_titled_facets_keeps_its_detail_route(self):
+        event = create_event(self.organizer, self.sport, self.category, self.location, title="Facets")
+        self.assertEqual(event.slug, "facets-2")
+        self.assertEqual(allocate_slugs(Event, ["Facets"], max_length=180), ["facets-3"])
+        response = self.client.get(f"/api/marketplace/events/{event.slug}/")
+        self.assertEqual(response.data["id"], event.id)
+
+
+class CatalogCacheTests(CatalogFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = create_event(self.organizer, self.sport, self.category, self.location)
+        self.athlete = User.objects.create_user(username="seat@example.com")
+
+    def seats(self):
+        return self.client.get("/api/marketplace/events/").data[0]["capacity_available"]
+
+    def test_seat_changes_keep_cached_lists(self):
+        self.assertEqual(self.seats(), 16)
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            join_event(self.event.id, self.athlete.id)
+            leave_event(self.event.id, self.athlete.id)
+            join_event(self.event.id, self.athlete.id)
+
+        self.assertEqual(get_catalog_version(), version)
+        # Lists lag by at most CATALOG_CACHE_TIMEOUT; the detail is keyed on its ETag.
+        self.assertEqual(self.seats(), 16)
+        detail = self.client.get(f"/api/marketplace/events/{self.event.slug}/")
+        self.assertEqual(detail.data["capacity_available"], 15)
+
+    def test_ticket_holds_show_in_cached_details(self):
+        ticket_type = TicketType.objects.create(event=self.event, name="Standard", price="0", quantity_total=5)
+        url = f"/api/marketplace/events/{self.event.slug}/?expand=ticket_types"
+        self.assertEqual(self.client.get(url).data["ticket_types"][0]["quantity_held"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            hold_tickets(ticket_type.id, self.athlete.id, 2)
+        self.assertEqual(self.client.get(url).data["ticket_types"][0]["quantity_held"], 2)
+
+
+class ConditionalGetTests(CatalogFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = create_event(self.organizer, self.sport, self.category, self.location)
+        self.url = f"/api/marketplace/events/{self.event.slug}/"
+
+    def test_matching_etag_gets_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_join_changes_the_etag_and_defeats_if_modified_since(self):
+        first = self.client.get(self.url)
+        # Seat counts are not tracked by a timestamp, so no Last-Modified is sent.
+        self.assertFalse(first.has_header("Last-Modified"))
+        athlete = User.objects.create_user(username="etag@example.com")
+        join_event(self.event.id, athlete.id)
+
+        after = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after["ETag"], first["ETag"])
+        self.assertEqual(after.data["capacity_available"], 15)
+        since = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(since.status_code, 200)
+
+    def test_sport_list_answers_if_modified_since(self):
+        first = self.client.get("/api/marketplace/sports/")
+        again = self.client.get("/api/marketplace/sports/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(again.status_code, 304)
+
+
+class CatalogEntryTests(CatalogFixtureMixin, TestCase):
+    def test_catalog_rows_match_event_list_serializer(self):
+        create_event(self.organizer, self.sport, self.category, self.location, capacity_reserved=4)
+        create_event(self.organizer, self.sport, self.category, self.location, is_free=False)
+
+        expected = EventListSerializer(Event.objects.order_by("id"), many=True).data
+        rows = event_list_values(
+            CatalogEntry.objects.order_by("event_id"), sources=CATALOG_SOURCES
+        )
+        actual = render_event_rows(rows, sources=CATALOG_SOURCES)
+
+        self.assertEqual([dict(row) for row in expected], actual)
+
+    def test_entry_follows_event_lifecycle(self):
+        event = create_event(self.organizer, self.sport, self.category, self.location, is_free=False)
+        TicketType.objects.create(event=event, name="Standard", price="40.00")
+        TicketType.objects.create(event=event, name="VIP", price="25.00")
+        self.assertEqual(CatalogEntry.objects.get(pk=event.pk).min_price, 25)
+
+        self.location.city = "La Marsa"
+        self.location.save()
+        self.assertEqual(CatalogEntry.objects.get(pk=event.pk).city_normalized, "la marsa")
+
+        event.status = Event.Status.CANCELLED
+        event.save()
+        self.assertFalse(CatalogEntry.objects.filter(pk=event.pk).exists())
+
+
+# Hundreds of threads join at once; each one holds its own connection.
+# Stays well below MySQL's default max_connections (151).
+JOIN_RUSH_THREADS = 25
+
+
+def skip_without_concurrent_connections(test):
+    # SQLite's in-memory test database locks whole tables between connections.
+    if connection.vendor == "sqlite" and connection.is_in_memory_db():
+        test.skipTest("Needs a test database that serves concurrent connections.")
+
+
+class JoinContentionTests(CatalogFixtureMixin, TransactionTestCase):
+    def setUp(self):
+        self.setUpTestData()
+
+    def join_concurrently(self, event, users):
+        results = []
+        errors = []
+        barrier = threading.Barrier(len(users))
+
+        def worker(user):
+            try:
+                barrier.wait()
+                results.append(join_event(event.id, user.id))
+            except Exception as exc:
+                # Lock errors (deadlocks, lock timeouts) must fail the test.
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return results
+
+    def test_concurrent_joins_never_oversell(self):
+        skip_without_concurrent_connections(self)
+        event = create_event(
+            self.organizer, self.sport, self.category, self.location, capacity_total=10
+        )
+        User.objects.bulk_create(
+            User(username=f"a{i}@example.com") for i in range(JOIN_RUSH_THREADS)
+        )
+        athletes = list(User.objects.filter(username__startswith="a", username__endswith="@example.com"))
+
+        results = self.join_concurrently(event, athletes)
+
+        self.assertEqual(len(results), JOIN_RUSH_THREADS)
+        self.assertEqual(results.count(JOINED), 10)
+        self.assertEqual(results.count(FULL), JOIN_RUSH_THREADS - 10)
+        event.refresh_from_db()
+        self.assertEqual(event.capacity_reserved, 10)
+        self.assertEqual(EventParticipant.objects.filter(event=event).count(), 10)
+        self.assertEqual(CatalogEntry.objects.get(pk=event.pk).seats_available, 0)
+
+    def test_deadlock_victims_are_retried_outside_outer_transactions(self):
+        deadlock = OperationalError(1213, "Deadlock found when trying to get lock")
+        with mock.patch("events.joins._join", side_effect=[deadlock, JOINED]) as join:
+            self.assertEqual(join_event(1, 1), JOINED)
+        self.assertEqual(join.call_count, 2)
+
+        with mock.patch("events.joins._join", side_effect=[deadlock, JOINED]):
+            with self.assertRaises(OperationalError), transaction.atomic():
+                join_event(1, 1)
+
+    def test_rejoin_and_leave_keep_counts_exact(self):
+        event = create_event(
+            self.organizer, self.sport, self.category, self.location, capacity_total=1
+        )
+        athlete = User.objects.create_user(username="solo@example.com")
+
+        self.assertEqual(join_event(event.id, athlete.id), JOINED)
+        self.assertEqual(join_event(event.id, athlete.id), ALREADY_JOINED)
+        self.assertTrue(leave_event(event.id, athlete.id))
+        self.assertFalse(leave_event(event.id, athlete.id))
+
+        event.refresh_from_db()
+        self.assertEqual(event.capacity_reserved, 0)
+        self.assertEqual(CatalogEntry.objects.get(pk=event.pk).seats_available, 1)
+
+
+class WaitlistTests(CatalogFixtureMixin, TestCase):
+    def test_freed_seat_goes_to_oldest_waitlist_entry(self):
+        event = create_event(
+            self.organizer, self.sport, self.category, self.location, capacity_total=1
+        )
+        first, second, third = [
+            User.objects.create_user(username=f"w{i}@example.com") for i in range(3)
+        ]
+        self.assertEqual(join_event(event.id, first.id), JOINED)
+        self.assertEqual(join_event(event.id, second.id), FULL)
+        self.assertEqual(enqueue(event.id, second.id), 1)
+        self.assertEqual(enqueue(event.id, third.id), 2)
+
+        self.assertTrue(leave_event(event.id, first.id))
+
+        self.assertTrue(EventParticipant.objects.filter(event=event, user=second).exists())
+        self.assertEqual(
+            list(WaitlistEntry.objects.filter(event=event).values_list("user", flat=True)),
+            [third.id],
+        )
+        event.refresh_from_db()
+        self.assertEqual(event.capacity_reserved, 1)
+
+
+@override_settings(EVENT_JOIN_ADMISSION_RATE=2)
+class AdmissionTests(CatalogFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        clock = mock.patch("events.admission.time.time", return_value=1_000_000.0)
+        self.clock = clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_rush_is_admitted_at_configured_rate(self):
+        results = [admit("tournoi", user_id) for user_id in range(1, 6)]
+
+        self.assertEqual(results[:2], [None, None])
+        self.assertEqual([position for position, _ in results[2:]], [1, 2, 3])
+        # A retry keeps the ticket handed out on the first attempt.
+        self.assertEqual(admit("tournoi", 5)[0], 3)
+
+        # Two more tickets are served per second, whichever worker asks.
+        self.clock.return_value += 1
+        self.assertIsNone(admit("tournoi", 3))
+        self.assertIsNone(admit("tournoi", 4))
+        self.assertEqual(admit("tournoi", 5)[0], 1)
+
+    def test_numbering_survives_a_rush_longer_than_the_room_timeout(self):
+        for user_id in range(1, 6):
+            admit("tournoi", user_id)
+        for user_id in (6, 7):
+            self.clock.return_value += ROOM_TIMEOUT * 2 / 3
+            admit("tournoi", user_id)
+
+        self.assertEqual(cache.get("events:joinroom:tournoi:tail"), 7)
+
+    def test_unknown_events_and_organizers_take_no_ticket(self):
+        event = create_event(self.organizer, self.sport, self.category, self.location)
+        client = APIClient()
+        client.force_authenticate(self.organizer)
+        self.assertEqual(client.post(f"/api/marketplace/events/{event.slug}/join/").status_code, 400)
+        athlete = User.objects.create_user(username="room@example.com")
+        client.force_authenticate(athlete)
+        for _ in range(3):
+            self.assertEqual(client.post("/api/marketplace/events/missing/join/").status_code, 404)
+
+        self.assertEqual(client.post(f"/api/marketplace/events/{event.slug}/join/").status_code, 201)
+        self.assertEqual(cache.get(f"events:joinroom:{event.slug}:tail"), 1)
+
+    @override_settings(EVENT_JOIN_ADMISSION_RATE=0)
+    def test_disabled_room_admits_everyone(self):
+        self.assertIsNone(admit("tournoi", 1))
+
+
+class TicketHoldTests(CatalogFixtureMixin, TestCase):
+    def setUp(self):
+        event = create_event(self.organizer, self.sport, self.category, self.location, is_free=False)
+        self.ticket_type = TicketType.objects.create(
+            event=event, name="Standard", price="40.00", quantity_total=5
+        )
+        self.buyer = User.objects.create_user(username="buyer@example.com")
+
+    def assertCounters(self, sold, held):
+        self.ticket_type.refresh_from_db()
+        self.assertEqual(
+            (self.ticket_type.quantity_sold, self.ticket_type.quantity_held), (sold, held)
+        )
+
+    def test_hold_confirm_and_release(self):
+        sold = hold_tickets(self.ticket_type.id, self.buyer.id, 3)
+        released = hold_tickets(self.ticket_type.id, self.buyer.id, 2)
+        with self.assertRaises(SoldOut):
+            hold_tickets(self.ticket_type.id, self.buyer.id, 1)
+
+        confirm_hold(sold.id, self.buyer.id)
+        release_hold(released.id, self.buyer.id)
+        self.assertCounters(sold=3, held=0)
+        with self.assertRaises(HoldUnavailable):
+            confirm_hold(released.id, self.buyer.id)
+
+    def test_expired_holds_are_reclaimed(self):
+        stale = hold_tickets(self.ticket_type.id, self.buyer.id, 5)
+        TicketHold.objects.filter(pk=stale.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        with self.assertRaises(HoldUnavailable):
+            confirm_hold(stale.id, self.buyer.id)
+        # The sold-out check reclaims the stale hold before giving up.
+        hold_tickets(self.ticket_type.id, self.buyer.id, 4)
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, TicketHold.Status.EXPIRED)
+        self.assertCounters(sold=0, held=4)
+        self.assertEqual(expire_holds(), 0)
+
+    def test_holds_spread_over_stock_slots(self):
+        self.ticket_type.stock_slots.update(quantity_total=10)
+        slots = {hold_tickets(self.ticket_type.id, self.buyer.id, 1).slot for _ in range(40)}
+
+        self.assertGreater(len(slots), 1)
+        self.assertCounters(sold=0, held=40)
+
+    def test_hold_gathers_stock_split_across_slots(self):
+        # Five tickets over eight slots: no slot can cover three on its own.
+        hold = hold_tickets(self.ticket_type.id, self.buyer.id, 3)
+
+        slot = self.ticket_type.stock_slots.get(slot=hold.slot)
+        self.assertEqual((slot.quantity_total, slot.quantity_held), (3, 3))
+        self.assertEqual(
+            TicketStockSlot.objects.filter(ticket_type=self.ticket_type).aggregate(
+                total=Sum("quantity_total")
+            )["total"],
+            5,
+        )
+        self.assertCounters(sold=0, held=3)
+
+    def test_resize_keeps_taken_tickets(self):
+        hold = hold_tickets(self.ticket_type.id, self.buyer.id, 2)
+        confirm_hold(hold.id, self.buyer.id)
+        hold_tickets(self.ticket_type.id, self.buyer.id, 1)
+        url = f"/api/marketplace/organizer/events/{self.ticket_type.event_id}/tickets/{self.ticket_type.id}/"
+        client = APIClient()
+        client.force_authenticate(self.organizer)
+
+        self.assertEqual(client.patch(url, {"quantity_total": 2}, format="json").status_code, 400)
+        response = client.patch(url, {"quantity_total": 20}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.data["quantity_sold"], response.data["quantity_held"], response.data["quantity_available"]),
+            (2, 1, 17),
+        )
+        self.assertEqual(
+            sum(slot.quantity_total for slot in self.ticket_type.stock_slots.all()), 20
+        )
+
+
+class TicketHoldDeadlockTests(CatalogFixtureMixin, TransactionTestCase):
+    def setUp(self):
+        self.setUpTestData()
+
+    def test_deadlock_victims_are_retried(self):
+        event = create_event(self.organizer, self.sport, self.category, self.location, is_free=False)
+        ticket_type = TicketType.objects.create(event=event, name="Standard", price="40.00", quantity_total=5)
+        buyer = User.objects.create_user(username="buyer@example.com")
+        deadlock = OperationalError(1213, "Deadlock found when trying to get lock")
+
+        with mock.patch("events.holds._take", side_effect=[deadlock, 0]) as take:
+            hold = hold_tickets(ticket_type.id, buyer.id, 2)
+        self.assertEqual(take.call_count, 2)
+        self.assertEqual(hold.slot, 0)
+
+        with mock.patch("events.holds._settle", side_effect=[deadlock, hold]) as settle:
+            confirm_hold(hold.id, buyer.id)
+        self.assertEqual(settle.call_count, 2)
+
+
+class IdempotencyKeyTests(CatalogFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = create_event(self.organizer, self.sport, self.category, self.location)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="fan@example.com"))
+
+    def post_favorite(self, key, event_id):
+        return self.client.post(
+            "/api/marketplace/favorites/",
+            {"event_id": event_id},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.post_favorite("fav-1", self.event.id)
+        retry = self.post_favorite("fav-1", self.event.id)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Favorite.objects.count(), 1)
+
+    def test_key_reused_with_other_body_is_rejected(self):
+        self.post_favorite("fav-1", self.event.id)
+        self.assertEqual(self.post_favorite("fav-1", self.event.id + 1).status_code, 422)
+
+    def test_retry_while_first_request_runs_is_a_conflict(self):
+        retries = []
+
+        def save_after_retry(view, serializer):
+            retries.append(self.post_favorite("fav-1", self.event.id))
+            serializer.save(user_id=view.request.user.id)
+
+        with mock.patch.object(FavoriteListCreateView, "perform_create", save_after_retry):
+            first = self.post_favorite("fav-1", self.event.id)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retries[0].status_code, 409)
+
+    def test_server_error_leaves_key_retryable(self):
+        self.client.raise_request_exception = False
+        with mock.patch.object(FavoriteListCreateView, "perform_create", side_effect=RuntimeError):
+            self.assertEqual(self.post_favorite("fav-1", self.event.id).status_code, 500)
+
+        retry = self.post_favorite("fav-1", self.event.id)
+
+        self.assertEqual(retry.status_code, 201)
+        self.assertFalse(retry.has_header("Idempotent-Replayed"))
+        self.assertEqual(Favorite.objects.count(), 1)
+
+    def test_waiting_room_rejection_is_not_replayed(self):
+        url = f"/api/marketplace/events/{self.event.slug}/join/"
+        with mock.patch("events.views.admit", return_value=(3, 5)):
+            queued = self.client.post(url, HTTP_IDEMPOTENCY_KEY="join-1")
+        joined = self.client.post(url, HTTP_IDEMPOTENCY_KEY="join-1")
+        retry = self.client.post(url, HTTP_IDEMPOTENCY_KEY="join-1")
+
+        self.assertEqual(queued.status_code, 429)
+        self.assertEqual(joined.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(EventParticipant.objects.filter(event=self.event).count(), 1)
+
+    def test_organizer_create_runs_once(self):
+        client = APIClient()
+        client.force_authenticate(self.organizer)
+        payload = {
+            "title": "Open de Sousse",
+            "description": "Tournoi ouvert.",
+            "sport": self.sport.id,
+            "category": self.category.id,
+            "event_type": Event.EventType.TOURNAMENT,
+            "start_at": "2030-01-01T10:00:00Z",
+            "end_at": "2030-01-01T12:00:00Z",
+            "capacity_total": 8,
+            "is_free": True,
+            "location": {"venue_name": "Club", "address_line1": "Corniche", "city": "Sousse", "country": "Tunisie"},
+        }
+
+        responses = [
+            client.post("/api/marketplace/organizer/events/", payload, format="json", HTTP_IDEMPOTENCY_KEY="open-1")
+            for _ in range(2)
+        ]
+
+        self.assertEqual([response.status_code for response in responses], [201, 201])
+        self.assertEqual(responses[1].json(), responses[0].json())
+        self.assertEqual(Event.objects.filter(title="Open de Sousse").count(), 1)
+
+
+class GenerateDatasetTests(TestCase):
+    def generate(self):
+        call_command(
+            "generate_dataset", users=40, organizers=4, locations=5, events=60,
+            favorites=80, participants=300, chunk_size=25, as_of="2030-01-01", stdout=StringIO(),
+        )
+
+    def test_builds_consistent_rows(self):
+        self.generate()
+
+        self.assertEqual(Profile.objects.count(), 40)
+        self.assertEqual(Profile.objects.filter(role="organizer").count(), 4)
+        reserved = Event.objects.aggregate(total=Sum("capacity_reserved"))["total"]
+        self.assertEqual(EventParticipant.objects.count(), reserved)
+        self.assertEqual(
+            CatalogEntry.objects.count(), Event.objects.filter(status=Event.Status.PUBLISHED).count()
+        )
+        self.assertFalse(Event.objects.filter(organizer_name="").exists())
+
+    def test_same_seed_gives_same_rows(self):
+        self.generate()
+        columns = ("slug", "capacity_reserved", "location__city", "start_at")
+        first = list(Event.objects.order_by("id").values_list(*columns))
+        User.objects.filter(username__endswith="@dataset.example.com").delete()
+        Location.objects.all().delete()
+        with mock.patch("django.utils.timezone.now", return_value=timezone.now() + timedelta(days=3)):
+            self.generate()
+        second = list(Event.objects.order_by("id").values_list(*columns))
+        self.assertEqual(first, second)
+
+    def test_participants_are_capped_by_users(self):
+        call_command(
+            "generate_dataset", users=20, organizers=2, locations=3, events=30,
+            favorites=10, participants=600, as_of="2030-01-01", stdout=StringIO(),
+        )
+        self.assertEqual(
+            EventParticipant.objects.count(), Event.objects.aggregate(total=Sum("capacity_reserved"))["total"]
+        )
+        self.assertLessEqual(max(Event.objects.values_list("capacity_reserved", flat=True)), 20)
+
+    def test_events_need_an_organizer(self):
+        with self.assertRaises(CommandError):
+            call_command("generate_dataset", users=5, organizers=0, events=3, stdout=StringIO())
+
+
+class SlugAllocationTests(CatalogFixtureMixin, TestCase):
+    def test_batch_allocation_uses_one_query(self):
+        for _ in range(5):
+            create_event(self.organizer, self.sport, self.category, self.location)
+        create_event(self.organizer, self.sport, self.category, self.location, title="Tournoi de Padel Pro")
+
+        with self.assertNumQueries(1):
+            slugs = allocate_slugs(Event, ["Tournoi de Padel"] * 3 + ["Open"], max_length=180)
+        self.assertEqual(slugs, ["tournoi-de-padel-6", "tournoi-de-padel-7", "tournoi-de-padel-8", "open"])
+
+    def test_only_numbered_variants_are_read(self):
+        for title in ("Tournoi", "Tournoi", "Tournoi de Padel", "Tournoi 2030 Final"):
+            create_event(self.organizer, self.sport, self.category, self.location, title=title)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(allocate_slugs(Event, ["Tournoi"], max_length=180), ["tournoi-3"])
+        with connection.cursor() as cursor:
+            cursor.execute(queries[0]["sql"])
+            self.assertEqual(sorted(row[0] for row in cursor.fetchall()), ["tournoi", "tournoi-2"])
+
+    def test_long_titles_keep_suffix_within_max_length(self):
+        title = "Tournoi " * 30
+        first = create_event(self.organizer, self.sport, self.category, self.location, title=title)
+        second = create_event(self.organizer, self.sport, self.category, self.location, title=title)
+        self.assertEqual(len(first.slug), 180)
+        self.assertEqual(second.slug, f"{first.slug[:178]}-2")
+
+    def test_category_slugs_are_scoped_by_sport(self):
+        tennis = Sport.objects.create(name="Tennis")
+        self.assertEqual(EventCategory.objects.create(sport=tennis, name="Tournoi").slug, "tournoi")
+        self.assertEqual(EventCategory.objects.create(sport=tennis, name="Tournoi").slug, "tournoi-2")
+
+    def test_save_retries_when_a_concurrent_writer_takes_the_slug(self):
+        create_event(self.organizer, self.sport, self.category, self.location)
+        allocated = []
+
+        def stale_then_fresh(*args, **kwargs):
+            # The first allocation runs as if the other writer had not committed yet.
+            allocated.append(unique_slug(*args, **kwargs) if allocated else "tournoi-de-padel")
+            return allocated[-1]
+
+        with mock.patch("events.models._unique_slug", side_effect=stale_then_fresh):
+            event = create_event(self.organizer, self.sport, self.category, self.location)
+        self.assertEqual(allocated, ["tournoi-de-padel", "tournoi-de-padel-2"])
+        self.assertEqual(event.slug, "tournoi-de-padel-2")
+
+
+class ExportTests(CatalogFixtureMixin, TestCase):
+    def setUp(self):
+        self.event = create_event(self.organizer, self.sport, self.category, self.location)
+        self.athletes = [
+            User.objects.create_user(username=f"ath{index}@example.com", email=f"ath{index}@example.com")
+            for index in range(3)
+        ]
+        for athlete in self.athletes:
+            EventParticipant.objects.create(event=self.event, user=athlete)
+        Favorite.objects.create(event=self.event, user=self.athletes[0])
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {tokens_for_user(self.organizer).access_token}"
+        )
+
+    def test_iter_rows_reads_every_chunk(self):
+        queryset = EventParticipant.objects.filter(event=self.event)
+        with self.assertNumQueries(2):
+            rows = list(iter_rows(queryset, ["user_id"], chunk_size=2))
+        self.assertEqual(rows, [(athlete.pk,) for athlete in self.athletes])
+
+    def test_event_export_streams_csv_with_counts(self):
+        response = self.client.get("/api/marketplace/organizer/events/export.csv")
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith("id,title,slug,"))
+        self.assertEqual(lines[1].split(",")[-2:], ["3", "1"])
+
+    def test_csv_export_quotes_formulas(self):
+        athlete = self.athletes[0]
+        athlete.first_name = '=HYPERLINK("http://evil.example","x")'
+        athlete.last_name = "-Ben Ali"
+        athlete.save()
+        url = f"/api/marketplace/organizer/events/{self.event.id}/participants/export"
+
+        csv_rows = list(csv.reader(b"".join(self.client.get(f"{url}.csv").streaming_content).decode().splitlines()))
+        ndjson = b"".join(self.client.get(f"{url}.ndjson").streaming_content).splitlines()
+
+        self.assertIn("'=HYPERLINK(\"http://evil.example\",\"x\")", csv_rows[1])
+        self.assertIn("'-Ben Ali", csv_rows[1])
+        self.assertEqual(json.loads(ndjson[0])["last_name"], "-Ben Ali")
+
+    def test_participant_export_streams_ndjson_for_owner_only(self):
+        url = f"/api/marketplace/organizer/events/{self.event.id}/participants/export.ndjson"
+        response = self.client.get(url)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([row["email"] for row in rows], [user.email for user in self.athletes])
+        self.assertEqual(self.client.get(url.replace("ndjson", "xlsx")).status_code, 404)
+
+        other = create_organizer("other@example.com")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens_for_user(other).access_token}")
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+IMPORT_CSV_HEADER = (
+    "title,description,sport,category,event_type,start_at,end_at,capacity_total,is_free,status,"
+    "venue_name,address_line1,city,country,tickets\n"
+)
+
+
+class EventImportTests(CatalogFixtureMixin, TestCase):
+    def csv_row(self, title="Tournoi de Padel", end_at="2030-05-01T12:00:00Z"):
+        return (
+            f"{title},Ouvert,padel,tournoi,tournament,2030-05-01T10:00:00Z,{end_at},16,false,"
+            "published,Padel Club,Rue du Lac,Tunis,Tunisie,Standard:20:10;VIP:50:4\n"
+        )
+
+    def upload(self, content, name="saison.csv"):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens_for_user(self.organizer).access_token}")
+        upload = SimpleUploadedFile(name, content.encode())
+        return client.post("/api/marketplace/organizer/events/import/", {"file": upload}, format="multipart")
+
+    def test_csv_import_reports_row_errors_and_reuses_locations(self):
+        create_event(self.organizer, self.sport, self.category, self.location)
+        content = IMPORT_CSV_HEADER + self.csv_row() + self.csv_row() + self.csv_row(
+            end_at="2030-05-01T09:00:00Z"
+        )
+        response = self.upload(content)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["rows"], response.data["created"]), (3, 2))
+        self.assertEqual([error["row"] for error in response.data["errors"]], [3])
+        imported = Event.objects.filter(slug__in=["tournoi-de-padel-2", "tournoi-de-padel-3"])
+        self.assertEqual(imported.count(), 2)
+        self.assertEqual(set(imported.values_list("status", flat=True)), {Event.Status.PENDING})
+        self.assertEqual(Location.objects.count(), 2)
+        self.assertEqual(len(set(imported.values_list("location_id", flat=True))), 1)
+        self.assertEqual(TicketType.objects.filter(event__in=imported).count(), 4)
+        self.assertEqual(imported.first().organizer_name, "Club Elan")
+
+    def test_admin_import_targets_the_posted_organizer(self):
+        admin = User.objects.create_user(username="admin@example.com", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+        url = "/api/marketplace/admin/events/import/"
+
+        def post(**data):
+            upload = SimpleUploadedFile("saison.csv", (IMPORT_CSV_HEADER + self.csv_row()).encode())
+            return client.post(url, {"file": upload, **data}, format="multipart")
+
+        self.assertIn("organizer", post().data)
+        self.assertEqual(post(organizer=admin.id).status_code, 404)
+        response = post(organizer=self.organizer.id)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Event.objects.get(slug="tournoi-de-padel").organizer, self.organizer)
+
+    def test_json_import_publishes_for_staff_with_flat_query_count(self):
+        def rows(count, start):
+            return [
+                {
+                    "title": f"Open {start + index}",
+                    "description": "Tournoi",
+                    "sport": self.sport.id,
+                    "category": "tournoi",
+                    "event_type": "tournament",
+                    "start_at": "2030-05-01T10:00:00Z",
+                    "end_at": "2030-05-01T12:00:00Z",
+                    "is_free": True,
+                    "status": "published",
+                    "location": {
+                        "venue_name": f"Club {start + index % 2}",
+                        "address_line1": "Rue",
+                        "city": "Sousse",
+                        "country": "Tunisie",
+                    },
+                }
+                for index in range(count)
+            ]
+
+        def run(count, start):
+            stream = SimpleUploadedFile("saison.json", json.dumps(rows(count, start)).encode())
+            importer = EventImporter(self.organizer, is_staff=True)
+            with CaptureQueriesContext(connection) as captured:
+                report = importer.run(read_rows(stream, "json"))
+            self.assertEqual(report["created"], count, report["errors"])
+            return len(captured)
+
+        self.assertEqual(run(2, 0), run(10, 100))
+        self.assertEqual(CatalogEntry.objects.count(), 12)
+        self.assertTrue(EventSearchTerm.objects.filter(term="open").exists())
+
+
+class JoinRushLoadTestTests(TransactionTestCase):
+    def setUp(self):
+        skip_without_concurrent_connections(self)
+
+    def test_rush_fills_the_event_and_leaves_nothing_behind(self):
+        with tempfile.NamedTemporaryFile("r", suffix=".json") as output:
+            call_command(
+                "loadtest_join_rush", users=12, workers=4, capacity=5, leave_rate=0,
+                admission_rate=0, output=output.name, stdout=StringIO(),
+            )
+            report = json.load(output)
+
+        self.assertEqual((report["admitted"], report["oversell"], report["counter_drift"]), (5, 0, 0))
+        self.assertEqual(report["statuses"], {"join 201": 5, "join 400": 7})
+        self.assertGreater(report["locking_statements"]["count"], 0)
+        self.assertFalse(Event.objects.exists())
+        self.assertFalse(Sport.objects.exists())
+        self.assertFalse(EventCategory.objects.exists())
+        self.assertFalse(Location.objects.exists())
+        self.assertFalse(User.objects.exists())
+
+
+class BenchmarkingTests(TestCase):
+    def test_percentiles_use_nearest_rank(self):
+        latencies = [index / 1000 for index in range(1, 101)]
+        self.assertEqual((percentile(latencies, 50), percentile(latencies, 99)), (0.05, 0.099))
+        summary = summarize(latencies, 2.0, [1] * 100)
+        self.assertEqual((summary["throughput_rps"], summary["p95_ms"]), (50.0, 95.0))
+
+    def test_compare_flags_slower_runs_and_extra_queries(self):
+        before = {"p50_ms": 10, "p95_ms": 20, "p99_ms": 30, "throughput_rps": 100, "queries_per_request": 1}
+        after = dict(before, p95_ms=21, p99_ms=40, queries_per_request=2)
+        regressions = compare_results({"1000": {"events-list": before}}, {"1000": {"events-list": after}})
+        self.assertEqual([metric for _scale, _name, metric, *_values in regressions], ["p99_ms", "queries_per_request"])
+
+
+class EndpointQueryBudgetTests(QueryBudgetTestMixin, CatalogFixtureMixin, TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        self.athlete = User.objects.create_user(username="ath@example.com", email="ath@example.com")
+        self.admin = User.objects.create_user(username="admin@example.com", is_staff=True)
+        self.events = []
+        self.add_events(3)
+        self.event = self.events[0]
+
+    def add_events(self, count):
+        for _ in range(count):
+            event = create_event(self.organizer, self.sport, self.category, self.location)
+            TicketType.objects.create(event=event, name="Standard", price="0", quantity_total=10)
+            EventMedia.objects.create(event=event, media_type="image", url="https://example.com/a.png")
+            Favorite.objects.create(event=event, user=self.athlete)
+            EventParticipant.objects.create(event=event, user=self.athlete)
+            self.events.append(event)
+
+    def request(self, method, path, user=None, data=None):
+        cache.clear()
+        if user:
+            access = tokens_for_user(user).access_token
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        else:
+            self.client.credentials()
+        response = self.assertQueryBudget(method, f"/api/marketplace/{path}", data, format="json")
+        self.assertLess(response.status_code, 400, getattr(response, "data", None))
+        return response
+
+    def test_catalog_routes(self):
+        slug = self.event.slug
+        for path in (
+            "sports/",
+            "categories/",
+            "events/",
+            "events/?page_size=2",
+            "events/facets/",
+            f"events/{slug}/",
+            f"events/{slug}/?expand=ticket_types,media",
+        ):
+            self.request("GET", path)
+
+    def test_athlete_routes(self):
+        event = self.event
+        self.request("GET", f"events/{event.slug}/join/", self.athlete)
+        self.request("DELETE", f"events/{event.slug}/join/", self.athlete)
+        self.request("POST", f"events/{event.slug}/join/", self.athlete)
+        self.request("GET", "me/participations/", self.athlete)
+
+        favorite = Favorite.objects.get(event=event, user=self.athlete)
+        self.request("GET", "favorites/", self.athlete)
+        self.request("DELETE", f"favorites/{favorite.id}/", self.athlete)
+        self.request("POST", "favorites/", self.athlete, {"event_id": event.id})
+
+        paid = self.events[1]
+        Event.objects.filter(pk=paid.pk).update(is_free=False)
+        ticket_type = paid.ticket_types.get()
+        hold = self.request(
+            "POST", f"events/{paid.slug}/tickets/{ticket_type.id}/hold/", self.athlete, {"quantity": 1}
+        ).data
+        self.request("GET", f"holds/{hold['id']}/", self.athlete)
+        self.request("POST", f"holds/{hold['id']}/confirm/", self.athlete)
+        hold = self.request(
+            "POST", f"events/{paid.slug}/tickets/{ticket_type.id}/hold/", self.athlete, {"quantity": 1}
+        ).data
+        self.request("DELETE", f"holds/{hold['id']}/", self.athlete)
+
+    def test_organizer_routes(self):
+        event = self.event
+        self.request("GET", "organizer/events/", self.organizer)
+        self.request("POST", "organizer/events/", self.organizer, {
+            "title": "Open de Sousse",
+            "description": "Tournoi ouvert.",
+            "sport": self.sport.id,
+            "category": self.category.id,
+            "event_type": Event.EventType.TOURNAMENT,
+            "start_at": "2030-01-01T10:00:00Z",
+            "end_at": "2030-01-01T12:00:00Z",
+            "capacity_total": 8,
+            "is_free": True,
+            "location": {
+                "venue_name": "Club",
+                "address_line1": "Corniche",
+                "city": "Sousse",
+                "country": "Tunisie",
+            },
+        })
+        self.request("GET", f"organizer/events/{event.id}/", self.organizer)
+        self.request("PATCH", f"organizer/events/{event.id}/", self.organizer, {"title": "Open"})
+
+        tickets = f"organizer/events/{event.id}/tickets/"
+        ticket = event.ticket_types.get()
+        self.request("GET", tickets, self.organizer)
+        self.request("POST", tickets, self.organizer, {"name": "VIP", "price": "0", "quantity_total": 4})
+        self.request("GET", f"{tickets}{ticket.id}/", self.organizer)
+        self.request("PATCH", f"{tickets}{ticket.id}/", self.organizer, {"quantity_total": 12})
+        self.request("DELETE", f"{tickets}{ticket.id}/", self.organizer)
+
+        media = f"organizer/events/{event.id}/media/"
+        item = event.media.get()
+        self.request("GET", media, self.organizer)
+        self.request("POST", media, self.organizer, {"media_type": "image", "url": "https://example.com/b.png"})
+        self.request("GET", f"{media}{item.id}/", self.organizer)
+        self.request("PATCH", f"{media}{item.id}/", self.organizer, {"title": "Affiche"})
+        self.request("DELETE", f"{media}{item.id}/", self.organizer)
+
+        self.request("DELETE", f"organizer/events/{event.id}/", self.organizer)
+
+    def test_exports_read_one_query_per_chunk(self):
+        # Streamed exports declare no budget: the body is read after the
+        # middleware returns. Their queries still must not grow with rows.
+        def export_queries():
+            counts = []
+            for path in (
+                "organizer/events/export.csv",
+                f"organizer/events/{self.event.id}/participants/export.ndjson",
+            ):
+                self.client.credentials(
+                    HTTP_AUTHORIZATION=f"Bearer {tokens_for_user(self.organizer).access_token}"
+                )
+                with CaptureQueriesContext(connection) as captured:
+                    response = self.client.get(f"/api/marketplace/{path}")
+                    self.assertEqual(response.status_code, 200)
+                    b"".join(response.streaming_content)
+                counts.append(len(captured))
+            return counts
+
+        before = export_queries()
+        self.add_events(10)
+        self.assertEqual(export_queries(), before)
+        self.assertEqual(before, [1, 2])
+
+    def test_admin_routes(self):
+        pending = self.events[2]
+        Event.objects.filter(pk=pending.pk).update(status=Event.Status.PENDING)
+        self.request("GET", "admin/events/", self.admin)
+        self.request("GET", f"admin/events/{pending.id}/", self.admin)
+        self.request("PATCH", f"admin/events/{pending.id}/moderate/", self.admin, {"status": "published"})
+
+    def test_list_query_counts_do_not_grow_with_rows(self):
+        routes = [
+            ("events/", None),
+            ("events/facets/", None),
+            ("organizer/events/", self.organizer),
+            ("favorites/", self.athlete),
+            ("me/participations/", self.athlete),
+        ]
+        before = [self.request("GET", path, user).query_count for path, user in routes]
+        self.add_events(10)
+        after = [self.request("GET", path, user).query_count for path, user in routes]
+        self.assertEqual(before, after)
@@ -6,13 +6,31 @@ urlpatterns = [
     path("sports/", views.SportListView.as_view(), name="sports-list"),
     path("categories/", views.CategoryListView.as_view(), name="categories-list"),
     path("events/", views.EventListView.as_view(), name="events-list"),
+    path("events/facets/", views.EventFacetView.as_view(), name="events-facets"),
     path("events/<slug:slug>/", views.EventDetailView.as_view(), name="events-detail"),
     path("events/<slug:slug>/join/", views.EventJoinView.as_view(), name="events-join"),
+    path(
+        "events/<slug:slug>/tickets/<int:ticket_type_id>/hold/",
+        views.TicketHoldCreateView.as_view(),
+        name="events-ticket-hold",
+    ),
+    path("holds/<int:pk>/", views.TicketHoldDetailView.as_view(), name="ticket-hold-detail"),
+    path("holds/<int:pk>/confirm/", views.TicketHoldConfirmView.as_view(), name="ticket-hold-confirm"),
     path(
         "organizer/events/",
         views.OrganizerEventListCreateView.as_view(),
         name="organizer-events",
     ),
+    path(
+        "organizer/events/import/",
+        views.OrganizerEventImportView.as_view(),
+        name="organizer-events-import",
+    ),
+    path(
+        "organizer/events/export.<slug:export_format>",
+        views.OrganizerEventExportView.as_view(),
+        name="organizer-events-export",
+    ),
     path(
         "organizer/events/<int:pk>/",
         views.OrganizerEventDetailView.as_view(),
@@ -28,6 +46,11 @@ urlpatterns = [
         views.OrganizerTicketTypeDetailView.as_view(),
         name="organizer-event-ticket-detail",
     ),
+    path(
+        "organizer/events/<int:event_id>/participants/export.<slug:export_format>",
+        views.OrganizerParticipantExportView.as_view(),
+        name="organizer-event-participants-export",
+    ),
     path(
         "organizer/events/<int:event_id>/media/",
         views.OrganizerEventMediaListCreateView.as_view(),
@@ -39,6 +62,7 @@ urlpatterns = [
         name="organizer-event-media-detail",
     ),
     path("admin/events/", views.AdminEventListView.as_view(), name="admin-events"),
+    path("admin/events/import/", views.AdminEventImportView.as_view(), name="admin-events-import"),
     path("admin/events/<int:pk>/", views.AdminEventDetailView.as_view(), name="admin-event-detail"),
     path("admin/events/<int:pk>/moderate/", views.AdminEventModerationView.as_view(), name="admin-event-moderate"),
 
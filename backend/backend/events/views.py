@@ -1,15 +1,52 @@
 from datetime import datetime, time
 
-from django.db import transaction
-
-from django.db.models import F, Q
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateTimeField, F, Max, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 from django.utils import dateparse, timezone
 from rest_framework import generics, permissions, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework.exceptions import ValidationError
-
-from .models import Event, EventCategory, EventMedia, EventParticipant, Favorite, Sport, TicketType
+from rest_framework.exceptions import NotFound, ValidationError
+
+from accounts.tokens import user_role
+from monitoring.metrics import EVENT_JOINS, EVENT_LEAVES, TICKET_HOLDS, TICKETS_SOLD, record_cache
+from monitoring.timing import TimedViewMixin, timed
+
+from .caching import (
+    CatalogCacheMixin,
+    ConditionalGetMixin,
+    build_etag,
+    get_catalog_version,
+    normalize_query,
+)
+from .exports import CONTENT_TYPES, export_response
+from .fastpath import CATALOG_SOURCES, LIST_FIELDS, event_list_values, render_event_rows
+from .geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, filter_near, parse_point
+from .admission import admit
+from .idempotency import IdempotentPostMixin
+from .imports import EventImporter, file_format, read_rows
+from .holds import HoldUnavailable, SoldOut, confirm_hold, hold_tickets, release_hold
+from .joins import ALREADY_JOINED, FULL, enqueue, join_event, leave_event, waitlist_position
+from .models import (
+    CatalogEntry,
+    Event,
+    EventCategory,
+    EventMedia,
+    EventParticipant,
+    Favorite,
+    Sport,
+    TicketHold,
+    TicketStockSlot,
+    TicketType,
+    WaitlistEntry,
+)
+from .pagination import KeysetCursorPagination
+from .search import normalize, search_events
 from .permissions import IsOrganizer, IsOrganizerOwner
 from .serializers import (
     EventCategorySerializer,
@@ -21,6 +58,7 @@ from .serializers import (
     FavoriteSerializer,
     ParticipationSerializer,
     SportSerializer,
+    TicketHoldSerializer,
     TicketTypeSerializer,
 )
 
@@ -40,13 +78,77 @@ def _parse_datetime(value):
     return None
 
 
-class SportListView(generics.ListAPIView):
+def _latest(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def _latest_child_update(model):
+    return Subquery(
+        model.objects.filter(event_id=OuterRef("pk"))
+        .order_by("-updated_at")
+        .values("updated_at")[:1],
+        output_field=DateTimeField(),
+    )
+
+
+def _child_count(model):
+    return Subquery(
+        model.objects.filter(event_id=OuterRef("pk"))
+        .order_by()
+        .values("event_id")
+        .annotate(total=Count("id"))
+        .values("total")[:1]
+    )
+
+
+def _child_sum(model, expression, event_field="event_id"):
+    return Subquery(
+        model.objects.filter(**{event_field: OuterRef("pk")})
+        .order_by()
+        .values(event_field)
+        .annotate(total=Sum(expression))
+        .values("total")[:1]
+    )
+
+
+def _expansions(names):
+    # Ticket counters are summed over the stock slots of each ticket type.
+    return [
+        Prefetch("ticket_types", queryset=TicketType.objects.prefetch_related("stock_slots"))
+        if name == "ticket_types"
+        else name
+        for name in names
+    ]
+
+
+class SportListView(TimedViewMixin, ConditionalGetMixin, CatalogCacheMixin, generics.ListAPIView):
     serializer_class = SportSerializer
     queryset = Sport.objects.filter(is_active=True).order_by("name")
+    cache_control_max_age = 3600
+    query_budget = 2
 
+    def get_validators(self, request, *args, **kwargs):
+        stats = self.get_queryset().aggregate(last_modified=Max("updated_at"), total=Count("id"))
+        return build_etag("sports", stats["last_modified"], stats["total"]), stats["last_modified"]
 
-class CategoryListView(generics.ListAPIView):
+
+class CategoryListView(
+    TimedViewMixin, ConditionalGetMixin, CatalogCacheMixin, generics.ListAPIView
+):
     serializer_class = EventCategorySerializer
+    cache_control_max_age = 3600
+    query_budget = 2
+
+    def get_validators(self, request, *args, **kwargs):
+        stats = self.get_queryset().aggregate(
+            last_modified=Max("updated_at"),
+            sport_modified=Max("sport__updated_at"),
+            total=Count("id"),
+        )
+        last_modified = _latest(stats["last_modified"], stats["sport_modified"])
+        etag = build_etag("categories", request.query_params.get("sport"), last_modified, stats["total"])
+        return etag, last_modified
 
     def get_queryset(self):
         queryset = EventCategory.objects.filter(is_active=True, sport__is_active=True)
@@ -60,68 +162,269 @@ class CategoryListView(generics.ListAPIView):
         return queryset
 
 
-class EventListView(generics.ListAPIView):
-    serializer_class = EventListSerializer
-
-    def get_queryset(self):
-        queryset = Event.objects.filter(status=Event.Status.PUBLISHED)
-        queryset = queryset.select_related(
-            "sport", "category", "location", "organizer", "organizer__profile"
-        )
-
-        params = self.request.query_params
-        sport_param = params.get("sport")
-        if sport_param:
-            if sport_param.isdigit():
-                queryset = queryset.filter(sport_id=int(sport_param))
-            else:
-                queryset = queryset.filter(sport__slug=sport_param)
-
-        category_param = params.get("category")
-        if category_param:
-            if category_param.isdigit():
-                queryset = queryset.filter(category_id=int(category_param))
-            else:
-                queryset = queryset.filter(category__slug=category_param)
-
-        search = params.get("search")
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search)
-                | Q(description__icontains=search)
-                | Q(short_description__icontains=search)
-            )
-
-        city = params.get("city")
-        if city:
-            queryset = queryset.filter(location__city__icontains=city)
+CATALOG_FILTER_PARAMS = (
+    "sport",
+    "category",
+    "search",
+    "city",
+    "available",
+    "near",
+    "start_after",
+    "start_before",
+)
 
-        start_after = _parse_datetime(params.get("start_after"))
-        if start_after:
-            queryset = queryset.filter(start_at__gte=start_after)
 
-        start_before = _parse_datetime(params.get("start_before"))
-        if start_before:
-            queryset = queryset.filter(start_at__lte=start_before)
+def _filter_events(queryset, params):
+    """Apply the public catalog filters to a CatalogEntry queryset."""
+    ordering = ("start_at", "event_id")
+    sport_param = params.get("sport")
+    if sport_param:
+        if sport_param.isdigit():
+            queryset = queryset.filter(sport_id=int(sport_param))
+        else:
+            queryset = queryset.filter(sport_slug=sport_param)
 
-        return queryset.order_by("start_at")
+    category_param = params.get("category")
+    if category_param:
+        if category_param.isdigit():
+            queryset = queryset.filter(category_id=int(category_param))
+        else:
+            queryset = queryset.filter(category_slug=category_param)
+
+    search = params.get("search")
+    if search:
+        queryset = search_events(queryset, search)
+        ordering = ("-search_rank", "start_at", "event_id")
+
+    city = normalize(params.get("city")).strip()
+    if city:
+        queryset = queryset.filter(city_normalized__startswith=city)
+
+    if params.get("available") in ("1", "true"):
+        queryset = queryset.filter(seats_available__gt=0)
+
+    near = params.get("near")
+    if near:
+        point = parse_point(near)
+        if point is None:
+            raise ValidationError({"near": "Expected 'lat,lng'."})
+        try:
+            radius_km = float(params.get("radius_km") or DEFAULT_RADIUS_KM)
+        except ValueError:
+            raise ValidationError({"radius_km": "Expected a number."})
+        if not 0 < radius_km <= MAX_RADIUS_KM:
+            raise ValidationError({"radius_km": f"Must be between 0 and {MAX_RADIUS_KM}."})
+        queryset = filter_near(queryset, point[0], point[1], radius_km, prefix="")
+        if params.get("sort") == "distance":
+            ordering = ("distance_km", "start_at", "event_id")
+
+    start_after = _parse_datetime(params.get("start_after"))
+    if start_after:
+        queryset = queryset.filter(start_at__gte=start_after)
+
+    start_before = _parse_datetime(params.get("start_before"))
+    if start_before:
+        queryset = queryset.filter(start_at__lte=start_before)
+
+    return queryset, ordering
+
+
+def _requested_fields(params, serializer_class, name="fields"):
+    raw = params.get(name)
+    if raw is None:
+        return None
+    fields = list(dict.fromkeys(field.strip() for field in raw.split(",") if field.strip()))
+    allowed = serializer_class.Meta.fields
+    if name == "expand":
+        allowed = serializer_class.expandable_fields
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        raise ValidationError({name: f"Unknown field(s): {', '.join(sorted(unknown))}."})
+    return fields
+
+
+def _project(queryset, serializer_class, fields, extra=()):
+    columns = serializer_class.get_columns(fields) | set(extra)
+    related = {column.rsplit("__", 1)[0] for column in columns if "__" in column}
+    return queryset.select_related(None).select_related(*related).only(*columns)
+
+
+class SparseFieldsViewMixin:
+    sparse_fields = None
+
+    def get_serializer(self, *args, **kwargs):
+        if self.sparse_fields is not None:
+            kwargs["fields"] = self.sparse_fields
+        return super().get_serializer(*args, **kwargs)
+
+
+def _count_by(queryset, *fields):
+    rows = queryset.order_by().values(*fields).annotate(count=Count("pk")).order_by("-count")
+    return list(rows)
+
+
+def _build_facets(queryset):
+    return {
+        "total": queryset.order_by().count(),
+        "sport": [
+            {
+                "id": row["sport_id"],
+                "slug": row["sport_slug"],
+                "name": row["sport_name"],
+                "count": row["count"],
+            }
+            for row in _count_by(queryset, "sport_id", "sport_slug", "sport_name")
+        ],
+        "category": [
+            {
+                "id": row["category_id"],
+                "slug": row["category_slug"],
+                "name": row["category_name"],
+                "count": row["count"],
+            }
+            for row in _count_by(queryset, "category_id", "category_slug", "category_name")
+        ],
+        "city": [
+            {"value": row["city"], "count": row["count"]}
+            for row in _count_by(queryset, "city")
+        ],
+        "event_type": [
+            {"value": row["event_type"], "count": row["count"]}
+            for row in _count_by(queryset, "event_type")
+        ],
+        "level_required": [
+            {"value": row["level_required"], "count": row["count"]}
+            for row in _count_by(queryset, "level_required")
+        ],
+    }
+
+
+class EventListView(TimedViewMixin, SparseFieldsViewMixin, CatalogCacheMixin, generics.ListAPIView):
+    serializer_class = EventListSerializer
+    pagination_class = KeysetCursorPagination
+    query_budget = 1
 
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset, ordering = _filter_events(CatalogEntry.objects.all(), params)
+        self.sparse_fields = _requested_fields(params, EventListSerializer)
+        self.cursor_ordering = ordering
+        return queryset.order_by(*ordering)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        fields = [
+            name for name in LIST_FIELDS if self.sparse_fields is None or name in self.sparse_fields
+        ]
+        extra = [name.lstrip("-") for name in self.cursor_ordering]
+        if "distance_km" in queryset.query.annotations:
+            extra.append("distance_km")
+        rows = event_list_values(queryset, fields, extra=extra, sources=CATALOG_SOURCES)
+
+        page = self.paginate_queryset(rows)
+        with timed("serialize"):
+            data = render_event_rows(rows if page is None else page, fields, sources=CATALOG_SOURCES)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class EventFacetView(TimedViewMixin, generics.GenericAPIView):
+    query_budget = 6
 
-class EventDetailView(generics.RetrieveAPIView):
+    def get(self, request, *args, **kwargs):
+        queryset = CatalogEntry.objects.all()
+        params = request.query_params
+        if not any(params.get(name) for name in CATALOG_FILTER_PARAMS):
+            timeout = getattr(settings, "EVENT_FACETS_CACHE_TIMEOUT", 300)
+            if timeout:
+                key = f"events:facets:{get_catalog_version()}"
+                facets = cache.get(key)
+                record_cache("facets", facets is not None)
+                if facets is None:
+                    facets = _build_facets(queryset)
+                    cache.set(key, facets, timeout)
+                return Response(facets)
+        queryset, _ordering = _filter_events(queryset, params)
+        return Response(_build_facets(queryset))
+
+
+class EventDetailView(
+    TimedViewMixin,
+    SparseFieldsViewMixin,
+    ConditionalGetMixin,
+    CatalogCacheMixin,
+    generics.RetrieveAPIView,
+):
     serializer_class = EventDetailSerializer
     lookup_field = "slug"
+    query_budget = 5
+
+    def get_validators(self, request, *args, **kwargs):
+        row = (
+            Event.objects.filter(slug=self.kwargs["slug"], status=Event.Status.PUBLISHED)
+            .annotate(
+                tickets_modified=_latest_child_update(TicketType),
+                media_modified=_latest_child_update(EventMedia),
+                ticket_count=_child_count(TicketType),
+                tickets_taken=_child_sum(
+                    TicketStockSlot, F("quantity_sold") + F("quantity_held"), "ticket_type__event_id"
+                ),
+                media_count=_child_count(EventMedia),
+            )
+            .values(
+                "id",
+                "updated_at",
+                "capacity_reserved",
+                "sport__updated_at",
+                "category__updated_at",
+                "location__updated_at",
+                "tickets_modified",
+                "media_modified",
+                "ticket_count",
+                "tickets_taken",
+                "media_count",
+            )
+            .first()
+        )
+        if row is None:
+            return None
+        # Seats and ticket counters move through update() without touching
+        # updated_at, so only the ETag can tell clients the body changed.
+        etag = build_etag(normalize_query(request.query_params), *row.values())
+        return etag, None
 
     def get_queryset(self):
-        return Event.objects.filter(status=Event.Status.PUBLISHED).select_related(
-            "sport", "category", "location", "organizer", "organizer__profile"
+        queryset = Event.objects.filter(status=Event.Status.PUBLISHED).select_related(
+            "sport", "category", "category__sport", "location"
+        )
+        params = self.request.query_params
+        fields = _requested_fields(params, EventDetailSerializer)
+        expand = _requested_fields(params, EventDetailSerializer, name="expand")
+        if fields is None and expand is None:
+            return queryset.prefetch_related(*_expansions(EventDetailSerializer.expandable_fields))
+
+        if fields is None:
+            fields = [
+                name
+                for name in EventDetailSerializer.Meta.fields
+                if name not in EventDetailSerializer.expandable_fields
+            ]
+        fields += [name for name in expand or () if name not in fields]
+        self.sparse_fields = fields
+        queryset = _project(queryset, EventDetailSerializer, fields, extra=["slug", "status"])
+        return queryset.prefetch_related(
+            *_expansions(name for name in EventDetailSerializer.expandable_fields if name in fields)
         )
 
 
-class OrganizerEventListCreateView(generics.ListCreateAPIView):
+class OrganizerEventListCreateView(TimedViewMixin, IdempotentPostMixin, generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+    pagination_class = KeysetCursorPagination
+    query_budget = {"GET": 1, "POST": 14}
 
     def get_queryset(self):
-        return Event.objects.filter(organizer=self.request.user).select_related(
+        return Event.objects.filter(organizer_id=self.request.user.id).select_related(
             "sport", "category", "location"
         )
 
@@ -131,16 +434,20 @@ class OrganizerEventListCreateView(generics.ListCreateAPIView):
         return EventListSerializer
 
     def perform_create(self, serializer):
-        serializer.save(organizer=self.request.user)
+        serializer.save(organizer_id=self.request.user.id)
 
 
-class OrganizerEventDetailView(generics.RetrieveUpdateDestroyAPIView):
+class OrganizerEventDetailView(TimedViewMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, IsOrganizer, IsOrganizerOwner]
+    query_budget = {"GET": 5, "PUT": 10, "PATCH": 10, "DELETE": 13}
 
     def get_queryset(self):
-        return Event.objects.filter(organizer=self.request.user).select_related(
+        queryset = Event.objects.filter(organizer_id=self.request.user.id).select_related(
             "sport", "category", "location"
         )
+        if self.request.method == "GET":
+            queryset = queryset.prefetch_related(*_expansions(EventDetailSerializer.expandable_fields))
+        return queryset
 
     def get_serializer_class(self):
         if self.request.method == "GET":
@@ -148,53 +455,256 @@ class OrganizerEventDetailView(generics.RetrieveUpdateDestroyAPIView):
         return EventCreateUpdateSerializer
 
 
-class AdminEventListView(generics.ListAPIView):
+EVENT_EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("title", "title"),
+    ("slug", "slug"),
+    ("status", "status"),
+    ("sport", "sport__name"),
+    ("category", "category__name"),
+    ("start_at", "start_at"),
+    ("end_at", "end_at"),
+    ("venue", "location__venue_name"),
+    ("city", "location__city"),
+    ("capacity_total", "capacity_total"),
+    ("capacity_reserved", "capacity_reserved"),
+    ("participants", "participants_count"),
+    ("favorites", "favorites_count"),
+)
+PARTICIPANT_EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("user_id", "user_id"),
+    ("email", "user__email"),
+    ("first_name", "user__first_name"),
+    ("last_name", "user__last_name"),
+    ("handle", "user__profile__handle"),
+    ("phone", "user__profile__phone"),
+    ("city", "user__profile__city"),
+    ("country", "user__profile__country"),
+    ("status", "status"),
+    ("joined_at", "created_at"),
+)
+
+
+def _count_per_event(model, **filters):
+    rows = (
+        model.objects.filter(event_id=OuterRef("pk"), **filters)
+        .order_by()
+        .values("event_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+def _export_format(value):
+    if value not in CONTENT_TYPES:
+        raise NotFound("Format d'export inconnu.")
+    return value
+
+
+class OrganizerEventExportView(TimedViewMixin, generics.GenericAPIView):
+    """Stream the organizer's events with their participant and favorite counts.
+
+    There is no query_budget: the rows are read while the response streams,
+    after QueryBudgetMiddleware has returned, one query per EXPORT_CHUNK_SIZE
+    rows.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+
+    def get(self, request, export_format):
+        export_format = _export_format(export_format)
+        queryset = Event.objects.filter(organizer_id=request.user.id).annotate(
+            participants_count=_count_per_event(
+                EventParticipant, status=EventParticipant.Status.ACTIVE
+            ),
+            favorites_count=_count_per_event(Favorite),
+        )
+        return export_response(queryset, EVENT_EXPORT_COLUMNS, export_format, "events")
+
+
+class OrganizerParticipantExportView(TimedViewMixin, generics.GenericAPIView):
+    """Stream the participants of one of the organizer's events.
+
+    No query_budget, for the same reason as OrganizerEventExportView.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+
+    def get(self, request, event_id, export_format):
+        export_format = _export_format(export_format)
+        event = get_object_or_404(
+            Event.objects.only("id", "slug"), id=event_id, organizer_id=request.user.id
+        )
+        queryset = EventParticipant.objects.filter(event_id=event.id)
+        return export_response(
+            queryset, PARTICIPANT_EXPORT_COLUMNS, export_format, f"{event.slug}-participants"
+        )
+
+
+class EventImportMixin:
+    """Import events from an uploaded CSV or JSON `file` (see events.imports).
+
+    `get_organizer(request)` returns the user the events are imported for.
+    There is no query_budget: queries grow with the number of chunks in the
+    file, not with its rows.
+    """
+
+    parser_classes = [MultiPartParser]
+
+    def get_organizer(self, request):
+        return get_object_or_404(get_user_model().objects.select_related("profile"), pk=request.user.id)
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "Fichier requis."})
+        fmt = file_format(upload.name)
+        if fmt is None:
+            raise ValidationError({"file": "Formats acceptes: CSV, JSON ou NDJSON."})
+
+        importer = EventImporter(self.get_organizer(request), is_staff=request.user.is_staff)
+        report = importer.run(read_rows(upload, fmt))
+        status_code = status.HTTP_201_CREATED if report["created"] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=status_code)
+
+
+class OrganizerEventImportView(TimedViewMixin, EventImportMixin, generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+
+
+class AdminEventImportView(TimedViewMixin, EventImportMixin, generics.GenericAPIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_organizer(self, request):
+        organizer_id = request.data.get("organizer")
+        if not organizer_id or not str(organizer_id).isdigit():
+            raise ValidationError({"organizer": "Organisateur requis."})
+        return get_object_or_404(
+            get_user_model().objects.select_related("profile"),
+            pk=organizer_id,
+            profile__role="organizer",
+        )
+
+
+class AdminEventListView(TimedViewMixin, generics.ListAPIView):
     serializer_class = EventListSerializer
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ("-created_at", "-id")
+    query_budget = 1
 
     def get_queryset(self):
         status_param = self.request.query_params.get("status")
-        queryset = Event.objects.select_related(
-            "sport", "category", "location", "organizer", "organizer__profile"
-        )
+        queryset = Event.objects.select_related("sport", "category", "location")
         if status_param:
             queryset = queryset.filter(status=status_param)
         else:
             queryset = queryset.filter(status=Event.Status.PENDING)
-        return queryset.order_by("-created_at")
+        return queryset.order_by("-created_at", "-id")
 
 
-class AdminEventDetailView(generics.RetrieveAPIView):
+class AdminEventDetailView(TimedViewMixin, generics.RetrieveAPIView):
     serializer_class = EventDetailSerializer
     permission_classes = [permissions.IsAdminUser]
+    query_budget = 5
 
     def get_queryset(self):
-        return Event.objects.select_related(
-            "sport", "category", "location", "organizer", "organizer__profile"
+        return Event.objects.select_related("sport", "category", "location").prefetch_related(
+            *_expansions(EventDetailSerializer.expandable_fields)
         )
 
 
-class AdminEventModerationView(generics.UpdateAPIView):
+class AdminEventModerationView(TimedViewMixin, generics.UpdateAPIView):
     serializer_class = EventModerationSerializer
     permission_classes = [permissions.IsAdminUser]
     queryset = Event.objects.all()
+    query_budget = 10
+
 
+class TicketHoldCreateView(TimedViewMixin, generics.GenericAPIView):
+    serializer_class = TicketHoldSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 6
+
+    def post(self, request, *args, **kwargs):
+        ticket_type = get_object_or_404(
+            TicketType.objects.select_related("event").only(
+                "id", "sales_start", "sales_end", "event__id", "event__is_free"
+            ),
+            pk=self.kwargs["ticket_type_id"],
+            event__slug=self.kwargs["slug"],
+            event__status=Event.Status.PUBLISHED,
+        )
+        if ticket_type.event.is_free:
+            raise ValidationError({"detail": "Evenement gratuit: inscrivez-vous directement."})
+        now = timezone.now()
+        if ticket_type.sales_start and now < ticket_type.sales_start:
+            raise ValidationError({"detail": "La vente n'est pas encore ouverte."})
+        if ticket_type.sales_end and now > ticket_type.sales_end:
+            raise ValidationError({"detail": "La vente est terminee."})
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            hold = hold_tickets(ticket_type.id, request.user.id, serializer.validated_data["quantity"])
+        except SoldOut:
+            TICKET_HOLDS.inc(result="sold_out")
+            raise ValidationError({"detail": "Billets epuises."})
+        TICKET_HOLDS.inc(result="held")
+        return Response(self.get_serializer(hold).data, status=status.HTTP_201_CREATED)
+
+
+class TicketHoldDetailView(TimedViewMixin, generics.RetrieveDestroyAPIView):
+    serializer_class = TicketHoldSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 1, "DELETE": 4}
+
+    def get_queryset(self):
+        return TicketHold.objects.filter(user_id=self.request.user.id)
 
-class OrganizerTicketTypeListCreateView(generics.ListCreateAPIView):
+    def destroy(self, request, *args, **kwargs):
+        try:
+            hold = release_hold(self.kwargs["pk"], request.user.id)
+        except HoldUnavailable:
+            raise ValidationError({"detail": "Reservation expiree ou deja utilisee."})
+        return Response(self.get_serializer(hold).data)
+
+
+class TicketHoldConfirmView(TimedViewMixin, generics.GenericAPIView):
+    serializer_class = TicketHoldSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
+
+    def post(self, request, *args, **kwargs):
+        try:
+            hold = confirm_hold(self.kwargs["pk"], request.user.id)
+        except HoldUnavailable:
+            raise ValidationError({"detail": "Reservation expiree ou deja utilisee."})
+        TICKETS_SOLD.inc(hold.quantity)
+        return Response(self.get_serializer(hold).data)
+
+
+class OrganizerTicketTypeListCreateView(TimedViewMixin, generics.ListCreateAPIView):
     serializer_class = TicketTypeSerializer
     permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+    query_budget = {"GET": 2, "POST": 7}
 
     def get_queryset(self):
-        return TicketType.objects.filter(
-            event__organizer=self.request.user,
+        queryset = TicketType.objects.filter(
+            event__organizer_id=self.request.user.id,
             event_id=self.kwargs["event_id"],
         )
+        if self.request.method == "GET":
+            queryset = queryset.prefetch_related("stock_slots")
+        return queryset
 
     def perform_create(self, serializer):
         event = get_object_or_404(
             Event,
             id=self.kwargs["event_id"],
-            organizer=self.request.user,
+            organizer_id=self.request.user.id,
         )
         price = serializer.validated_data.get("price")
         if event.is_free and price and price > 0:
@@ -202,15 +712,19 @@ class OrganizerTicketTypeListCreateView(generics.ListCreateAPIView):
         serializer.save(event=event)
 
 
-class OrganizerTicketTypeDetailView(generics.RetrieveUpdateDestroyAPIView):
+class OrganizerTicketTypeDetailView(TimedViewMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = TicketTypeSerializer
     permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+    query_budget = {"GET": 2, "PUT": 9, "PATCH": 9, "DELETE": 7}
 
     def get_queryset(self):
-        return TicketType.objects.filter(
-            event__organizer=self.request.user,
+        queryset = TicketType.objects.filter(
+            event__organizer_id=self.request.user.id,
             event_id=self.kwargs["event_id"],
         )
+        if self.request.method == "GET":
+            queryset = queryset.prefetch_related("stock_slots")
+        return queryset
 
     def perform_update(self, serializer):
         ticket = serializer.instance
@@ -220,13 +734,14 @@ class OrganizerTicketTypeDetailView(generics.RetrieveUpdateDestroyAPIView):
         serializer.save()
 
 
-class OrganizerEventMediaListCreateView(generics.ListCreateAPIView):
+class OrganizerEventMediaListCreateView(TimedViewMixin, generics.ListCreateAPIView):
     serializer_class = EventMediaSerializer
     permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+    query_budget = {"GET": 1, "POST": 2}
 
     def get_queryset(self):
         return EventMedia.objects.filter(
-            event__organizer=self.request.user,
+            event__organizer_id=self.request.user.id,
             event_id=self.kwargs["event_id"],
         )
 
@@ -234,112 +749,139 @@ class OrganizerEventMediaListCreateView(generics.ListCreateAPIView):
         event = get_object_or_404(
             Event,
             id=self.kwargs["event_id"],
-            organizer=self.request.user,
+            organizer_id=self.request.user.id,
         )
         serializer.save(event=event)
 
 
-class OrganizerEventMediaDetailView(generics.RetrieveUpdateDestroyAPIView):
+class OrganizerEventMediaDetailView(TimedViewMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = EventMediaSerializer
     permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+    query_budget = {"GET": 1, "PUT": 2, "PATCH": 2, "DELETE": 3}
 
     def get_queryset(self):
         return EventMedia.objects.filter(
-            event__organizer=self.request.user,
+            event__organizer_id=self.request.user.id,
             event_id=self.kwargs["event_id"],
         )
 
 
-class FavoriteListCreateView(generics.ListCreateAPIView):
+class FavoriteListCreateView(TimedViewMixin, IdempotentPostMixin, generics.ListCreateAPIView):
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ("-created_at", "-id")
+    query_budget = {"GET": 1, "POST": 5}
 
     def get_queryset(self):
-        return Favorite.objects.filter(user=self.request.user).select_related(
+        return Favorite.objects.filter(user_id=self.request.user.id).select_related(
             "event",
             "event__sport",
             "event__category",
             "event__location",
-            "event__organizer",
-            "event__organizer__profile",
         )
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        try:
+            with transaction.atomic():
+                serializer.save(user_id=self.request.user.id)
+        except IntegrityError:
+            raise ValidationError({"detail": "Evenement deja dans vos favoris."})
 
 
-class FavoriteDetailView(generics.DestroyAPIView):
+class FavoriteDetailView(TimedViewMixin, generics.DestroyAPIView):
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
 
     def get_queryset(self):
-        return Favorite.objects.filter(user=self.request.user)
+        return Favorite.objects.filter(user_id=self.request.user.id)
 
-class MyParticipationListView(generics.ListAPIView):
+class MyParticipationListView(TimedViewMixin, generics.ListAPIView):
     serializer_class = ParticipationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ("-created_at", "-id")
+    query_budget = 1
 
     def get_queryset(self):
-        return EventParticipant.objects.filter(user=self.request.user).select_related(
+        return EventParticipant.objects.filter(user_id=self.request.user.id).select_related(
             "event",
             "event__sport",
             "event__category",
             "event__location",
-            "event__organizer",
-            "event__organizer__profile",
         )
 
 
-class EventJoinView(generics.GenericAPIView):
+class EventJoinView(TimedViewMixin, IdempotentPostMixin, generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 2, "POST": 5, "DELETE": 7}
 
     def get_event(self):
-        return get_object_or_404(Event, slug=self.kwargs["slug"], status=Event.Status.PUBLISHED)
+        queryset = Event.objects.only("id", "is_free", "capacity_total", "capacity_reserved")
+        return get_object_or_404(queryset, slug=self.kwargs["slug"], status=Event.Status.PUBLISHED)
 
     def get(self, request, *args, **kwargs):
         event = self.get_event()
-        joined = EventParticipant.objects.filter(event=event, user=request.user).exists()
+        joined = EventParticipant.objects.filter(event=event, user_id=request.user.id).exists()
+        entry = None
+        if not joined:
+            entry = WaitlistEntry.objects.filter(event=event, user_id=request.user.id).first()
         return Response({
             "joined": joined,
             "capacity_available": event.capacity_available,
+            "waitlist_position": waitlist_position(entry) if entry else None,
         })
 
     def post(self, request, *args, **kwargs):
+        return self.idempotent_post(self.join, request, *args, **kwargs)
+
+    def join(self, request, *args, **kwargs):
+        # Unknown events and ineligible users are turned away before they
+        # take a place in the waiting room.
         event = self.get_event()
-        profile = getattr(request.user, "profile", None)
-        if profile and profile.role != "athlete":
+        role = user_role(request.user)
+        if role and role != "athlete":
             raise ValidationError({"detail": "Seuls les athletes peuvent participer."})
 
         if not event.is_free:
             raise ValidationError({"detail": "Paiement requis. Disponible bientot."})
 
-        if event.capacity_available <= 0:
-            raise ValidationError({"detail": "Evenement complet."})
-
-        with transaction.atomic():
-            participation, created = EventParticipant.objects.get_or_create(
-                event=event,
-                user=request.user,
-                defaults={"status": EventParticipant.Status.ACTIVE},
+        queued = admit(self.kwargs["slug"], request.user.id)
+        if queued:
+            EVENT_JOINS.inc(result="queued")
+            position, retry_after = queued
+            return Response(
+                {
+                    "detail": f"File d'attente: position {position}. Reessayez dans {retry_after}s.",
+                    "joined": False,
+                    "queue_position": position,
+                    "retry_after": retry_after,
+                },
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(retry_after)},
             )
-            if not created:
-                raise ValidationError({"detail": "Vous etes deja inscrit."})
 
-            Event.objects.filter(id=event.id).update(
-                capacity_reserved=F("capacity_reserved") + 1
+        result = join_event(event.id, request.user.id)
+        EVENT_JOINS.inc(result=result)
+        if result == FULL:
+            position = enqueue(event.id, request.user.id)
+            return Response(
+                {
+                    "detail": f"Evenement complet. Vous etes sur la liste d'attente (position {position}).",
+                    "joined": False,
+                    "waitlist_position": position,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
             )
+        if result == ALREADY_JOINED:
+            raise ValidationError({"detail": "Vous etes deja inscrit."})
 
         return Response({"joined": True}, status=status.HTTP_201_CREATED)
 
     def delete(self, request, *args, **kwargs):
         event = self.get_event()
-        deleted = False
-        with transaction.atomic():
-            qs = EventParticipant.objects.filter(event=event, user=request.user)
-            if qs.exists():
-                qs.delete()
-                deleted = True
-                Event.objects.filter(id=event.id, capacity_reserved__gt=0).update(
-                    capacity_reserved=F("capacity_reserved") - 1
-                )
+        deleted = leave_event(event.id, request.user.id)
+        if deleted:
+            EVENT_LEAVES.inc()
         return Response({"joined": not deleted}, status=status.HTTP_200_OK)
@@ -0,0 +1,267 @@
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+# Worker files hold [used bytes (4) | padding (4)] followed by entries of
+# [key length (4) | utf-8 key padded to 8 bytes | float64 value]. A worker
+# only appends or overwrites values in place, and publishes a new entry by
+# bumping the header last, so readers never need a lock.
+_HEADER = 8
+_INITIAL_SIZE = 64 * 1024
+
+
+def _entry_layout(key_length):
+    padded = key_length + (8 - (4 + key_length) % 8) % 8
+    return padded, 4 + padded + 8
+
+
+def _read_entries(data):
+    used = struct.unpack_from("i", data, 0)[0] if len(data) >= _HEADER else 0
+    position = _HEADER
+    while position < used:
+        length = struct.unpack_from("i", data, position)[0]
+        padded, size = _entry_layout(length)
+        key = data[position + 4:position + 4 + length].decode()
+        value = struct.unpack_from("d", data, position + 4 + padded)[0]
+        yield key, value
+        position += size
+
+
+class MmapStore:
+    """Float values keyed by string, kept in a memory-mapped file of one worker."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")
+        if os.fstat(self._file.fileno()).st_size < _HEADER:
+            self._file.truncate(_INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), os.fstat(self._file.fileno()).st_size)
+        if not struct.unpack_from("i", self._map, 0)[0]:
+            struct.pack_into("i", self._map, 0, _HEADER)
+        self._positions = {}
+        position = _HEADER
+        for key, _value in _read_entries(self._map):
+            padded, size = _entry_layout(len(key.encode()))
+            self._positions[key] = position + 4 + padded
+            position += size
+
+    def _append(self, key):
+        data = key.encode()
+        padded, size = _entry_layout(len(data))
+        used = struct.unpack_from("i", self._map, 0)[0]
+        if used + size > len(self._map):
+            capacity = max(len(self._map) * 2, used + size)
+            self._map.close()
+            self._file.truncate(capacity)
+            self._map = mmap.mmap(self._file.fileno(), capacity)
+        self._map[used:used + size] = struct.pack(f"i{padded}sd", len(data), data, 0.0)
+        struct.pack_into("i", self._map, 0, used + size)
+        self._positions[key] = used + 4 + padded
+        return self._positions[key]
+
+    def inc(self, key, amount=1.0):
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append(key)
+            value = struct.unpack_from("d", self._map, position)[0]
+            struct.pack_into("d", self._map, position, value + amount)
+
+
+class MemoryStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, key, amount=1.0):
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+_store = None
+_store_pid = None
+_store_lock = threading.Lock()
+
+
+def _directory():
+    return getattr(settings, "METRICS_DIR", "")
+
+
+def get_store():
+    """Return this process's store, creating a fresh one after a fork."""
+    global _store, _store_pid
+    pid = os.getpid()
+    if _store_pid != pid:
+        with _store_lock:
+            if _store_pid != pid:
+                directory = _directory()
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                    _store = MmapStore(os.path.join(directory, f"worker-{pid}.db"))
+                else:
+                    _store = MemoryStore()
+                _store_pid = pid
+    return _store
+
+
+def collect():
+    """Sum every worker's values; reads the files without locking them."""
+    directory = _directory()
+    if not directory:
+        return dict(getattr(get_store(), "values", {}))
+    totals = {}
+    for path in glob.glob(os.path.join(directory, "worker-*.db")):
+        with open(path, "rb") as handle:
+            data = handle.read()
+        for key, value in _read_entries(data):
+            totals[key] = totals.get(key, 0.0) + value
+    return totals
+
+
+REGISTRY = {}
+
+
+def _key(name, labels):
+    return json.dumps([name, labels], sort_keys=True, separators=(",", ":"))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        REGISTRY[name] = self
+
+    def inc(self, amount=1, **labels):
+        get_store().inc(_key(f"{self.name}_total", labels), amount)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        REGISTRY[name] = self
+
+    def observe(self, value, **labels):
+        # Buckets are stored non-cumulative (one write) and summed on render.
+        bound = next((bound for bound in self.buckets if value <= bound), "+Inf")
+        store = get_store()
+        store.inc(_key(f"{self.name}_bucket", {**labels, "le": str(bound)}))
+        store.inc(_key(f"{self.name}_sum", labels), value)
+        store.inc(_key(f"{self.name}_count", labels))
+
+
+REQUESTS = Counter("http_requests", "HTTP requests by route, method and status.")
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route.",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries per request by route.",
+    (0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+CACHE_REQUESTS = Counter("cache_requests", "Cache lookups by cache name and result (hit/miss).")
+EVENT_JOINS = Counter("event_joins", "Join attempts by result.")
+EVENT_LEAVES = Counter("event_leaves", "Seats released by participants leaving.")
+WAITLIST_PROMOTIONS = Counter("waitlist_promotions", "Waitlisted athletes moved into a seat.")
+TICKET_HOLDS = Counter("ticket_holds", "Ticket hold attempts by result.")
+TICKETS_SOLD = Counter("tickets_sold", "Tickets sold by confirming holds.")
+
+
+def record_cache(name, hit):
+    CACHE_REQUESTS.inc(cache=name, result="hit" if hit else "miss")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _sample(name, labels, value):
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(labels[key])}"' for key in sorted(labels))
+        return f"{name}{{{rendered}}} {_format_number(value)}"
+    return f"{name} {_format_number(value)}"
+
+
+def render():
+    """Render all metrics in the Prometheus text exposition format."""
+    samples = {}
+    for key, value in collect().items():
+        name, labels = json.loads(key)
+        samples.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for metric in REGISTRY.values():
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if metric.kind == "counter":
+            for labels, value in sorted(samples.get(f"{metric.name}_total", []), key=str):
+                lines.append(_sample(f"{metric.name}_total", labels, value))
+            continue
+
+        buckets = {}
+        for labels, value in samples.get(f"{metric.name}_bucket", []):
+            series = {key: label for key, label in labels.items() if key != "le"}
+            buckets.setdefault(json.dumps(series, sort_keys=True), {})[labels["le"]] = value
+        for series_key in sorted(buckets):
+            series = json.loads(series_key)
+            counts = buckets[series_key]
+            cumulative = 0
+            for bound in [*metric.buckets, "+Inf"]:
+                cumulative += counts.get(str(bound), 0)
+                lines.append(_sample(f"{metric.name}_bucket", {**series, "le": str(bound)}, cumulative))
+        for suffix in ("sum", "count"):
+            for labels, value in sorted(samples.get(f"{metric.name}_{suffix}", []), key=str):
+                lines.append(_sample(f"{metric.name}_{suffix}", labels, value))
+    return "\n".join(lines) + "\n"
+
+
+class _QueryCount:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Count requests and record latency and query histograms per URL name."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = _QueryCount()
+        start = perf_counter()
+        with connections["default"].execute_wrapper(queries):
+            response = self.get_response(request)
+        elapsed = perf_counter() - start
+
+        match = request.resolver_match
+        route = match.view_name if match else "unmatched"
+        REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        REQUEST_LATENCY.observe(elapsed, route=route)
+        REQUEST_QUERIES.observe(queries.count, route=route)
+        return response
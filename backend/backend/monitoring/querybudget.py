@@ -0,0 +1,93 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+# Savepoints only show up inside an outer transaction (e.g. TestCase), so
+# they are left out to keep counts identical in tests and in production.
+TRANSACTION_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """Count the SQL statements run on every database connection."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+
+def get_budget(view_class, method):
+    """Return the `query_budget` a view declares for `method`, if any.
+
+    Views declare either one number for every method or a dict keyed by
+    HTTP method, e.g. `query_budget = {"GET": 2, "POST": 4}`.
+    """
+    budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(method.upper())
+    return budget
+
+
+def check_budget(view_class, method, path, counter):
+    budget = get_budget(view_class, method)
+    if budget is None or counter.count <= budget:
+        return None
+    return f"{method} {path} ran {counter.count} queries, budget is {budget}."
+
+
+class QueryBudgetMiddleware:
+    """Report views that run more queries than their declared `query_budget`.
+
+    QUERY_BUDGET_MODE is "warn" (log), "raise" (fail the request) or empty
+    (middleware disabled). Streamed responses are skipped: their body runs its
+    queries after the middleware has returned, so views that stream declare no
+    budget.
+    """
+
+    def __init__(self, get_response):
+        self.mode = getattr(settings, "QUERY_BUDGET_MODE", "")
+        if not self.mode:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+        if response.streaming:
+            return response
+
+        response["X-Query-Count"] = str(counter.count)
+        match = request.resolver_match
+        view_class = getattr(match.func, "view_class", None) if match else None
+        message = check_budget(view_class, request.method, request.path, counter)
+        if message:
+            if self.mode == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,135 @@
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+NEXT_SLOT_KEY = "monitoring:slowqueries:next"
+SLOT_TIMEOUT = 7 * 24 * 3600
+
+
+def _slot_key(index):
+    return f"monitoring:slowqueries:{index}"
+
+
+def _buffer_size():
+    return getattr(settings, "SLOW_QUERY_BUFFER_SIZE", 100)
+
+
+def _json_safe(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return str(value)
+
+
+def record(capture):
+    """Store `capture` in the shared ring buffer, overwriting the oldest slot."""
+    cache.add(NEXT_SLOT_KEY, 0, None)
+    try:
+        index = cache.incr(NEXT_SLOT_KEY)
+    except ValueError:
+        index = 1
+        cache.set(NEXT_SLOT_KEY, index, None)
+    cache.set(_slot_key(index % _buffer_size()), capture, SLOT_TIMEOUT)
+
+
+def recent():
+    keys = [_slot_key(index) for index in range(_buffer_size())]
+    captures = cache.get_many(keys).values()
+    return sorted(captures, key=lambda capture: capture["captured_at"], reverse=True)
+
+
+def clear():
+    cache.delete_many([_slot_key(index) for index in range(_buffer_size())])
+
+
+class SlowQueryRecorder:
+    def __init__(self, connection, view, threshold):
+        self.connection = connection
+        self.view = view
+        self.threshold = threshold
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+        start = perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed_ms = (perf_counter() - start) * 1000
+        if elapsed_ms >= self.threshold:
+            self.capture(sql, params, many, elapsed_ms)
+        return result
+
+    def explain(self, sql, params):
+        if not sql.lstrip().upper().startswith("SELECT"):
+            return []
+        # Run EXPLAIN outside every wrapper so query budgets and metrics
+        # only see the queries the view itself issued.
+        wrappers = self.connection.execute_wrappers
+        self.connection.execute_wrappers = []
+        self.explaining = True
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"{self.connection.ops.explain_query_prefix()} {sql}", params)
+                return [_json_safe(row) for row in cursor.fetchall()]
+        except DatabaseError as exc:
+            return [f"EXPLAIN failed: {exc}"]
+        finally:
+            self.explaining = False
+            self.connection.execute_wrappers = wrappers
+
+    def capture(self, sql, params, many, elapsed_ms):
+        capture = {
+            "captured_at": timezone.now().isoformat(),
+            "view": self.view,
+            "database": self.connection.alias,
+            "duration_ms": round(elapsed_ms, 2),
+            "sql": sql,
+            "params": _json_safe(params),
+            "explain": [] if many else self.explain(sql, params),
+        }
+        record(capture)
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s params=%r explain=%r",
+            elapsed_ms, self.view, sql, capture["params"], capture["explain"],
+        )
+
+
+class SlowQueryMiddleware:
+    """Capture queries slower than SLOW_QUERY_THRESHOLD_MS with their EXPLAIN.
+
+    Captures go to a ring buffer of SLOW_QUERY_BUFFER_SIZE entries kept in
+    the cache (shared by the workers) and to the `monitoring` log.
+    """
+
+    def __init__(self, get_response):
+        self.threshold = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+        if self.threshold <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorders = [
+            SlowQueryRecorder(connection, request.path, self.threshold)
+            for connection in connections.all()
+        ]
+        request._slow_query_recorders = recorders
+        with ExitStack() as stack:
+            for recorder in recorders:
+                stack.enter_context(recorder.connection.execute_wrapper(recorder))
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        view = match.view_name if match and match.view_name else request.path
+        for recorder in getattr(request, "_slow_query_recorders", ()):
+            recorder.view = view
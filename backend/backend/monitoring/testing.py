@@ -0,0 +1,26 @@
+from urllib.parse import urlsplit
+
+from django.urls import resolve
+
+from .querybudget import QueryCounter, check_budget, get_budget
+
+
+class QueryBudgetTestMixin:
+    """Assert that a request stays within its view's declared query budget."""
+
+    def assertQueryBudget(self, method, path, data=None, **extra):
+        view_class = getattr(resolve(urlsplit(path).path).func, "view_class", None)
+        if get_budget(view_class, method) is None:
+            self.fail(f"{view_class.__name__} declares no query budget for {method}.")
+
+        with QueryCounter() as counter:
+            response = getattr(self.client, method.lower())(path, data, **extra)
+            if response.streaming:
+                # Count the queries the body runs as it is read.
+                response.streamed = b"".join(response.streaming_content)
+
+        message = check_budget(view_class, method, path, counter)
+        if message:
+            self.fail("\n".join([message, *counter.statements]))
+        response.query_count = counter.count
+        return response
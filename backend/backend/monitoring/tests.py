@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.serializers import Serializer
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.tokens import tokens_for_user
+
+from .metrics import REGISTRY, Histogram, MmapStore, _key, collect, render
+from .querybudget import QueryBudgetExceeded
+from .slowqueries import recent
+
+
+@override_settings(QUERY_BUDGET_MODE="raise")
+class QueryBudgetMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="fan@example.com")
+        self.client = APIClient()
+
+    def test_reports_query_count(self):
+        access = tokens_for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        response = self.client.get("/api/auth/me/")
+        self.assertEqual(response["X-Query-Count"], "0")
+
+    def test_raises_when_view_exceeds_budget(self):
+        # A token without role claims makes MeView load the user and profile.
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get("/api/auth/me/")
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+class ServerTimingMiddlewareTests(TestCase):
+    def test_sampled_request_gets_header_and_log_line(self):
+        user = get_user_model().objects.create_user(username="fan@example.com")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens_for_user(user).access_token}")
+
+        with self.assertLogs("monitoring.timing", "INFO") as logs:
+            response = client.get("/api/auth/profile/")
+
+        phases = {part.split(";")[0] for part in response["Server-Timing"].split(", ")}
+        self.assertTrue({"db", "auth", "perm", "serialize", "view", "total"} <= phases)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record["route"], record["queries"]), ("profile", 1))
+
+    def test_generic_views_time_their_serializers_without_patching_drf(self):
+        cache.clear()
+        with self.assertLogs("monitoring.timing", "INFO"):
+            response = APIClient().get("/api/marketplace/sports/")
+
+        phases = {part.split(";")[0] for part in response["Server-Timing"].split(", ")}
+        self.assertTrue({"auth", "perm", "serialize"} <= phases)
+        self.assertFalse(hasattr(Serializer.data.fget, "__wrapped__"))
+        self.assertFalse(hasattr(APIView.check_permissions, "__wrapped__"))
+
+
+class MetricsTests(TestCase):
+    def test_worker_files_are_summed(self):
+        with tempfile.TemporaryDirectory() as directory, self.settings(METRICS_DIR=directory):
+            first = MmapStore(os.path.join(directory, "worker-1.db"))
+            second = MmapStore(os.path.join(directory, "worker-2.db"))
+            key = _key("event_joins_total", {"result": "joined"})
+            first.inc(key, 2)
+            second.inc(key, 3)
+            for index in range(2000):
+                # Enough distinct keys to force the file to grow.
+                second.inc(_key("grow_total", {"n": index}))
+
+            self.assertEqual(collect()[key], 5)
+            self.assertEqual(MmapStore(os.path.join(directory, "worker-1.db"))._positions.keys(), {key})
+            self.assertIn('event_joins_total{result="joined"} 5', render())
+
+    def test_histogram_buckets_are_cumulative(self):
+        Histogram("test_latency_seconds", "Test.", (0.1, 1))
+        self.addCleanup(REGISTRY.pop, "test_latency_seconds")
+        with tempfile.TemporaryDirectory() as directory, self.settings(METRICS_DIR=directory):
+            store = MmapStore(os.path.join(directory, "worker-1.db"))
+            for bound in ("0.1", "1", "+Inf"):
+                store.inc(_key("test_latency_seconds_bucket", {"route": "x", "le": bound}))
+            output = render()
+
+        self.assertIn('test_latency_seconds_bucket{le="0.1",route="x"} 1', output)
+        self.assertIn('test_latency_seconds_bucket{le="1",route="x"} 2', output)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf",route="x"} 3', output)
+
+    def test_endpoint_is_staff_only(self):
+        client = APIClient()
+        user = get_user_model().objects.create_user(username="fan@example.com")
+        client.force_authenticate(user)
+        self.assertEqual(client.get("/api/monitoring/metrics/").status_code, 403)
+
+        user.is_staff = True
+        response = client.get("/api/monitoring/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("# TYPE http_request_duration_seconds histogram", response.content.decode())
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0.0001, SLOW_QUERY_BUFFER_SIZE=3)
+class SlowQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_captures_sql_view_and_explain(self):
+        with self.assertLogs("monitoring.slowqueries", "WARNING"):
+            self.client.get("/api/marketplace/events/", {"q": "padel"})
+
+        capture = recent()[0]
+        self.assertEqual(capture["view"], "events-list")
+        self.assertIn("events_catalogentry", capture["sql"])
+        self.assertTrue(capture["explain"])
+
+    def test_buffer_is_bounded_and_staff_only(self):
+        client = APIClient()
+        user = get_user_model().objects.create_user(username="fan@example.com")
+        client.force_authenticate(user)
+        with self.assertLogs("monitoring.slowqueries", "WARNING"):
+            for city in ("Tunis", "Sousse", "Sfax", "Bizerte"):
+                client.get("/api/marketplace/events/", {"city": city})
+        self.assertEqual(client.get("/api/monitoring/slow-queries/").status_code, 403)
+
+        user.is_staff = True
+        response = client.get("/api/monitoring/slow-queries/")
+        self.assertEqual(len(response.json()), 3)
+        self.assertEqual(client.delete("/api/monitoring/slow-queries/").status_code, 204)
+        self.assertEqual(client.get("/api/monitoring/slow-queries/").json(), [])
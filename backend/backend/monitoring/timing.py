@@ -0,0 +1,155 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("monitoring_timings", default=None)
+
+
+class RequestTimings:
+    """Durations (seconds) collected for one sampled request."""
+
+    def __init__(self):
+        self.durations = {}
+        self.queries = 0
+        self._running = set()
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.add("db", perf_counter() - start)
+
+
+class timed:
+    """Add the enclosed time to phase `name` of the current sampled request.
+
+    Does nothing outside a sampled request, and nested entries into the
+    same phase are only counted once.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.timings = None
+
+    def __enter__(self):
+        timings = _current.get()
+        if timings is not None and self.name not in timings._running:
+            timings._running.add(self.name)
+            self.timings = timings
+            self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.add(self.name, perf_counter() - self.start)
+            self.timings._running.discard(self.name)
+            self.timings = None
+
+
+def timed_function(name, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with timed(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class TimedViewMixin:
+    """Time a DRF view's authentication, permission checks and serializer output.
+
+    Serializers created through `get_serializer()` are timed; views that
+    build their own wrap the output in `timed("serialize")`.
+    """
+
+    def perform_authentication(self, request):
+        with timed("auth"):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with timed("perm"):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with timed("perm"):
+            super().check_object_permissions(request, obj)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        # Only this instance is wrapped: `data` calls its to_representation.
+        serializer.to_representation = timed_function("serialize", serializer.to_representation)
+        return serializer
+
+
+def _header(timings):
+    parts = []
+    for name, seconds in timings.durations.items():
+        entry = f"{name};dur={seconds * 1000:.1f}"
+        if name == "db":
+            entry += f';desc="{timings.queries} queries"'
+        parts.append(entry)
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """Emit a Server-Timing header and a JSON log line for sampled requests.
+
+    SERVER_TIMING_SAMPLE_RATE is the fraction of requests measured (0 turns
+    the middleware off). Phases: db, view and total, plus auth, perm and
+    serialize for views using TimedViewMixin.
+    """
+
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, "SERVER_TIMING_SAMPLE_RATE", 0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        timings.add("total", perf_counter() - start)
+        view_start = getattr(request, "_timing_view_start", None)
+        if view_start is not None:
+            timings.add("view", perf_counter() - view_start)
+
+        response["Server-Timing"] = _header(timings)
+        match = request.resolver_match
+        logger.info(json.dumps({
+            "route": match.view_name if match else None,
+            "method": request.method,
+            "status": response.status_code,
+            "queries": timings.queries,
+            **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in timings.durations.items()},
+        }, sort_keys=True))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._timing_view_start = perf_counter()
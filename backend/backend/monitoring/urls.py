@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import MetricsView, SlowQueryListView
+
+urlpatterns = [
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("slow-queries/", SlowQueryListView.as_view(), name="slow-queries"),
+]
@@ -0,0 +1,28 @@
+from django.http import HttpResponse
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import slowqueries
+from .metrics import render
+from .timing import TimedViewMixin
+
+
+class MetricsView(TimedViewMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+    query_budget = 0
+
+    def get(self, request):
+        return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class SlowQueryListView(TimedViewMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+    query_budget = 0
+
+    def get(self, request):
+        return Response(slowqueries.recent())
+
+    def delete(self, request):
+        slowqueries.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)